@@ -2,6 +2,13 @@
 ASGI config for ReServe project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by gunicorn with uvicorn workers::
+
+    gunicorn ReServe.asgi:application -k uvicorn_worker.UvicornWorker -w 4
+
+Under ASGI the read-only pages are routed to their async variants
+(``RESERVE_ASYNC_VIEWS``, see settings.ASYNC_VIEWS); benchmarks/README.md
+compares the two deployments.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -12,5 +19,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ReServe.settings')
+os.environ.setdefault('RESERVE_ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
@@ -0,0 +1,15 @@
+"""
+Helpers for the async page views (``<app>/async_views.py``).
+
+``request.user`` is a lazy object: the first attribute access runs the
+session and user queries synchronously, which Django refuses to do on the
+event loop.  Async views resolve it once, up front, with the async ORM;
+templates, context processors and the page cache then read a plain object.
+"""
+
+
+async def resolve_user(request):
+    """Load the session user with ``request.auser()`` and pin it on the request."""
+    user = await request.auser()
+    request.user = user
+    return user
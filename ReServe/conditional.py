@@ -0,0 +1,156 @@
+"""
+Conditional GET (ETag / Last-Modified / Cache-Control) for pages that show
+one object and rarely change: class detail and public profiles.
+
+Validators come from cached *version stamps*: a row's ``STAMP_FIELDS``
+(``updated_at`` plus whatever else decides the page, e.g. the owner) kept
+in the "stamps" cache namespace by primary key.  A view ``remember()``s
+the rows it renders; saves ``forget()`` them (signals, and
+``bookings.services`` for the seat counters).  So while nothing changes, a
+revalidation is answered 304 from the cache alone: no row load, no
+template.  With a stamp missing the page is rendered as usual and the
+validators are added afterwards, so stamps never cost a query.
+
+Cache-Control: anonymous pages are the same for everyone, so browsers and
+shared caches may keep them for ``ANONYMOUS_MAX_AGE`` seconds.  Signed-in
+pages show the viewer's own bookings and navbar: ``private, no-cache``,
+stored by the browser only and revalidated on every visit, which the ETag
+makes cheap.  The ETag covers the viewer for that reason.
+
+A request with ``django.contrib.messages`` waiting (e.g. "already booked"
+after a redirect) gets no validators and is not cached: a 304 would leave
+the message queued for some later page.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import patch_cache_control, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from ReServe.async_utils import resolve_user
+from ReServe.reserve_cache import Namespace
+
+# short: a save racing a render can leave an old stamp behind until then
+STAMP_TIMEOUT = 10 * 60
+ANONYMOUS_MAX_AGE = 60
+stamps = Namespace("stamps", timeout=STAMP_TIMEOUT)
+
+
+def _label(model) -> str:
+    return model._meta.label_lower
+
+
+def remember(obj, *lookups) -> tuple:
+    """
+    Cache ``obj``'s stamp (views pass the row they loaded anyway), plus a
+    ``field -> pk`` entry for each of ``lookups`` (e.g. ``"handle"``).
+    """
+    label = _label(type(obj))
+    value = tuple(getattr(obj, name) for name in obj.STAMP_FIELDS)
+    stamps.set(value, label, obj.pk)
+    for field in lookups:
+        stamps.set(obj.pk, label, field, getattr(obj, field))
+    return value
+
+
+def stamp(model, pk):
+    """The cached stamp of one row, or None (never reads the database)."""
+    return stamps.get(_label(model), pk)
+
+
+def pk_for(model, field, value):
+    """Cached pk of the row whose unique ``field`` was ``value``; check it against the stamp."""
+    return stamps.get(_label(model), field, value)
+
+
+def forget(model, pk) -> None:
+    stamps.delete(_label(model), pk)
+
+
+def validators(request, parts):
+    """``(etag, last_modified)`` for a page built from the stamps in ``parts`` and the viewer."""
+    user = request.user
+    if user.is_authenticated:
+        # the session already loaded this row: its stamp is free
+        parts = [*parts, ("viewer", user.pk, user.updated_at)]
+    times = [v for part in parts if part for v in part if isinstance(v, datetime)]
+    etag = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return etag, max(times) if times else None
+
+
+def _has_messages(request) -> bool:
+    # len() loads the storage without marking it used; async views have
+    # loaded the session already (resolve_user), so this reads no database
+    storage = getattr(request, "_messages", None)
+    return storage is not None and len(storage) > 0
+
+
+def _state(request):
+    return getattr(request, "_conditional_state", (None, None))
+
+
+def _etag(request, *args, **kwargs):
+    return _state(request)[0]
+
+
+def _last_modified(request, *args, **kwargs):
+    return _state(request)[1]
+
+
+def _prepare(request, get_parts, args, kwargs) -> None:
+    request._conditional_skip = _has_messages(request)
+    parts = None if request._conditional_skip else get_parts(request, *args, **kwargs)
+    request._conditional_state = validators(request, parts) if parts is not None else (None, None)
+
+
+def _finish(request, response, get_parts, args, kwargs):
+    if request._conditional_skip:
+        # shows one-off messages: never revalidated, never stored by shared caches
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Cookie",))
+        return response
+    if _state(request)[0] is None and response.status_code == 200:
+        # stamps were missing: the view has just remembered them
+        parts = get_parts(request, *args, **kwargs)
+        if parts is not None:
+            etag, last_modified = validators(request, parts)
+            response.headers.setdefault("ETag", quote_etag(etag))
+            if last_modified:
+                response.headers.setdefault("Last-Modified", http_date(last_modified.timestamp()))
+    if request.user.is_authenticated or response.cookies:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=ANONYMOUS_MAX_AGE)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def conditional_page(get_parts):
+    """
+    View decorator: validators from ``get_parts(request, *args, **kwargs)``
+    (the cached stamps the page is built from, or None while any is
+    missing), 304 when the client's copy still matches, and the
+    Cache-Control above.  Works on async views too.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=_etag, last_modified_func=_last_modified)(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                await resolve_user(request)
+                # cache reads only, like the page cache
+                _prepare(request, get_parts, args, kwargs)
+                response = await conditional_view(request, *args, **kwargs)
+                return _finish(request, response, get_parts, args, kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            _prepare(request, get_parts, args, kwargs)
+            return _finish(request, conditional_view(request, *args, **kwargs), get_parts, args, kwargs)
+        return wrapper
+    return decorator
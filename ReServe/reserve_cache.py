@@ -0,0 +1,238 @@
+"""
+Small helper layer over Django's cache used across ReServe.
+
+* Namespaced keys: ``<namespace>:v<version>:<parts...>``.
+* Versioning: ``Namespace.bump()`` invalidates every key in a namespace at
+  once (old keys are never read again and age out on their own).  A
+  version that is missing (new, or evicted) starts from the clock, never
+  from a value an earlier version may have used.
+  A namespace can have child scopes (e.g. one per user) with their own
+  version, so one user's entries can be dropped without touching others.
+* Stampede protection in ``get_or_set``: entries carry a soft expiry; the
+  first caller past it takes a short lock and recomputes while everyone
+  else keeps serving the old value.  On a cold miss only the lock holder
+  computes, the others wait briefly for its result.
+* Per-namespace hit / miss / set / recompute / eviction counters, kept in
+  the cache itself so ``manage.py cache_stats`` can read them from another
+  process (so not with locmem, which is private to each process).  Off
+  unless ``RESERVE_CACHE_STATS`` (default: DEBUG): they cost extra cache
+  round trips.  Evictions are detected with a tiny "seen" marker written next
+  to each entry: a miss while the marker is still there means the entry was
+  dropped before its timeout.  Markers are evicted too, so the count is a
+  lower bound.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOCK_TIMEOUT = 10          # seconds a recompute lock is held at most
+LOCK_WAIT = 2.0            # seconds a cold-miss caller waits for the lock holder
+LOCK_POLL = 0.05
+EARLY_RECOMPUTE = 0.8      # recompute once 80% of the timeout has elapsed
+
+STAT_EVENTS = ("hits", "misses", "evictions", "sets", "early_recomputes", "lock_waits")
+
+_registry = {}
+
+
+def _stats_enabled() -> bool:
+    return getattr(settings, "RESERVE_CACHE_STATS", settings.DEBUG)
+
+
+def _bump(key) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:  # missing / evicted: start from a value never used before
+        cache.set(key, time.time_ns(), None)
+
+
+def _seed_version(key) -> int:
+    """
+    Version for a key that is missing: never set, or evicted after a bump.
+    A constant would send readers back to entries written before that bump.
+    """
+    fresh = time.time_ns()
+    if cache.add(key, fresh, None):
+        return fresh
+    return cache.get(key, fresh)  # someone else seeded it first
+
+
+def namespaces():
+    """All namespaces created in this process, by name."""
+    return dict(_registry)
+
+
+class Namespace:
+    def __init__(self, name: str, timeout=300, parent=None):
+        self.name = name
+        self.timeout = timeout
+        self.parent = parent
+        if parent is None:
+            _registry.setdefault(name, self)
+
+    def __repr__(self):
+        return f"<Namespace {self.name}>"
+
+    # ---- versioning ----
+
+    @property
+    def version_key(self) -> str:
+        return f"ver:{self.name}"
+
+    def scope(self, scope) -> "Namespace":
+        """Child namespace with its own version, e.g. ``roles.scope(user.pk)``."""
+        return Namespace(f"{self.name}:{scope}", timeout=self.timeout, parent=self)
+
+    def _chain(self):
+        ns, chain = self, []
+        while ns is not None:
+            chain.append(ns)
+            ns = ns.parent
+        return chain[::-1]
+
+    def key(self, *parts) -> str:
+        chain = self._chain()
+        versions = cache.get_many([ns.version_key for ns in chain])
+        for ns in chain:
+            if ns.version_key not in versions:
+                versions[ns.version_key] = _seed_version(ns.version_key)
+        prefix = ":".join(f"{ns.name}:v{versions[ns.version_key]}" for ns in chain)
+        return ":".join([prefix, *(str(p) for p in parts)])
+
+    def bump(self) -> None:
+        _bump(self.version_key)
+
+    # ---- stats ----
+
+    @property
+    def root(self) -> "Namespace":
+        return self._chain()[0]
+
+    def _record(self, event: str) -> None:
+        if not _stats_enabled():
+            return
+        key = f"stats:{self.root.name}:{event}"
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, None)
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+
+    def stats(self) -> dict:
+        keys = {f"stats:{self.name}:{e}": e for e in STAT_EVENTS}
+        got = cache.get_many(list(keys))
+        return {event: got.get(key, 0) for key, event in keys.items()}
+
+    def reset_stats(self) -> None:
+        cache.delete_many([f"stats:{self.name}:{e}" for e in STAT_EVENTS])
+
+    # ---- plain get / set ----
+
+    def _miss(self, key) -> None:
+        self._record("misses")
+        if _stats_enabled() and cache.get(f"seen:{key}") is not None:
+            self._record("evictions")
+
+    def _write(self, key, value, timeout) -> None:
+        entries = {key: value}
+        if _stats_enabled():
+            entries[f"seen:{key}"] = 1
+        cache.set_many(entries, timeout)
+        self._record("sets")
+
+    def get(self, *parts, default=None):
+        key = self.key(*parts)
+        value = cache.get(key)
+        if value is None:
+            self._miss(key)
+            return default
+        self._record("hits")
+        return value
+
+    def set(self, value, *parts, timeout=None) -> None:
+        self._write(self.key(*parts), value, self.timeout if timeout is None else timeout)
+
+    def delete(self, *parts) -> None:
+        cache.delete(self.key(*parts))
+
+    # ---- stampede-protected read-through ----
+
+    def get_or_set(self, parts, compute, timeout=None):
+        """
+        Return the cached value for ``parts`` or ``compute()`` it.
+        ``parts`` is a tuple of key parts.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        key = self.key(*parts)
+        lock_key = f"lock:{key}"
+
+        entry = cache.get(key)
+        if entry is not None:
+            value, soft_expiry = entry
+            if time.time() < soft_expiry or not cache.add(lock_key, 1, LOCK_TIMEOUT):
+                self._record("hits")
+                return value
+            # we won the lock: refresh early while others keep reading ``value``
+            self._record("early_recomputes")
+            try:
+                return self._store(key, compute(), timeout)
+            finally:
+                cache.delete(lock_key)
+
+        self._miss(key)
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                return self._store(key, compute(), timeout)
+            finally:
+                cache.delete(lock_key)
+
+        # someone else is computing: wait a little for their result
+        self._record("lock_waits")
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+        return self._store(key, compute(), timeout)
+
+    def _store(self, key, value, timeout):
+        soft_expiry = time.time() + (timeout * EARLY_RECOMPUTE if timeout else 10 ** 10)
+        self._write(key, (value, soft_expiry), timeout)
+        return value
+
+
+def backend_stats() -> dict:
+    """
+    Backend-wide counters where the backend exposes them (Redis INFO,
+    memcached stats); these are the exact eviction numbers, across all
+    namespaces.
+    """
+    client = getattr(cache, "_cache", None)
+    try:
+        # Redis (django.core.cache.backends.redis.RedisCache)
+        if hasattr(client, "get_client"):
+            info = client.get_client().info("stats")
+            return {
+                "hits": info.get("keyspace_hits"),
+                "misses": info.get("keyspace_misses"),
+                "evictions": info.get("evicted_keys"),
+                "expired": info.get("expired_keys"),
+            }
+        # pymemcache / pylibmc
+        if hasattr(client, "get_stats"):
+            totals = {}
+            for _server, stats in client.get_stats():
+                for name in ("get_hits", "get_misses", "evictions", "curr_items"):
+                    raw = stats.get(name.encode(), stats.get(name, 0))
+                    totals[name] = totals.get(name, 0) + int(raw)
+            return totals
+    except Exception as exc:  # stats are best-effort
+        return {"error": str(exc)}
+    if isinstance(client, dict):  # LocMemCache keeps a plain (ordered) dict
+        return {"entries": len(client)}
+    return {}
@@ -28,7 +28,9 @@ SECRET_KEY = 'django-insecure-87%f6#yh8av!o9h45#vy)8ju0#zx0h(a+32c8-q=&o2f@z34&3
 
 PRODUCTION = os.getenv('PRODUCTION', 'False').lower() == 'true'
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Off by default in production: hashed static URLs (and their far-future
+# caching) are only emitted when DEBUG is off.
+DEBUG = os.getenv('DEBUG', str(not PRODUCTION)).lower() == 'true'
 
 ALLOWED_HOSTS = ["localhost", "127.0.0.1", "khayru-rafa-reserve.pbp.cs.ui.ac.id"]
 
@@ -49,10 +51,15 @@ INSTALLED_APPS = [
     'home_search',
     'accounts',
     'blog',
+    'jobs',
+    'bookings',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'main.middleware.MetricsMiddleware',
+    'main.middleware.QueryInspectorMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -65,7 +72,8 @@ ROOT_URLCONF = 'ReServe.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates plus render timing for /metrics
+        'BACKEND': 'main.metrics.TimedTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -73,6 +81,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'bookings.context_processors.live_seats',
             ],
         },
     },
@@ -80,13 +89,38 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'ReServe.wsgi.application'
 
+# Read-only pages (home, search, class detail, blog list/detail, feeds) have
+# async twins using the async ORM. ReServe/asgi.py switches them on, so they
+# are used under uvicorn workers and never pay the async_to_sync hop on WSGI.
+ASYNC_VIEWS = os.getenv('RESERVE_ASYNC_VIEWS', 'False').lower() == 'true'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 # Database configuration
 if PRODUCTION:
-    # Production: use PostgreSQL with credentials from environment variables
+    # Production: use PostgreSQL with credentials from environment variables.
+    # DB_POOL=true uses Django's native psycopg 3 connection pool (one pool per
+    # worker process); otherwise connections persist for DB_CONN_MAX_AGE seconds.
+    # The two are mutually exclusive: with a pool, CONN_MAX_AGE must be 0.
+    # Under ASGI (ASYNC_VIEWS) persistent connections are off too: the ORM
+    # runs in executor threads that come and go, and each would keep its own
+    # idle connection open; use DB_POOL there instead.
+    DB_POOL = os.getenv('DB_POOL', 'False').lower() == 'true'
+    _db_options = {
+        'options': f"-c search_path={os.getenv('SCHEMA', 'public')}",
+        'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '5')),
+    }
+    if DB_POOL:
+        _db_options['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            # seconds a request waits for a free connection before erroring
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+        }
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
@@ -95,20 +129,96 @@ if PRODUCTION:
             'PASSWORD': os.getenv('DB_PASSWORD'),
             'HOST': os.getenv('DB_HOST'),
             'PORT': os.getenv('DB_PORT'),
-            'OPTIONS': {
-                'options': f"-c search_path={os.getenv('SCHEMA', 'public')}"
-            }
+            'CONN_MAX_AGE': 0 if DB_POOL or ASYNC_VIEWS else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
+            'OPTIONS': _db_options,
         }
     }
 else:
-    # Development: use SQLite
+    # Development: use SQLite. IMMEDIATE transactions take the write lock up
+    # front, so concurrent writers (threads, run_workers) queue on the busy
+    # timeout instead of failing with "database is locked" mid-transaction.
+    # Tests use a file too: the shared in-memory database can't take
+    # concurrent writers at all.
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
+# Cache
+# CACHE_BACKEND picks the backend: "redis" / "memcached" in production,
+# "file" or "locmem" (default) for development. CACHE_LOCATION overrides
+# the backend's default location (Redis URL, memcached host:port, directory).
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem').lower()
+_CACHE_BACKENDS = {
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'reserve'),
+}
+_cache_engine, _cache_location = _CACHE_BACKENDS.get(CACHE_BACKEND, _CACHE_BACKENDS['locmem'])
+CACHES = {
+    'default': {
+        'BACKEND': _cache_engine,
+        'LOCATION': os.getenv('CACHE_LOCATION', _cache_location),
+        'KEY_PREFIX': 'reserve',
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', '300')),
+        'OPTIONS': {'MAX_ENTRIES': 10000} if CACHE_BACKEND in ('file', 'locmem') else {},
+    }
+}
+# Per-namespace hit/miss counters for ReServe.reserve_cache (manage.py cache_stats).
+# Off unless DEBUG or asked for: they add cache writes to every lookup and set.
+RESERVE_CACHE_STATS = os.getenv('RESERVE_CACHE_STATS', str(DEBUG)).lower() == 'true'
+
+# Logging: app loggers live under "reserve" (LOG_LEVEL, default INFO)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'reserve': {
+            'handlers': ['console'],
+            'level': os.getenv('LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Background jobs (jobs.queue, run with manage.py run_workers).
+# JOBS_EAGER runs every job inline at enqueue time instead.
+JOBS_EAGER = os.getenv('JOBS_EAGER', 'False').lower() == 'true'
+JOBS_BACKOFF_BASE = int(os.getenv('JOBS_BACKOFF_BASE', '10'))    # seconds, doubled per retry
+JOBS_LOCK_TIMEOUT = int(os.getenv('JOBS_LOCK_TIMEOUT', '600'))   # requeue jobs of dead workers
+
+# Live seat counts (bookings.live). "local" fans out inside each process and
+# re-reads watched classes every SEATS_POLL_INTERVAL seconds to catch changes
+# made elsewhere; "redis" announces every change on a Redis channel instead.
+SEATS_PUBSUB = os.getenv('SEATS_PUBSUB', 'local').lower()
+SEATS_REDIS_URL = os.getenv('SEATS_REDIS_URL', 'redis://127.0.0.1:6379/2')
+SEATS_POLL_INTERVAL = float(os.getenv('SEATS_POLL_INTERVAL', '2'))
+
+# Request metrics (main.middleware.MetricsMiddleware), served at /metrics in
+# Prometheus text format. With METRICS_TOKEN set a scrape must send
+# "Authorization: Bearer <token>"; without one /metrics is only open in DEBUG.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))  # seconds between cache copies
+
+# N+1 / query budget warnings (main.middleware.QueryInspectorMiddleware,
+# logged to "reserve.queries"): development only, on by default with DEBUG.
+QUERY_INSPECTOR = os.getenv('QUERY_INSPECTOR', str(DEBUG)).lower() == 'true'
+QUERY_REPEAT_LIMIT = int(os.getenv('QUERY_REPEAT_LIMIT', '3'))  # same query shape per request
+QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', '30'))             # queries per request
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -151,14 +261,39 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Production: collectstatic writes content-hashed copies plus gzip and brotli
+# (if Brotli is installed) variants; WhiteNoise serves the hashed names with
+# "Cache-Control: max-age=315360000, immutable" and picks the compressed file
+# from Accept-Encoding. Dev/tests keep the plain storage (no manifest needed).
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': (
+            'whitenoise.storage.CompressedManifestStaticFilesStorage' if PRODUCTION
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+# A few templates reference images that are not shipped; don't 500 on them
+WHITENOISE_MANIFEST_STRICT = False
+# Unhashed URLs (e.g. referenced from CSS) still get a day of caching
+WHITENOISE_MAX_AGE = int(os.getenv('WHITENOISE_MAX_AGE', str(24 * 60 * 60)))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Custom user (accounts.User carries role / display_name / handle)
+AUTH_USER_MODEL = "accounts.User"
+
 LOGIN_URL = "main:login"
 LOGIN_REDIRECT_URL = "blog:show_blog"
 LOGOUT_REDIRECT_URL = "blog:show_blog"
 
 MEDIA_URL = "/media/"
-MEDIA_ROOT = BASE_DIR / "media"
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / "media"
+# Uploaded media (avatars) is served by Django itself outside production.
+# A production deploy should have the front server serve MEDIA_ROOT; set
+# SERVE_MEDIA=true only where there is none.
+SERVE_MEDIA = os.getenv('SERVE_MEDIA', str(not PRODUCTION)).lower() == 'true'
@@ -1,7 +1,7 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from django.views.static import serve
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -11,8 +11,14 @@ urlpatterns = [
     path('', include('accounts.urls')),
     path('', include('main.urls')),
     path('blog/', include('blog.urls')),
+    path('jobs/', include('jobs.urls')),
+    path('', include('bookings.urls')),
     path('accounts/', include("django.contrib.auth.urls")),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+if settings.DEBUG or settings.SERVE_MEDIA:
+    # django.conf.urls.static.static() is a no-op without DEBUG, so route it directly
+    urlpatterns += [
+        re_path(r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"), serve,
+                {"document_root": settings.MEDIA_ROOT}),
+    ]
@@ -0,0 +1,141 @@
+"""
+Avatar upload pipeline.
+
+An upload is decoded once, EXIF-rotated, center-cropped to a square and
+written out as fixed-size renditions with every bit of metadata dropped:
+
+    avatars/<hash>-64.webp   avatars/<hash>-64.jpg
+    avatars/<hash>-128.webp  avatars/<hash>-128.jpg
+    avatars/<hash>-256.webp  avatars/<hash>-256.jpg
+
+``<hash>`` is taken from the uploaded bytes, so the URLs never change for a
+given image and can be cached forever; re-uploading the same picture reuses
+the existing files.  ``User.avatar`` stores the largest WebP rendition and
+every other size is derived from that name (``rendition_name``).
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import re
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}),
+                  "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+MAX_AVATAR_PIXELS = 40_000_000  # refuse decompression bombs before decoding
+
+AVATAR_DIR = "avatars"
+_RENDITION_RE = re.compile(rf"^{AVATAR_DIR}/(?P<digest>[0-9a-f]{{16}})-\d+\.(?:webp|jpg)$")
+
+
+def rendition_name(digest: str, size: int, ext: str = "webp") -> str:
+    return f"{AVATAR_DIR}/{digest}-{size}.{ext}"
+
+
+def parse_rendition(name: str | None):
+    """The content hash of a processed avatar name, or None for legacy / default files."""
+    m = _RENDITION_RE.match(name or "")
+    return m.group("digest") if m else None
+
+
+def _square(img: Image.Image) -> Image.Image:
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+    side = min(img.size)
+    return ImageOps.fit(img, (side, side), method=Image.Resampling.LANCZOS)
+
+
+def _encode(img: Image.Image, ext: str) -> bytes:
+    fmt, params = AVATAR_FORMATS[ext]
+    if fmt == "JPEG" and img.mode == "RGBA":  # no alpha in JPEG: flatten onto white
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img, mask=img.getchannel("A"))
+        img = bg
+    out = io.BytesIO()
+    img.save(out, format=fmt, **params)  # no exif= / icc_profile=: metadata is dropped
+    return out.getvalue()
+
+
+@dataclass
+class DecodedAvatar:
+    """A validated upload: its content hash and the square image (None when already stored)."""
+    digest: str
+    square: Image.Image | None
+
+    @property
+    def name(self) -> str:
+        return rendition_name(self.digest, max(AVATAR_SIZES))
+
+
+def decode_avatar(upload) -> DecodedAvatar:
+    """
+    Read and decode ``upload`` without writing anything, so forms can call
+    it while validating.  Raises ValidationError for unreadable images.
+    """
+    upload.seek(0)
+    raw = upload.read()
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    if default_storage.exists(rendition_name(digest, max(AVATAR_SIZES))):
+        return DecodedAvatar(digest, None)
+
+    try:
+        img = Image.open(io.BytesIO(raw))
+        if img.width * img.height > MAX_AVATAR_PIXELS:
+            raise ValidationError("Image dimensions are too large.")
+        # JPEG can decode straight at a reduced scale (DCT scaling), far cheaper
+        # than decoding full size and resizing
+        img.draft("RGB", (max(AVATAR_SIZES), max(AVATAR_SIZES)))
+        square = _square(img)
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ValidationError("Could not read the uploaded image.") from exc
+    return DecodedAvatar(digest, square)
+
+
+def store_avatar(decoded: DecodedAvatar) -> str:
+    """Write every rendition of ``decoded`` and return the name to store on ``User.avatar``."""
+    square = decoded.square
+    if square is not None:
+        # largest first, each smaller size resampled from the previous one
+        for size in sorted(AVATAR_SIZES, reverse=True):
+            if square.width > size:
+                square = square.resize((size, size), Image.Resampling.LANCZOS)
+            for ext in AVATAR_FORMATS:
+                name = rendition_name(decoded.digest, size, ext)
+                if not default_storage.exists(name):
+                    default_storage.save(name, ContentFile(_encode(square, ext)))
+    return decoded.name
+
+
+def process_avatar(upload) -> str:
+    """``decode_avatar`` then ``store_avatar``: the stored name of ``upload``."""
+    return store_avatar(decode_avatar(upload))
+
+
+def avatar_url(avatar, size: int = 128, ext: str = "webp") -> str:
+    """
+    URL of the ``size`` px rendition for an ImageField value; legacy uploads
+    and the default avatar fall back to the stored file.
+    """
+    if not avatar:
+        return ""
+    digest = parse_rendition(avatar.name)
+    if digest is None:
+        return avatar.url
+    size = min(AVATAR_SIZES, key=lambda s: (s < size, abs(s - size)))
+    return avatar.storage.url(rendition_name(digest, size, ext))
+
+
+def avatar_urls(avatar) -> dict:
+    """All rendition URLs, e.g. for JSON responses: ``{"128": ..., "128_jpg": ...}``."""
+    urls = {}
+    for size in AVATAR_SIZES:
+        urls[str(size)] = avatar_url(avatar, size)
+        urls[f"{size}_jpg"] = avatar_url(avatar, size, "jpg")
+    return urls
@@ -0,0 +1,377 @@
+"""
+Bulk import / export of users in Django fixture format (``backup_users.json``).
+
+``loaddata`` reads the whole file into memory and saves one object at a
+time through ``User.save()``; this module streams instead:
+
+* ``iter_fixture`` decodes the file incrementally (UTF-8 or UTF-16, with
+  or without BOM) and yields one fixture object at a time.
+* ``import_users`` validates a batch at a time, checks it against the
+  database in a handful of queries (existing usernames, handles, pks) and
+  writes it with ``bulk_create`` (or ``bulk_update`` for ``on_conflict=
+  "update"``), groups and permissions included, one transaction per batch.
+  Passwords are already hashed in a fixture, so nothing is re-hashed.
+* After every committed batch a small state file records how many objects
+  are done; ``resume=True`` skips them after a failure.  Re-running
+  without it is also safe: known usernames are skipped or updated.
+
+Fields the model no longer has (older backups carry bio, phone, ...) are
+ignored and reported.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core import serializers
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import User, _unique_handle_for
+from home_search.utils import invalidate_user_role
+from ReServe import conditional
+
+MODEL_LABEL = "accounts.user"
+READ_SIZE = 64 * 1024
+DEFAULT_BATCH_SIZE = 1000
+
+_SKIP = re.compile(r"[\s,]*")
+
+
+# --------------------------- Reading ---------------------------
+
+def detect_encoding(head: bytes) -> str:
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if len(head) >= 2 and head[0] and not head[1]:  # "[\0" ...
+        return "utf-16-le"
+    if len(head) >= 2 and not head[0] and head[1]:
+        return "utf-16-be"
+    return "utf-8"
+
+
+def _text_chunks(stream, size=READ_SIZE):
+    head = stream.read(size)
+    decoder = codecs.getincrementaldecoder(detect_encoding(head))()
+    data = head
+    while data:
+        text = decoder.decode(data)
+        if text:
+            yield text
+        data = stream.read(size)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_fixture(stream):
+    """Yield the objects of a top-level JSON array from a binary ``stream``, one at a time."""
+    decoder = json.JSONDecoder()
+    chunks = _text_chunks(stream)
+    buf, pos, opened, eof = "", 0, False, False
+    while True:
+        pos = _SKIP.match(buf, pos).end()
+        if pos < len(buf):
+            if not opened:
+                if buf[pos] != "[":
+                    raise ValueError("a fixture must be a JSON array")
+                opened, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                obj, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield obj
+                continue
+        elif eof:
+            raise ValueError("unexpected end of fixture")
+        # need more text: the next object is incomplete or the buffer is empty
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+        else:
+            buf, pos = buf[pos:] + chunk, 0
+
+
+def batched(iterable, size):
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+# --------------------------- Import ---------------------------
+
+@dataclass
+class ImportStats:
+    seen: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    renamed_handles: int = 0
+    new_pks: int = 0
+    ignored_fields: set = field(default_factory=set)
+    errors: list = field(default_factory=list)  # (position, username, message), first few only
+
+    MAX_ERRORS = 20
+
+    def error(self, position, username, message) -> None:
+        self.invalid += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((position, username, message))
+
+
+def _state_path(path: str) -> str:
+    return f"{path}.import-state"
+
+
+def read_state(path: str) -> int:
+    """Objects already imported from ``path`` by an interrupted run (0 if none)."""
+    try:
+        with open(_state_path(path)) as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return 0
+    if state.get("size") != os.path.getsize(path):
+        return 0  # a different file by now
+    return int(state.get("done", 0))
+
+
+def _write_state(path: str, done: int) -> None:
+    tmp = _state_path(path) + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump({"source": os.path.abspath(path), "size": os.path.getsize(path), "done": done}, fh)
+    os.replace(tmp, _state_path(path))
+
+
+def clear_state(path: str) -> None:
+    try:
+        os.remove(_state_path(path))
+    except FileNotFoundError:
+        pass
+
+
+_M2M = ("groups", "user_permissions")
+
+
+def _model_fields():
+    return {f.name for f in User._meta.get_fields() if f.concrete}
+
+
+def _validate(user) -> None:
+    """
+    Field-level checks (types, lengths, choices).  Empty values are what the
+    database already holds for accounts made outside the forms, so they pass;
+    uniqueness is checked for the whole batch at once, not per row.
+    """
+    empty = []
+    for f in User._meta.concrete_fields:
+        value = getattr(user, f.attname)
+        stamped = getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)
+        if value is None and not f.null and not f.primary_key and not f.has_default() and not stamped:
+            raise ValidationError({f.name: "This field cannot be null."})
+        if value in f.empty_values:
+            empty.append(f.name)
+    user.clean_fields(exclude=["password", "last_login", *empty])
+
+
+def _deserialize(raw, position, stats, model_fields):
+    if raw.get("model", "").lower() != MODEL_LABEL:
+        stats.error(position, "", f"not a user object: {raw.get('model')!r}")
+        return None
+    fields = raw.get("fields", {})
+    stats.ignored_fields.update(set(fields) - model_fields)
+    no_pk = raw.get("pk") is None
+    if no_pk:
+        # without a pk the deserializer looks each user up by natural key,
+        # one query per row; existing usernames are found per batch instead
+        raw = {**raw, "pk": 0}
+    try:
+        [obj] = serializers.deserialize("python", [raw], ignorenonexistent=True)
+        if no_pk:
+            obj.object.pk = None
+        _validate(obj.object)
+    except (ValidationError, DeserializationError) as exc:
+        message = "; ".join(exc.messages) if isinstance(exc, ValidationError) else str(exc)
+        stats.error(position, fields.get("username", ""), message)
+        return None
+    if not obj.object.password:
+        obj.object.set_unusable_password()
+    return obj
+
+
+def _import_batch(batch, start, on_conflict, stats, model_fields):
+    incoming, seen_names = [], set()
+    for offset, raw in enumerate(batch):
+        obj = _deserialize(raw, start + offset, stats, model_fields)
+        if obj is None:
+            continue
+        name = obj.object.username
+        if name in seen_names:
+            stats.error(start + offset, name, "duplicate username in file")
+            continue
+        seen_names.add(name)
+        incoming.append(obj)
+    if not incoming:
+        return
+
+    users = [o.object for o in incoming]
+    names = [u.username for u in users]
+    existing = {
+        name: (pk, handle)
+        for name, pk, handle in User.objects.filter(username__in=names).values_list("username", "pk", "handle")
+    }
+    # handles and pks already held by someone other than the incoming rows
+    held_handles = set(
+        User.objects.filter(handle__in=[u.handle for u in users if u.handle])
+        .exclude(username__in=names).values_list("handle", flat=True)
+    )
+    held_pks = set(
+        User.objects.filter(pk__in=[u.pk for u in users if u.pk is not None])
+        .exclude(username__in=names).values_list("pk", flat=True)
+    )
+
+    creates, updates, batch_handles = [], [], set()
+    for obj in incoming:
+        user = obj.object
+        current = existing.get(user.username)
+        if current is not None:
+            if on_conflict == "skip":
+                stats.skipped += 1
+                continue
+            user.pk = current[0]
+            if user.handle in held_handles or user.handle in batch_handles:
+                user.handle = current[1]
+            batch_handles.add(user.handle)
+            updates.append(obj)
+            continue
+        if user.pk in held_pks:
+            user.pk = None
+            stats.new_pks += 1
+        if not user.handle or user.handle in held_handles or user.handle in batch_handles:
+            base = user.display_name or user.username
+            user.handle = _unique_handle_for(base, taken=held_handles | batch_handles)
+            stats.renamed_handles += 1
+        batch_handles.add(user.handle)
+        creates.append(obj)
+
+    with transaction.atomic():
+        if creates:
+            # a row a concurrent signup got to first is ignored, not fatal
+            User.objects.bulk_create([o.object for o in creates], ignore_conflicts=True)
+        if updates:
+            fields = [f.name for f in User._meta.concrete_fields if not f.primary_key and f.name != "username"]
+            now = timezone.now()
+            for o in updates:
+                o.object.updated_at = now  # bulk_update skips auto_now
+            User.objects.bulk_update([o.object for o in updates], fields)
+        pks = dict(
+            User.objects.filter(username__in=[o.object.username for o in creates + updates])
+            .values_list("username", "pk")
+        )
+        regrouped = _write_m2m(
+            creates + updates, pks, replace=[pks[o.object.username] for o in updates if o.object.username in pks],
+        )
+    stats.created += sum(1 for o in creates if o.object.username in pks)
+    stats.skipped += sum(1 for o in creates if o.object.username not in pks)
+    stats.updated += len(updates)
+    # no post_save / m2m_changed for bulk writes: drop the public profile
+    # stamps and cached roles (role field or groups) by hand
+    for o in updates:
+        conditional.forget(User, o.object.pk)
+    for pk in regrouped | {o.object.pk for o in updates}:
+        invalidate_user_role(pk)
+
+
+def _write_m2m(objs, pks, replace) -> set:
+    """Write the through rows; returns the pks of users whose rows changed."""
+    touched = set(replace)
+    for name in _M2M:
+        m2m = User._meta.get_field(name)
+        through = m2m.remote_field.through
+        source, target = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+        if replace:
+            through.objects.filter(**{f"{source}_id__in": replace}).delete()
+        rows = []
+        for obj in objs:
+            user_pk = pks.get(obj.object.username)
+            values = (obj.m2m_data or {}).get(name) or []
+            if user_pk is None or not values:
+                continue
+            # the deserializer already turned natural keys into pks
+            for target_pk in values:
+                rows.append(through(**{f"{source}_id": user_pk, f"{target}_id": target_pk}))
+            touched.add(user_pk)
+        if rows:
+            through.objects.bulk_create(rows, ignore_conflicts=True)
+    return touched
+
+
+def import_users(path, batch_size=DEFAULT_BATCH_SIZE, on_conflict="skip", resume=False, progress=None) -> ImportStats:
+    """
+    Import the fixture at ``path``.  ``on_conflict`` decides what happens to
+    usernames that already exist: "skip" them or "update" them in place.
+    ``progress(stats)`` is called after every committed batch.
+    """
+    if on_conflict not in ("skip", "update"):
+        raise ValueError(f"on_conflict must be 'skip' or 'update', not {on_conflict!r}")
+    stats = ImportStats()
+    done = read_state(path) if resume else 0
+    model_fields = _model_fields()
+    with open(path, "rb") as fh:
+        objects = iter_fixture(fh)
+        for _ in islice(objects, done):
+            pass
+        stats.seen = done
+        for batch in batched(objects, batch_size):
+            _import_batch(batch, stats.seen, on_conflict, stats, model_fields)
+            stats.seen += len(batch)
+            _write_state(path, stats.seen)
+            if progress:
+                progress(stats)
+    _reset_sequence()
+    clear_state(path)
+    return stats
+
+
+def _reset_sequence() -> None:
+    """Explicit pks were inserted: move the pk sequence past them (Postgres)."""
+    sql = connection.ops.sequence_reset_sql(no_style(), [User])
+    if sql:
+        with connection.cursor() as cursor:
+            for statement in sql:
+                cursor.execute(statement)
+
+
+# --------------------------- Export ---------------------------
+
+def export_users(out, batch_size=DEFAULT_BATCH_SIZE, queryset=None) -> int:
+    """
+    Write every user to the text stream ``out`` as a fixture, ``batch_size``
+    rows (plus their groups and permissions, prefetched) per read.
+    Returns the number of users written.
+    """
+    qs = (queryset if queryset is not None else User.objects.all()).order_by("pk").prefetch_related(*_M2M)
+    count = 0
+    out.write("[")
+    for batch in batched(qs.iterator(chunk_size=batch_size), batch_size):
+        for obj in serializers.serialize("python", batch):
+            out.write(",\n" if count else "\n")
+            out.write(json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False))
+            count += 1
+    out.write("\n]\n")
+    return count
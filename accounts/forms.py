@@ -4,6 +4,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.auth.forms import UserCreationForm
 
+from accounts.avatars import decode_avatar, store_avatar
 from accounts.models import User
 
 # --- Constraints used by Avatar upload -------------------------------------------------
@@ -61,6 +62,12 @@ ProfileEditForm = ProfileCardEditForm
 
 
 class AvatarForm(forms.ModelForm):
+    """
+    Validates and decodes the upload (``accounts.avatars.decode_avatar``);
+    ``save()`` writes the renditions and stores the name of the WebP one.
+    The original file is never written to storage, and an invalid form
+    writes nothing.
+    """
     class Meta:
         model = User
         fields = ["avatar"]
@@ -77,8 +84,16 @@ class AvatarForm(forms.ModelForm):
         ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
         if ext not in ALLOWED_IMAGE_EXTS:
             raise ValidationError("Unsupported image type. Use JPG, PNG, or WebP.")
+        self.decoded_avatar = decode_avatar(f)
         return f
 
+    def save(self, commit=True):
+        decoded = getattr(self, "decoded_avatar", None)
+        if decoded is not None:
+            # replaces the upload construct_instance() put there, so it is never saved as is
+            self.instance.avatar = store_avatar(decoded)
+        return super().save(commit)
+
 
 # --- Registration ---------------------------------------------------------------------
 
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from accounts import bulk
+
+
+class Command(BaseCommand):
+    help = "Write all users as a fixture (the backup_users.json format), streamed in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-", help="Output file (default: stdout).")
+        parser.add_argument("--batch-size", type=int, default=bulk.DEFAULT_BATCH_SIZE)
+        parser.add_argument("--encoding", default="utf-8", help="e.g. utf-16 for the legacy backups.")
+
+    def handle(self, *args, path, batch_size, encoding, **options):
+        if path == "-":
+            self.stdout.ending = ""  # the fixture brings its own newlines
+            bulk.export_users(self.stdout, batch_size=batch_size)
+            return
+        with open(path, "w", encoding=encoding, newline="\n") as out:
+            count = bulk.export_users(out, batch_size=batch_size)
+        self.stderr.write(f"Exported {count} users to {path}.")
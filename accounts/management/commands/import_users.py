@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import bulk
+
+
+class Command(BaseCommand):
+    help = "Stream users from a fixture file (UTF-8 or UTF-16, e.g. backup_users.json) in bulk batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=bulk.DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--on-conflict", choices=("skip", "update"), default="skip",
+            help="What to do with usernames that already exist (default: skip).",
+        )
+        parser.add_argument(
+            "--resume", action="store_true",
+            help="Continue after the last batch a failed run committed.",
+        )
+
+    def handle(self, *args, path, batch_size, on_conflict, resume, **options):
+        if resume and (done := bulk.read_state(path)):
+            self.stdout.write(f"Resuming after {done} objects.")
+
+        def progress(stats):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {stats.seen} read, {stats.created} created, {stats.updated} updated")
+
+        try:
+            stats = bulk.import_users(path, batch_size=batch_size, on_conflict=on_conflict,
+                                      resume=resume, progress=progress)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"{exc} (re-run with --resume to continue)") from exc
+
+        if stats.ignored_fields:
+            self.stdout.write(self.style.WARNING(
+                "Ignored fields the model does not have: " + ", ".join(sorted(stats.ignored_fields))
+            ))
+        for position, username, message in stats.errors:
+            self.stdout.write(self.style.ERROR(f"  #{position} {username or '?'}: {message}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats.seen} read: {stats.created} created, {stats.updated} updated, "
+            f"{stats.skipped} skipped, {stats.invalid} invalid "
+            f"({stats.renamed_handles} handles and {stats.new_pks} ids reassigned)."
+        ))
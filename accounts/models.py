@@ -1,8 +1,10 @@
 ﻿# accounts/models.py
+import re
+
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 from django.utils.text import slugify
 
@@ -22,16 +24,42 @@ def validate_birthdate_not_future(value):
     if value and value > timezone.now().date():
         raise ValidationError("Birthdate cannot be in the future.")
 
-def _unique_handle_for(base: str, max_len: int = 30, instance_pk=None) -> str:
+HANDLE_SAVE_ATTEMPTS = 3
+
+
+def _handle_candidate(root: str, i: int, max_len: int) -> str:
+    if i == 0:
+        return root
+    suffix = f"_{i}"
+    return f"{root[: max_len - len(suffix)]}{suffix}"
+
+
+def _unique_handle_for(base: str, max_len: int = 30, instance_pk=None, taken=()) -> str:
+    """
+    ``root``, or ``root_1``, ``root_2``, ... whichever is free first.
+    All handles that could collide come back in ONE prefix query (covered by
+    the unique index on ``handle``); only the ``root`` / ``<stem>_<n>``
+    shapes among them are kept, and the free suffix is found in memory, so
+    signup costs the same however many "user_<n>" handles exist.  Two
+    signups can still pick the same handle at the same moment: ``User.save``
+    retries on the unique constraint.  ``taken`` adds handles that are
+    spoken for but not saved yet (bulk import).
+    """
     root = slugify(base or "user").replace("-", "_")
     root = root[:max_len] or "user"
-    handle = root
-    i = 1
-    while User.objects.filter(handle=handle).exclude(pk=instance_pk).exists():
-        suffix = f"_{i}"
-        handle = f"{root[: max_len - len(suffix)]}{suffix}"
+    # suffixes truncate a long root: one stem per suffix length up to _99999999
+    stems = {_handle_candidate(root, 10 ** d, max_len)[: -d - 2] for d in range(8)}
+    shape = re.compile("(%s)" % "|".join([re.escape(root), *(rf"{re.escape(stem)}_[0-9]+" for stem in stems)]))
+    rows = (
+        User.objects.filter(handle__startswith=min(stems, key=len))
+        .exclude(pk=instance_pk)
+        .values_list("handle", flat=True)
+    )
+    taken = set(taken) | {handle for handle in rows.iterator() if shape.fullmatch(handle)}
+    i = 0
+    while _handle_candidate(root, i, max_len) in taken:
         i += 1
-    return handle
+    return _handle_candidate(root, i, max_len)
 
 
 class User(AbstractUser):
@@ -87,6 +115,10 @@ class User(AbstractUser):
         blank=True,
         help_text="User weight in kilograms (25.00–300.00).",
     )
+    # last profile change; saves with update_fields (e.g. last_login on login) leave it alone
+    updated_at = models.DateTimeField(auto_now=True)
+
+    STAMP_FIELDS = ("updated_at", "handle")  # public profile ETag (ReServe.conditional)
 
     def clean(self):
         super().clean()
@@ -102,10 +134,20 @@ class User(AbstractUser):
                 raise ValidationError({"weight_kg": "Weight must be between 25 and 300 kg."})
 
     def save(self, *args, **kwargs):
-        if not self.handle:
-            base = self.display_name or self.username or "user"
+        if self.handle:
+            return super().save(*args, **kwargs)
+        base = self.display_name or self.username or "user"
+        for attempt in range(HANDLE_SAVE_ATTEMPTS):
             self.handle = _unique_handle_for(base, max_len=30, instance_pk=self.pk)
-        super().save(*args, **kwargs)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # lost the handle to a concurrent signup? pick again; anything else is real
+                lost = User.objects.filter(handle=self.handle).exclude(pk=self.pk).exists()
+                self.handle = ""
+                if not lost or attempt == HANDLE_SAVE_ATTEMPTS - 1:
+                    raise
 
     def __str__(self):
         return f"{self.display_name or self.username} (@{self.handle})"
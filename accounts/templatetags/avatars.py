@@ -0,0 +1,17 @@
+from django import template
+
+from accounts.avatars import avatar_url as _avatar_url
+
+register = template.Library()
+
+
+@register.filter
+def avatar_url(avatar, size=128):
+    """``{{ user.avatar|avatar_url:64 }}`` -> WebP rendition closest to ``size`` px."""
+    return _avatar_url(avatar, int(size))
+
+
+@register.filter
+def avatar_jpg(avatar, size=128):
+    """JPEG fallback of ``avatar_url`` for clients without WebP."""
+    return _avatar_url(avatar, int(size), "jpg")
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import io
+import tempfile
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from accounts.avatars import AVATAR_SIZES, avatar_url, process_avatar, rendition_name, parse_rendition
+
+
+def make_upload(fmt="JPEG", size=(800, 600), name="photo.jpg", exif=True) -> SimpleUploadedFile:
+    img = Image.new("RGB", size, color=(10, 120, 200))
+    bio = io.BytesIO()
+    params = {}
+    if exif:
+        ex = Image.Exif()
+        ex[0x010F] = "CameraMaker"   # Make
+        ex[0x0112] = 6               # Orientation: rotate 90 CW
+        params["exif"] = ex.tobytes()
+    img.save(bio, format=fmt, **params)
+    return SimpleUploadedFile(name, bio.getvalue(), content_type=f"image/{fmt.lower()}")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class AvatarPipelineTests(SimpleTestCase):
+    def test_writes_square_renditions_without_metadata(self):
+        name = process_avatar(make_upload())
+        digest = parse_rendition(name)
+        self.assertIsNotNone(digest)
+        for size in AVATAR_SIZES:
+            for ext, fmt in (("webp", "WEBP"), ("jpg", "JPEG")):
+                with default_storage.open(rendition_name(digest, size, ext)) as fh:
+                    img = Image.open(fh)
+                    self.assertEqual(img.format, fmt)
+                    self.assertEqual(img.size, (size, size))
+                    self.assertFalse(img.getexif())
+
+    def test_same_image_reuses_files(self):
+        first = process_avatar(make_upload(fmt="PNG", name="a.png", exif=False))
+        second = process_avatar(make_upload(fmt="PNG", name="b.png", exif=False))
+        self.assertEqual(first, second)
+
+    def test_unreadable_image_is_rejected(self):
+        bad = SimpleUploadedFile("x.jpg", b"\xff\xd8not really a jpeg", content_type="image/jpeg")
+        with self.assertRaises(ValidationError):
+            process_avatar(bad)
+
+    def test_urls_pick_closest_rendition_and_fall_back_for_legacy_files(self):
+        name = process_avatar(make_upload(size=(300, 300), exif=False))
+        field = _FakeField(name)
+        self.assertTrue(avatar_url(field, 100).endswith("-128.webp"))
+        self.assertTrue(avatar_url(field, 64, "jpg").endswith("-64.jpg"))
+        self.assertTrue(avatar_url(field, 1000).endswith("-256.webp"))
+        self.assertEqual(avatar_url(_FakeField("avatars/default.png"), 64), "/media/avatars/default.png")
+
+
+class _FakeField:
+    """Just enough of a FieldFile for ``avatar_url``."""
+    storage = default_storage
+
+    def __init__(self, name):
+        self.name = name
+
+    def __bool__(self):
+        return bool(self.name)
+
+    @property
+    def url(self):
+        return self.storage.url(self.name)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts import bulk
+
+User = get_user_model()
+
+BACKUP = Path(settings.BASE_DIR) / "backup_users.json"
+
+
+def fixture_obj(pk, username, handle=None, **fields):
+    return {
+        "model": "accounts.user",
+        "pk": pk,
+        "fields": {
+            "password": "pbkdf2_sha256$1$salt$hash",
+            "username": username,
+            "display_name": username,
+            "handle": handle if handle is not None else username,
+            "role": "member",
+            "date_joined": "2025-10-22T11:56:35.390Z",
+            "groups": [],
+            "user_permissions": [],
+            **fields,
+        },
+    }
+
+
+class IterFixtureTests(TestCase):
+    def parse(self, text, encoding="utf-8", chunk=7):
+        stream = io.BytesIO(text.encode(encoding))
+        original = bulk.READ_SIZE
+        bulk.READ_SIZE = chunk
+        try:
+            return list(bulk.iter_fixture(stream))
+        finally:
+            bulk.READ_SIZE = original
+
+    def test_objects_split_across_reads(self):
+        objs = [{"a": i, "s": "x, ]} é" * i} for i in range(5)]
+        for encoding in ("utf-8", "utf-8-sig", "utf-16", "utf-16-le"):
+            with self.subTest(encoding=encoding):
+                self.assertEqual(self.parse(json.dumps(objs, indent=2), encoding), objs)
+
+    def test_empty_and_malformed(self):
+        self.assertEqual(self.parse(" [ ] "), [])
+        with self.assertRaises(ValueError):
+            self.parse('{"a": 1}')
+        with self.assertRaises(ValueError):
+            self.parse('[{"a": 1}, {"b": ')
+
+
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def write(self, objs, name="users.json", encoding="utf-8"):
+        path = self.dir / name
+        path.write_text(json.dumps(objs), encoding=encoding)
+        return str(path)
+
+    def test_backup_fixture(self):
+        stats = bulk.import_users(str(BACKUP))
+        self.assertEqual((stats.created, stats.invalid), (1, 0))
+        self.assertEqual(stats.ignored_fields, {"bio", "birthdate", "gender", "location", "phone"})
+        user = User.objects.get(username="juansao.fortunio")
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))  # stored as is, not re-hashed
+        self.assertFalse(os.path.exists(bulk._state_path(str(BACKUP))))
+
+    def test_skip_or_update_existing(self):
+        User.objects.create(username="ann", handle="ann", display_name="Old")
+        path = self.write([fixture_obj(50, "ann", display_name="New"), fixture_obj(51, "bob")])
+
+        stats = bulk.import_users(path)
+        self.assertEqual((stats.created, stats.skipped), (1, 1))
+        self.assertEqual(User.objects.get(username="ann").display_name, "Old")
+
+        stats = bulk.import_users(path, on_conflict="update")
+        self.assertEqual((stats.created, stats.updated), (0, 2))
+        self.assertEqual(User.objects.get(username="ann").display_name, "New")
+
+    def test_taken_handles_and_pks_are_reassigned(self):
+        holder = User.objects.create(username="first", handle="shared")
+        path = self.write([
+            fixture_obj(holder.pk, "second", handle="shared"),
+            fixture_obj(None, "third", handle="shared"),
+        ])
+        stats = bulk.import_users(path)
+        self.assertEqual((stats.created, stats.renamed_handles, stats.new_pks), (2, 2, 1))
+        handles = set(User.objects.values_list("handle", flat=True))
+        self.assertEqual(len(handles), 3)
+        self.assertEqual(User.objects.get(pk=holder.pk).username, "first")
+
+    def test_invalid_rows_are_reported_not_fatal(self):
+        path = self.write([
+            fixture_obj(None, "ok"),
+            fixture_obj(None, "bad", role="wizard"),
+            {"model": "auth.group", "pk": 1, "fields": {"name": "x"}},
+            fixture_obj(None, "ok"),
+        ])
+        stats = bulk.import_users(path)
+        self.assertEqual((stats.created, stats.invalid), (1, 3))
+        self.assertEqual([e[1] for e in stats.errors], ["bad", "", "ok"])
+
+    def test_resume_skips_committed_batches(self):
+        path = self.write([fixture_obj(None, f"user{i}") for i in range(5)])
+        bulk._write_state(path, 3)
+        stats = bulk.import_users(path, batch_size=2, resume=True)
+        self.assertEqual((stats.seen, stats.created), (5, 2))
+        self.assertEqual(sorted(User.objects.values_list("username", flat=True)), ["user3", "user4"])
+
+    def test_batches_use_constant_queries(self):
+        path = self.write([fixture_obj(None, f"user{i}") for i in range(40)])
+        # per batch: usernames, handles, savepoint, insert, new pks, release
+        with self.assertNumQueries(6 * 2):
+            bulk.import_users(path, batch_size=20)
+        self.assertEqual(User.objects.count(), 40)
+
+
+    def test_group_import_refreshes_cached_role(self):
+        from home_search.utils import resolve_role
+
+        teachers = Group.objects.create(name="instructor")
+        User.objects.create(username="gina", handle="gina")
+        self.assertEqual(resolve_role(User.objects.get(username="gina")), "member")  # now cached
+
+        path = self.write([fixture_obj(None, "gina", groups=[teachers.pk])])
+        bulk.import_users(path, on_conflict="update")
+        self.assertEqual(resolve_role(User.objects.get(username="gina")), "instructor")
+
+
+class ExportUsersTests(TestCase):
+    def test_round_trip_with_groups(self):
+        staff = Group.objects.create(name="staff")
+        ann = User.objects.create(username="ann", handle="ann", password="pbkdf2_sha256$1$s$h")
+        ann.groups.add(staff)
+        User.objects.create(username="bob", handle="bob")
+
+        out = io.StringIO()
+        self.assertEqual(bulk.export_users(out, batch_size=1), 2)
+        exported = json.loads(out.getvalue())
+        self.assertEqual([o["fields"]["username"] for o in exported], ["ann", "bob"])
+        self.assertEqual(exported[0]["fields"]["groups"], [staff.pk])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "users.json")
+            call_command("export_users", path, encoding="utf-16", stderr=io.StringIO())
+            User.objects.all().delete()
+            call_command("import_users", path, stdout=io.StringIO())
+        restored = User.objects.get(username="ann")
+        self.assertEqual(restored.password, "pbkdf2_sha256$1$s$h")
+        self.assertEqual(list(restored.groups.all()), [staff])
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from unittest import mock
 from decimal import Decimal
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
@@ -73,3 +74,47 @@ class UserModelTests(TestCase):
         u2.set_password("x"); u2.save()
         self.assertTrue(u2.handle)
         self.assertNotEqual(u1.handle, u2.handle)
+
+    def test_handle_allocation_is_a_single_query(self):
+        User.objects.bulk_create([
+            User(username=f"taken{i}", handle="same_name" if i == 0 else f"same_name_{i}") for i in range(40)
+        ])
+        u = User(username="late", display_name="Same Name", handle="")
+        # one candidate lookup, then the INSERT (inside a savepoint)
+        with self.assertNumQueries(4):
+            u.save()
+        self.assertEqual(u.handle, "same_name_40")
+
+    def test_handle_lookup_uses_the_prefix_index(self):
+        from accounts import models as account_models
+
+        User.objects.bulk_create([
+            User(username="n1", handle="same_name"), User(username="n2", handle="same_name_1"),
+            User(username="n3", handle="same_namesake"), User(username="n4", handle="same_name_x"),
+        ])
+        with mock.patch.object(account_models.User.objects, "filter", wraps=User.objects.filter) as flt:
+            self.assertEqual(account_models._unique_handle_for("Same Name"), "same_name_2")
+        # an indexable prefix lookup, not a regex the database has to run on every row
+        self.assertEqual(flt.call_args.kwargs, {"handle__startswith": "same_name"})
+
+    def test_handle_suffix_fits_max_length(self):
+        base = "x" * 40
+        first = User.objects.create(username="long1", display_name=base)
+        second = User.objects.create(username="long2", display_name=base)
+        self.assertEqual(first.handle, "x" * 30)
+        self.assertEqual(second.handle, "x" * 28 + "_1")
+
+    def test_handle_race_retries(self):
+        from accounts import models as account_models
+
+        taken = User.objects.create(username="first", display_name="Racer")
+        real = account_models._unique_handle_for
+        calls = []
+
+        def stale(*args, **kwargs):  # first pick misses the concurrent signup
+            calls.append(1)
+            return taken.handle if len(calls) == 1 else real(*args, **kwargs)
+
+        with mock.patch.object(account_models, "_unique_handle_for", stale):
+            u = User.objects.create(username="second", display_name="Racer")
+        self.assertEqual((len(calls), u.handle), (2, "racer_1"))
@@ -7,10 +7,13 @@ import tempfile
 from decimal import Decimal
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 
+from main.testing import QueryBudgetMixin
+
 # Generate a tiny valid PNG via Pillow so ImageField validation passes everywhere
 from PIL import Image
 
@@ -25,7 +28,7 @@ def make_png_bytes(width: int = 2, height: int = 2) -> bytes:
 
 
 @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
-class ProfileViewsTests(TestCase):
+class ProfileViewsTests(QueryBudgetMixin, TestCase):
     @classmethod
     def setUpTestData(cls):
         cls.user = User.objects.create_user(
@@ -64,15 +67,41 @@ class ProfileViewsTests(TestCase):
         self.assertEqual(resp.status_code, 302)  # redirect to login
 
         self.client.login(username="tester", password="pass12345")
-        resp = self.client.get(reverse("profile_view"))
+        with self.assertQueryBudget(2):  # session + user
+            resp = self.client.get(reverse("profile_view"))
         self.assertEqual(resp.status_code, 200)
         self.assertContains(resp, "Edit Profile")
 
     def test_public_profile_by_handle(self):
-        resp = self.client.get(reverse("public_profile", args=[self.user.handle]))
+        with self.assertQueryBudget(1):
+            resp = self.client.get(reverse("public_profile", args=[self.user.handle]))
         self.assertEqual(resp.status_code, 200)
         self.assertContains(resp, self.user.display_name or self.user.username)
 
+    def test_public_profile_conditional_get(self):
+        cache.clear()
+        url = reverse("public_profile", args=[self.user.handle])
+        first = self.client.get(url)
+        self.assertEqual(first["Cache-Control"], "public, max-age=60")
+        with self.assertNumQueries(0):  # cached stamp: no row, no template
+            again = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+        self.other.display_name = "Someone"
+        self.other.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        self.user.display_name = "Renamed"
+        self.user.save()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Renamed")
+
+        self.client.login(username="other", password="pass12345")
+        signed_in = self.client.get(url)
+        self.assertIn("private", signed_in["Cache-Control"])
+        self.assertNotEqual(signed_in["ETag"], resp["ETag"])
+
     # ---- AJAX profile update ----
     def test_profile_update_ajax_success(self):
         self.client.login(username="tester", password="pass12345")
@@ -82,7 +111,8 @@ class ProfileViewsTests(TestCase):
             "height_cm": "185",
             "weight_kg": "75.5",
         }
-        resp = self.client.post(url, data=payload, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        with self.assertQueryBudget(3):  # session + user + one UPDATE
+            resp = self.client.post(url, data=payload, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
         self.assertEqual(resp.status_code, 200)
         data = resp.json()
         self.assertTrue(data.get("success"))
@@ -134,7 +164,27 @@ class ProfileViewsTests(TestCase):
         self.assertIn("avatar_url", data)
 
         self.user.refresh_from_db()
-        self.assertTrue(self.user.avatar.name.endswith(".png"))
+        # stored as the processed WebP rendition, not the original PNG
+        self.assertTrue(self.user.avatar.name.endswith("-256.webp"))
+        self.assertEqual(data["avatar_url"], self.user.avatar.url)
+        self.assertTrue(data["avatar_urls"]["64"].endswith("-64.webp"))
+
+    def test_avatar_form_writes_renditions_only_on_save(self):
+        from django.core.files.storage import default_storage
+
+        from accounts.forms import AvatarForm
+
+        f = SimpleUploadedFile("avatar.png", make_png_bytes(3, 3), content_type="image/png")
+        form = AvatarForm(files={"avatar": f}, instance=self.user)
+        self.assertTrue(form.is_valid())
+        name = form.decoded_avatar.name
+        self.assertFalse(default_storage.exists(name))  # validation wrote nothing
+
+        form.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar.name, name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertFalse(default_storage.exists("avatars/avatar.png"))  # the original is never kept
 
     def test_avatar_upload_rejects_wrong_extension(self):
         self.client.login(username="tester", password="pass12345")
@@ -10,7 +10,9 @@ from django.views import View
 from django.views.decorators.http import require_GET
 from django.views.generic import DetailView, UpdateView, CreateView
 
+from accounts.avatars import avatar_url, avatar_urls
 from accounts.models import User
+from ReServe import conditional
 from django.views.decorators.csrf import csrf_protect
 from django.utils.decorators import method_decorator
 
@@ -72,7 +74,11 @@ class AvatarUpdateView(LoginRequiredMixin, View):
         if form.is_valid():
             form.save()
             if request.headers.get("x-requested-with") == "XMLHttpRequest":
-                return JsonResponse({"success": True, "avatar_url": user.avatar.url})
+                return JsonResponse({
+                    "success": True,
+                    "avatar_url": avatar_url(user.avatar, 256),
+                    "avatar_urls": avatar_urls(user.avatar),
+                })
             return redirect(reverse("profile_view"))
         errors = form.errors.get_json_data()
         if request.headers.get("x-requested-with") == "XMLHttpRequest":
@@ -101,6 +107,16 @@ class ProfileUpdateAjax(LoginRequiredMixin, View):
 # Public view
 # -----------------------
 
+def profile_stamps(request, handle):
+    """The profile's cached stamp, found by handle; None if not cached (or the handle has moved)."""
+    pk = conditional.pk_for(User, "handle", handle)
+    row = conditional.stamp(User, pk) if pk is not None else None
+    if row is None or row[1] != handle:
+        return None
+    return [row]
+
+
+@method_decorator(conditional.conditional_page(profile_stamps), name="dispatch")
 class PublicProfileView(DetailView):
     """
     Public profile by handle (legacy). Kept temporarily to avoid breaking links.
@@ -111,6 +127,11 @@ class PublicProfileView(DetailView):
     slug_field = "handle"
     slug_url_kwarg = "handle"
 
+    def get_object(self, queryset=None):
+        obj = super().get_object(queryset)
+        conditional.remember(obj, "handle")
+        return obj
+
 # -----------------------
 # Deprecated AJAX endpoints (kept as safe stubs)
 # -----------------------
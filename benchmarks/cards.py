@@ -0,0 +1,79 @@
+"""
+Memory and time per 1000 class cards: model instances vs ``.only()`` vs
+``Class.objects.cards()``.
+
+    python manage.py seed_scale --users 2000 --classes 5000 --blogs 0 --reset
+    python benchmarks/cards.py --cards 5000
+
+Each variant loads the same ``--cards`` rows (the grid's columns, newest
+first) from the database this checkout is configured for.  Time is the
+best of ``--repeat`` runs; memory is the tracemalloc peak while the list
+is built, which is what a page holds until it has rendered.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# the fields card.html / search.html read
+ONLY = ("owner", "name", "category", "price", "image_url", "location", "datetime", "capacity", "seats_left")
+
+
+def variants():
+    from home_search.models import Class
+
+    return {
+        "model": lambda: Class.objects.order_by("-id"),
+        "only()": lambda: Class.objects.only(*ONLY).order_by("-id"),
+        "cards()": lambda: Class.objects.cards().order_by("-id"),
+    }
+
+
+def measure(make_qs, count, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        rows = list(make_qs()[:count])
+        best = min(best, time.perf_counter() - started)
+        del rows
+    gc.collect()
+    tracemalloc.start()
+    rows = list(make_qs()[:count])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(rows), best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=5000, help="rows per run")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ReServe.settings")
+    import django
+    django.setup()
+
+    results = {}
+    for name, make_qs in variants().items():
+        loaded, seconds, peak = measure(make_qs, args.cards, args.repeat)
+        if not loaded:
+            raise SystemExit("no classes in the database: run manage.py seed_scale first")
+        per_k = 1000 / loaded
+        results[name] = (seconds * 1000 * per_k, peak / 1024 * per_k)
+
+    print(f"{loaded} cards, per 1000:")
+    print(f"{'':10} {'ms':>8} {'KiB':>9}")
+    base_ms, base_kib = results["model"]
+    for name, (ms, kib) in results.items():
+        print(f"{name:10} {ms:8.2f} {kib:9.1f}   ({ms / base_ms:.0%} time, {kib / base_kib:.0%} memory)")
+
+
+if __name__ == "__main__":
+    main()
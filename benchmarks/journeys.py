@@ -0,0 +1,121 @@
+"""
+Scripted user journeys for ``benchmarks/run.py``.
+
+A journey is ``setup(user)`` (once per virtual user, e.g. logging in) plus
+``step(user)`` (one pass through the pages, repeated until time is up).
+Every request is recorded under the URL name of the view that serves it,
+the same label ``/metrics`` uses, so latency and queries per request line
+up per view in the report.
+"""
+import json
+import re
+import time
+from dataclasses import dataclass
+from http.client import HTTPException
+from typing import Callable
+from urllib.parse import urlencode
+
+_CSRF = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class JourneyError(Exception):
+    """A response the journey cannot go on from (e.g. login failed)."""
+
+
+class VirtualUser:
+    def __init__(self, client, targets, rng, record):
+        self.client = client
+        self.targets = targets  # ids, usernames, ... from run.load_targets()
+        self.rng = rng
+        self.record = record    # record(view, seconds, ok, setup)
+        self.state = {}
+        self.in_setup = False
+
+    def request(self, method, path, view, data=None, headers=None, expect=(200,)):
+        started = time.perf_counter()
+        try:
+            status, resp_headers, body = self.client.request(method, path, data=data, headers=headers)
+        except (OSError, HTTPException) as exc:
+            self.record(view, time.perf_counter() - started, False, self.in_setup)
+            raise JourneyError(f"{method} {path}: {exc}") from exc
+        ok = status in expect
+        self.record(view, time.perf_counter() - started, ok, self.in_setup)
+        if not ok:
+            raise JourneyError(f"{method} {path}: HTTP {status}")
+        return status, resp_headers, body
+
+    def get(self, path, view, **kwargs):
+        return self.request("GET", path, view, **kwargs)
+
+    def pick(self, name):
+        return self.rng.choice(self.targets[name])
+
+
+# --------------------------- Journeys ---------------------------
+
+def browse(user):
+    """Anonymous: home -> search one category -> a class."""
+    user.get("/", "home_search:home")
+    user.get("/search/?" + urlencode({"category": user.pick("categories")}), "home_search:search")
+    user.get(f"/classes/{user.pick('classes')}/", "home_search:class_detail")
+
+
+def login(user):
+    _, _, body = user.get("/login/", "login")
+    token = _CSRF.search(body)
+    if token is None:
+        raise JourneyError("no CSRF token on /login/")
+    username = user.pick("usernames")
+    user.request("POST", "/login/", "login", expect=(302,), data={
+        "username": username,
+        "password": user.targets["password"],
+        "csrfmiddlewaretoken": token.group(1).decode(),
+        "next": "/profile/",
+    })
+
+
+def profile(user):
+    """Signed in: own profile -> someone's public profile."""
+    user.get("/profile/", "profile_view")
+    user.get(f"/u/{user.pick('handles')}/", "public_profile")
+
+
+def blog(user):
+    """Anonymous: blog list -> a post."""
+    user.get("/blog/", "blog:main_blog")
+    user.get(f"/blog/blog/{user.pick('posts')}/", "blog:blog_details")
+
+
+def feed_setup(user):
+    _, headers, body = user.get("/blog/json/", "blog:show_json")
+    _remember_feed(user, headers, body)
+
+
+def feed_poll(user):
+    """A client polling for new posts: ?since=<newest seen> with If-None-Match."""
+    path = "/blog/json/?" + urlencode({"since": user.state["since"]}) if user.state.get("since") else "/blog/json/"
+    headers = {"If-None-Match": user.state["etag"]} if user.state.get("etag") else None
+    status, resp_headers, body = user.get(path, "blog:show_json", headers=headers, expect=(200, 304))
+    if status == 200:
+        _remember_feed(user, resp_headers, body)
+
+
+def _remember_feed(user, headers, body):
+    posts = json.loads(body)
+    if posts:
+        user.state["since"] = max(p["fields"]["created_at"] for p in posts)
+    user.state["etag"] = headers.get("ETag")
+
+
+@dataclass(frozen=True)
+class Journey:
+    step: Callable
+    setup: Callable | None = None
+
+
+JOURNEYS = {
+    "browse": Journey(browse),
+    "profile": Journey(profile, setup=login),
+    "blog": Journey(blog),
+    "feed": Journey(feed_poll, setup=feed_setup),
+}
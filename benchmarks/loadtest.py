@@ -0,0 +1,130 @@
+"""
+Minimal closed-loop HTTP load generator (stdlib only).
+
+Each of ``--concurrency`` clients keeps one keep-alive connection and
+requests the given paths round-robin for ``--duration`` seconds; prints
+throughput and latency percentiles::
+
+    python benchmarks/loadtest.py http://127.0.0.1:8000 / /search/?category=yoga /blog/json/ \\
+        --concurrency 64 --duration 30
+
+Scripted user journeys with a JSON report are in ``benchmarks/run.py``.
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+class Client:
+    """One keep-alive connection with a cookie jar; reconnects after an error."""
+
+    def __init__(self, base, timeout=30):
+        parts = urlsplit(base)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self.conn = None
+
+    def request(self, method, path, data=None, headers=None):
+        """Returns ``(status, headers, body)``; raises OSError / HTTPException."""
+        headers = dict(headers or {})
+        body = None
+        if data is not None:
+            body = urlencode(data).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            resp = self.conn.getresponse()
+            content = resp.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        for cookie in resp.headers.get_all("Set-Cookie") or ():
+            self._set_cookie(cookie)
+        return resp.status, resp.headers, content
+
+    def _set_cookie(self, header):
+        pair, _, attrs = header.partition(";")
+        name, _, value = pair.partition("=")
+        if value.strip('"') == "" or "max-age=0" in attrs.lower().replace(" ", ""):
+            self.cookies.pop(name.strip(), None)
+        else:
+            self.cookies[name.strip()] = value
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def client(base, paths, deadline, latencies, errors, offset):
+    session = Client(base)
+    i = offset
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            status, _, _ = session.request("GET", path)
+        except (OSError, http.client.HTTPException):
+            errors.append(path)
+            continue
+        if status >= 400:
+            errors.append(path)
+        latencies.append(time.perf_counter() - started)
+    session.close()
+
+
+def run(base, paths, concurrency, duration) -> dict:
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=client, args=(base, paths, deadline, latencies, errors, n))
+        for n in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, len(errors), time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base", help="server root, e.g. http://127.0.0.1:8000")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.base.rstrip("/"), args.paths, args.concurrency, args.duration)))
+
+
+if __name__ == "__main__":
+    main()
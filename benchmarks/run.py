@@ -0,0 +1,278 @@
+"""
+Run the scripted journeys against a running server and write a JSON report.
+
+    python manage.py seed_scale --users 2000 --classes 2000 --blogs 300 --reset
+    METRICS_FLUSH_INTERVAL=1 CACHE_BACKEND=file \\
+        gunicorn ReServe.wsgi:application -w 2 -b 127.0.0.1:8011 -D -p /tmp/bench.pid
+    python benchmarks/run.py http://127.0.0.1:8011 --label "wsgi -w 2"
+    python benchmarks/run.py http://127.0.0.1:8011 --compare benchmarks/results/<before>.json
+
+Each journey (see ``benchmarks/journeys.py``) runs on its own for
+``--duration`` seconds with ``--concurrency`` virtual users, after a short
+unrecorded warm-up.  The report has throughput, p50/p95/p99 latency and
+errors per journey and per view, plus SQL queries per request taken from
+the server's ``/metrics`` (before/after difference of ``reserve_db_queries``).
+That needs the server to share metrics between workers (a file or Redis
+cache) and, if it sets ``METRICS_TOKEN``, the same token here.
+
+Targets (class ids, posts, users) are read from the database this checkout
+is configured for, so run it on the machine that serves the site.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.journeys import JOURNEYS, JourneyError, VirtualUser  # noqa: E402
+from benchmarks.loadtest import Client, summarize  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+SAMPLE = 500  # ids per kind the virtual users pick from
+
+_QUERIES = re.compile(r'^reserve_db_queries_(sum|count)\{view="((?:[^"\\]|\\.)*)"\} (\S+)$', re.M)
+
+
+def load_targets(password) -> dict:
+    """What the journeys request: a sample of existing ids, seeded users, categories."""
+    from accounts.models import User
+    from blog.models import Blog
+    from home_search.models import Class
+    from main.seeding import seeded_users
+
+    bench_users = seeded_users()
+    targets = {
+        "classes": list(Class.objects.order_by("?").values_list("pk", flat=True)[:SAMPLE]),
+        "categories": sorted(set(Class.objects.values_list("category", flat=True).distinct())),
+        "posts": [str(pk) for pk in Blog.objects.order_by("?").values_list("pk", flat=True)[:SAMPLE]],
+        "usernames": list(bench_users.order_by("pk").values_list("username", flat=True)[:SAMPLE]),
+        "handles": list(User.objects.order_by("?").values_list("handle", flat=True)[:SAMPLE]),
+        "password": password,
+        "counts": {
+            "users": User.objects.count(), "classes": Class.objects.count(), "posts": Blog.objects.count(),
+        },
+    }
+    for name in ("classes", "categories", "posts", "usernames", "handles"):
+        if not targets[name]:
+            raise SystemExit(f"no {name} in the database: run manage.py seed_scale first")
+    return targets
+
+
+# --------------------------- Queries per request (/metrics) ---------------------------
+
+def scrape(base, token):
+    """``{view: (query sum, request count)}`` or None when /metrics is unavailable."""
+    headers = {"Authorization": f"Bearer {token}"} if token else None
+    client = Client(base)
+    try:
+        status, _, body = client.request("GET", "/metrics", headers=headers)
+    except OSError:
+        return None
+    finally:
+        client.close()
+    if status != 200:
+        return None
+    totals = defaultdict(lambda: [0.0, 0.0])
+    for kind, view, value in _QUERIES.findall(body.decode()):
+        totals[view.replace('\\"', '"').replace("\\\\", "\\")][kind == "count"] = float(value)
+    return {view: tuple(v) for view, v in totals.items()}
+
+
+def settled_scrape(base, token, rounds):
+    """
+    A worker copies its numbers to the shared cache whenever it answers a
+    scrape, so scrape ``rounds`` times over fresh connections (reaching
+    every worker, most likely) before the scrape that counts.
+    """
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: scrape(base, token), range(rounds)))
+    return scrape(base, token)
+
+
+def queries_per_request(before, after):
+    if before is None or after is None:
+        return {}
+    result = {}
+    for view, (total, count) in after.items():
+        prev_total, prev_count = before.get(view, (0.0, 0.0))
+        if count > prev_count:
+            result[view] = round((total - prev_total) / (count - prev_count), 2)
+    return result
+
+
+# --------------------------- Running ---------------------------
+
+def run_journey(base, journey, targets, concurrency, duration, seed) -> dict:
+    lock = threading.Lock()
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    step_latencies, step_errors = [], 0  # journey totals leave setup (logins) out
+    iterations = failed = 0
+    deadline = time.monotonic() + duration
+
+    def record(view, seconds, ok, setup):
+        nonlocal step_errors
+        with lock:
+            if ok:
+                latencies[view].append(seconds)
+                if not setup:
+                    step_latencies.append(seconds)
+            else:
+                errors[view] += 1
+                step_errors += not setup
+
+    def virtual_user(n):
+        nonlocal iterations, failed
+        user = VirtualUser(Client(base), targets, random.Random(seed * 1000 + n), record)
+        done = bad = 0
+        try:
+            if journey.setup:
+                user.in_setup = True
+                journey.setup(user)
+                user.in_setup = False
+            while time.monotonic() < deadline:
+                try:
+                    journey.step(user)
+                    done += 1
+                except JourneyError:
+                    bad += 1
+        except JourneyError:
+            bad += 1  # setup failed: this user is out
+        finally:
+            user.client.close()
+            with lock:
+                iterations += done
+                failed += bad
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=virtual_user, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    views = {view: summarize(latencies[view], errors[view], elapsed) for view in sorted(set(latencies) | set(errors))}
+    overall = summarize(step_latencies, step_errors, elapsed)
+    return {"iterations": iterations, "failed_iterations": failed, **overall, "views": views}
+
+
+def git_revision() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=BENCH_DIR, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, cwd=BENCH_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{rev}-dirty" if dirty else rev
+
+
+def run(args) -> dict:
+    targets = load_targets(args.password)
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "label": args.label,
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "base": args.base,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "python": platform.python_version(),
+            "data": targets["counts"],
+        },
+        "journeys": {},
+    }
+    for name in args.journeys:
+        journey = JOURNEYS[name]
+        if args.warmup:
+            run_journey(args.base, journey, targets, args.concurrency, args.warmup, args.seed + 1)
+        before = settled_scrape(args.base, args.metrics_token, args.settle)
+        result = run_journey(args.base, journey, targets, args.concurrency, args.duration, args.seed)
+        per_view = queries_per_request(before, settled_scrape(args.base, args.metrics_token, args.settle))
+        for view, stats in result["views"].items():
+            stats["queries_per_request"] = per_view.get(view)
+        report["journeys"][name] = result
+        print(f"{name:8} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f}  p95 {result['p95_ms']:7.1f}  "
+              f"p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}", file=sys.stderr)
+        if before is None:
+            print("  (no /metrics: queries per request not measured)", file=sys.stderr)
+    return report
+
+
+# --------------------------- Comparing ---------------------------
+
+def _change(old, new):
+    if old is None or new is None:
+        return "—"
+    if not old:
+        return f"{new}"
+    return f"{new} ({(new - old) / old:+.0%})"
+
+
+def compare(old, new) -> str:
+    """Side-by-side of two reports, per journey and view."""
+    lines = [f"{old['meta']['revision']} -> {new['meta']['revision']}"]
+    for name, result in new["journeys"].items():
+        before = old["journeys"].get(name)
+        if before is None:
+            continue
+        lines.append(f"\n{name}: req/s {_change(before['rps'], result['rps'])}")
+        for view, stats in result["views"].items():
+            prev = before["views"].get(view, {})
+            lines.append(
+                f"  {view:28} p50 {_change(prev.get('p50_ms'), stats['p50_ms']):>18}"
+                f"  p95 {_change(prev.get('p95_ms'), stats['p95_ms']):>18}"
+                f"  p99 {_change(prev.get('p99_ms'), stats['p99_ms']):>18}"
+                f"  queries {_change(prev.get('queries_per_request'), stats['queries_per_request']):>14}"
+            )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base", help="server root, e.g. http://127.0.0.1:8011")
+    parser.add_argument("--journeys", nargs="+", choices=sorted(JOURNEYS), default=list(JOURNEYS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="", help="free text kept in the report, e.g. the server command")
+    parser.add_argument("--password", default=None, help="password of the seeded users")
+    parser.add_argument("--metrics-token", default=os.getenv("METRICS_TOKEN", ""))
+    parser.add_argument("--settle", type=int, default=16, help="scrapes before each /metrics reading")
+    parser.add_argument("--out", help="report path (default: benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", help="an earlier report to print the differences against")
+    args = parser.parse_args()
+    args.base = args.base.rstrip("/")
+
+    # targets come from the ORM
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ReServe.settings")
+    import django
+    django.setup()
+    if args.password is None:
+        from main.seeding import DEFAULT_PASSWORD
+        args.password = DEFAULT_PASSWORD
+
+    report = run(args)
+    out = Path(args.out) if args.out else BENCH_DIR / "results" / f"{report['meta']['revision']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"wrote {out}", file=sys.stderr)
+    if args.compare:
+        print(compare(json.loads(Path(args.compare).read_text()), report))
+
+
+if __name__ == "__main__":
+    main()
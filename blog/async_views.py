@@ -0,0 +1,67 @@
+"""
+Async variants of the read-only blog pages and feeds, routed in place of
+the ones in ``blog.views`` when ``settings.ASYNC_VIEWS`` is on (ASGI).
+
+Same querysets, templates and conditional-GET rules as the sync views;
+only the database reads go through the async ORM.
+"""
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import render
+from django.views.decorators.http import condition
+
+from blog.feeds import CONTENT_TYPES, FEED_CHUNK_SIZE, afeed_state, astream_serialized
+from blog.models import Blog
+from blog.views import BLOG_PAGE_SIZE, _blog_list, _feed_etag, _feed_last_modified, _feed_queryset
+from ReServe.async_utils import resolve_user
+
+
+async def main_blog(request):
+    await resolve_user(request)
+    blog_list, filter_type = _blog_list(request)
+    paginator = Paginator(blog_list, BLOG_PAGE_SIZE)
+    # prime the cached count so get_page() does not run it synchronously
+    paginator.count = await blog_list.acount()
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = [blog async for blog in page_obj.object_list]
+    context = {
+        'blog_list': page_obj,
+        'page_obj': page_obj,
+        'filter_type': filter_type,
+    }
+    return render(request, "main_blog.html", context)
+
+
+async def blog_details(request, id):
+    await resolve_user(request)
+    try:
+        blog = await Blog.objects.select_related('user').aget(pk=id)
+    except Blog.DoesNotExist:
+        raise Http404("No Blog matches the given query.")
+    return render(request, "blog_details.html", {'blog': blog})
+
+
+def _feed_view(fmt):
+    # condition() calls the sync ETag / Last-Modified helpers; they read the
+    # state memoized on the request, which is aggregated asynchronously first
+    @condition(etag_func=_feed_etag(fmt), last_modified_func=_feed_last_modified)
+    async def respond(request, qs):
+        return StreamingHttpResponse(
+            astream_serialized(fmt, qs, chunk_size=FEED_CHUNK_SIZE),
+            content_type=CONTENT_TYPES[fmt],
+        )
+
+    async def view(request):
+        try:
+            qs, since = _feed_queryset(request)
+        except ValueError as exc:
+            return HttpResponseBadRequest(str(exc))
+        request._blog_feed_state = (await afeed_state(qs), since)
+        return await respond(request, qs)
+
+    view.__name__ = f"show_{fmt}"
+    return view
+
+
+show_xml = _feed_view("xml")
+show_json = _feed_view("json")
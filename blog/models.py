@@ -9,6 +9,13 @@ class Blog(models.Model):
     content = models.TextField()
     thumbnail = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='blog_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='blog_user_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""Background tasks for the blog app (run by ``manage.py run_workers``)."""
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from blog.feeds import stream_serialized
+from blog.models import Blog
+from jobs.queue import task
+
+
+@task
+def export_blog(fmt: str = "json") -> dict:
+    """Write the full blog feed to media storage; returns its name and URL."""
+    qs = Blog.objects.order_by("created_at", "pk")
+    with tempfile.TemporaryFile() as tmp:
+        for chunk in stream_serialized(fmt, qs):
+            tmp.write(chunk.encode())
+        tmp.seek(0)
+        name = default_storage.save(f"exports/blog-{timezone.now():%Y%m%d-%H%M%S}.{fmt}", File(tmp))
+    return {"name": name, "url": default_storage.url(name)}
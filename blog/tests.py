@@ -1,3 +1,183 @@
-from django.test import TestCase
+from __future__ import annotations
 
-# Create your tests here.
+import json
+from unittest import mock
+from xml.etree import ElementTree
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core import serializers
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog import async_views
+from blog.models import Blog
+from blog.views import BLOG_PAGE_SIZE
+
+User = get_user_model()
+
+
+class BlogListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            User.objects.create_user(username=f"author{i}", password="pass12345", handle=f"author_{i}")
+            for i in range(3)
+        ]
+
+    def make_posts(self, n):
+        Blog.objects.bulk_create([
+            Blog(user=self.authors[i % len(self.authors)], title=f"Post {i}", content="Body")
+            for i in range(n)
+        ])
+
+    def list_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("blog:main_blog"), params)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp
+
+    def test_query_count_does_not_grow_with_posts(self):
+        self.make_posts(3)
+        few, _ = self.list_queries()
+        self.make_posts(BLOG_PAGE_SIZE * 2)
+        many, resp = self.list_queries()
+        self.assertEqual(few, many)
+        # COUNT for the paginator + one page query with authors joined in
+        with self.assertNumQueries(2):
+            self.client.get(reverse("blog:main_blog"))
+        self.assertEqual(len(resp.context["blog_list"]), BLOG_PAGE_SIZE)
+
+    def test_logged_in_owner_view_has_fixed_query_count(self):
+        self.make_posts(5)
+        self.client.login(username="author0", password="pass12345")
+        few, _ = self.list_queries()
+        self.make_posts(BLOG_PAGE_SIZE)
+        many, resp = self.list_queries(filter="my")
+        self.assertEqual(few, many)
+        self.assertTrue(all(b.user_id == self.authors[0].pk for b in resp.context["blog_list"]))
+
+    def test_newest_first_and_paginated(self):
+        self.make_posts(BLOG_PAGE_SIZE + 1)
+        _, resp = self.list_queries()
+        page = resp.context["page_obj"]
+        dates = [b.created_at for b in page]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        self.assertTrue(page.has_next())
+        _, resp = self.list_queries(page=2)
+        self.assertEqual(len(resp.context["blog_list"]), 1)
+
+    def test_my_filter_for_anonymous_is_empty(self):
+        self.make_posts(2)
+        _, resp = self.list_queries(filter="my")
+        self.assertEqual(len(resp.context["blog_list"]), 0)
+
+
+class BlogFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="writer", password="pass12345", handle="writer_1")
+        cls.posts = [Blog.objects.create(user=cls.author, title=f"Post {i}", content="Body") for i in range(5)]
+
+    def body(self, resp):
+        self.assertTrue(resp.streaming)
+        return b"".join(resp.streaming_content)
+
+    def test_json_feed_streams_same_payload_as_serializer(self):
+        with mock.patch("blog.views.FEED_CHUNK_SIZE", 2):  # force several batches
+            resp = self.client.get(reverse("blog:show_json"))
+        self.assertEqual(resp["Content-Type"], "application/json; charset=utf-8")
+        data = json.loads(self.body(resp))
+        expected = json.loads(serializers.serialize("json", Blog.objects.order_by("created_at", "pk")))
+        self.assertEqual(data, expected)
+
+    def test_xml_feed_is_well_formed(self):
+        with mock.patch("blog.views.FEED_CHUNK_SIZE", 2):
+            resp = self.client.get(reverse("blog:show_xml"))
+        self.assertEqual(resp["Content-Type"], "application/xml; charset=utf-8")
+        root = ElementTree.fromstring(self.body(resp))
+        self.assertEqual(len(root.findall("object")), 5)
+
+    def test_unchanged_feed_returns_304_without_serializing(self):
+        url = reverse("blog:show_json")
+        first = self.client.get(url)
+        etag, last_modified = first["ETag"], first["Last-Modified"]
+        self.body(first)
+
+        with mock.patch("blog.views.stream_serialized") as stream, self.assertNumQueries(1):
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        stream.assert_not_called()
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        post = self.posts[0]
+        post.title = "Edited"
+        post.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_since_returns_only_newer_posts(self):
+        cutoff = self.posts[2].created_at
+        resp = self.client.get(reverse("blog:show_json"), {"since": cutoff.isoformat()})
+        titles = [o["fields"]["title"] for o in json.loads(self.body(resp))]
+        self.assertEqual(titles, ["Post 3", "Post 4"])
+        self.assertEqual(self.client.get(reverse("blog:show_json"), {"since": "yesterday"}).status_code, 400)
+
+    def test_by_id_endpoints(self):
+        post = self.posts[0]
+        resp = self.client.get(reverse("blog:show_json_by_id", args=[post.pk]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/json; charset=utf-8")
+        self.assertEqual(self.client.get(reverse("blog:show_xml_by_id", args=["nope"])).status_code, 404)
+
+
+def async_get(path, user=None, headers=None, **params):
+    """An AsyncRequestFactory GET with the auth middleware's ``auser`` in place."""
+    request = AsyncRequestFactory().get(path, params, headers=headers)
+    user = user or AnonymousUser()
+
+    async def auser():
+        return user
+
+    request.auser = auser
+    return request
+
+
+class AsyncBlogViewTests(TestCase):
+    """The ASGI variants serve the same bytes and honour the same validators."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="asyncwriter", password="pass12345", handle="async_writer")
+        cls.posts = [Blog.objects.create(user=cls.author, title=f"Post {i}", content="Body") for i in range(5)]
+
+    async def body(self, resp):
+        return b"".join([chunk async for chunk in resp.streaming_content])
+
+    def sync_feed(self, fmt):
+        resp = self.client.get(reverse(f"blog:show_{fmt}"))
+        return resp["ETag"], b"".join(resp.streaming_content)
+
+    async def test_feeds_match_sync_output(self):
+        for fmt in ("json", "xml"):
+            with mock.patch("blog.async_views.FEED_CHUNK_SIZE", 2):  # force several batches
+                resp = await getattr(async_views, f"show_{fmt}")(async_get(f"/blog/{fmt}/"))
+                body = await self.body(resp)
+            self.assertEqual((resp["ETag"], body), await sync_to_async(self.sync_feed)(fmt))
+
+    async def test_unchanged_feed_returns_304(self):
+        first = await async_views.show_json(async_get("/blog/json/"))
+        resp = await async_views.show_json(async_get("/blog/json/", headers={"If-None-Match": first["ETag"]}))
+        self.assertEqual(resp.status_code, 304)
+        resp = await async_views.show_json(async_get("/blog/json/", since="yesterday"))
+        self.assertEqual(resp.status_code, 400)
+
+    def test_list_and_detail(self):
+        with self.assertNumQueries(2):  # COUNT + one page with authors joined
+            resp = async_to_sync(async_views.main_blog)(async_get("/blog/"))
+        self.assertContains(resp, "Post 4")
+        request = async_get("/blog/", user=self.author)
+        resp = async_to_sync(async_views.blog_details)(request, id=self.posts[0].pk)
+        self.assertContains(resp, "Post 0")
@@ -1,16 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from blog.views import main_blog, create_blog, blog_details, show_json_by_id, show_xml, show_json, show_xml_by_id, edit_blog, delete_blog
+from blog.views import main_blog, create_blog, blog_details, show_json_by_id, show_xml, show_json, show_xml_by_id, edit_blog, delete_blog, export_feed
 
 app_name = 'blog'
 
+# Under ASGI the read-only pages and feeds are served by their async variants
+if settings.ASYNC_VIEWS:
+    from blog.async_views import main_blog, blog_details, show_xml, show_json
+
 urlpatterns = [
     path('', main_blog, name='main_blog'),
     path('create-blog/', create_blog, name='create_blog'),
     path('blog/<str:id>/', blog_details, name='blog_details'),
     path('xml/', show_xml, name='show_xml'),
     path('json/', show_json, name='show_json'),
+    path('export/<str:fmt>/', export_feed, name='export_feed'),
     path('xml/<str:id>/', show_xml_by_id, name='show_xml_by_id'),
     path('json/<str:id>/', show_json_by_id, name='show_json_by_id'),
     path('edit/<str:id>/', edit_blog, name='edit_blog'),
     path('delete/<str:id>/', delete_blog, name='delete_blog'),
-]
\ No newline at end of file
+]
@@ -1,20 +1,38 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from blog.forms import BlogForm
 from blog.models import Blog
+from blog.tasks import export_blog
+from blog.feeds import CONTENT_TYPES, FEED_CHUNK_SIZE, feed_etag, feed_state, parse_since, stream_serialized
 from django.utils import timezone
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.core import serializers
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.urls import reverse
+from django.views.decorators.http import condition, require_POST
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 
-def main_blog(request):
-    filter_type = request.GET.get('filter', 'all') 
+BLOG_PAGE_SIZE = 12
+
+def _blog_list(request):
+    """The list queryset for ``?filter=`` (also used by blog.async_views)."""
+    filter_type = request.GET.get('filter', 'all')
+    # authors come in the same query (no per-card lookup); newest first via the created_at index
+    blog_list = Blog.objects.select_related('user').order_by('-created_at', '-pk')
     if filter_type == 'my':
-        blog_list = Blog.objects.filter(user=request.user)
-    else:
-        blog_list = Blog.objects.all()
+        if request.user.is_authenticated:
+            blog_list = blog_list.filter(user=request.user)
+        else:
+            blog_list = blog_list.none()
+    return blog_list, filter_type
+
+def main_blog(request):
+    blog_list, filter_type = _blog_list(request)
+    page_obj = Paginator(blog_list, BLOG_PAGE_SIZE).get_page(request.GET.get('page'))
     context = {
-        'blog_list': blog_list,
+        'blog_list': page_obj,
+        'page_obj': page_obj,
         'filter_type': filter_type,
     }
     return render(request, "main_blog.html", context)
@@ -31,7 +49,7 @@ def create_blog(request):
     return render(request, "create_blog.html", {"form": form})
 
 def blog_details(request, id):
-    blog = get_object_or_404(Blog, pk=id)
+    blog = get_object_or_404(Blog.objects.select_related('user'), pk=id)
 
     context = {
         'blog': blog
@@ -39,30 +57,74 @@ def blog_details(request, id):
 
     return render(request, "blog_details.html", context)
 
+def _feed_queryset(request):
+    """Oldest first, so pollers can pass the last created_at back as ?since=."""
+    qs = Blog.objects.order_by('created_at', 'pk')
+    since = parse_since(request.GET.get('since'))
+    if since:
+        qs = qs.filter(created_at__gt=since)
+    return qs, since
+
+
+def _feed_state(request):
+    # memoized: condition() asks for the ETag and Last-Modified separately
+    if not hasattr(request, '_blog_feed_state'):
+        qs, since = _feed_queryset(request)
+        request._blog_feed_state = (feed_state(qs), since)
+    return request._blog_feed_state
+
+
+def _feed_etag(fmt):
+    def etag(request, *args, **kwargs):
+        try:
+            state, since = _feed_state(request)
+        except ValueError:
+            return None
+        return feed_etag(fmt, state, since)
+    return etag
+
+
+def _feed_last_modified(request, *args, **kwargs):
+    try:
+        state, _ = _feed_state(request)
+    except ValueError:
+        return None
+    return state['last_modified']
+
+
+def _stream_feed(request, fmt):
+    try:
+        qs, _ = _feed_queryset(request)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    return StreamingHttpResponse(
+        stream_serialized(fmt, qs, chunk_size=FEED_CHUNK_SIZE),
+        content_type=CONTENT_TYPES[fmt],
+    )
+
+
+@condition(etag_func=_feed_etag("xml"), last_modified_func=_feed_last_modified)
 def show_xml(request):
-    blog_list = Blog.objects.all()
-    xml_data = serializers.serialize("xml", blog_list)
-    return HttpResponse(xml_data, content_type="blog/xml")
+    return _stream_feed(request, "xml")
 
+@condition(etag_func=_feed_etag("json"), last_modified_func=_feed_last_modified)
 def show_json(request):
-    blog_list = Blog.objects.all()
-    json_data = serializers.serialize("json", blog_list)
-    return HttpResponse(json_data, content_type="blog/json")
+    return _stream_feed(request, "json")
 
-def show_xml_by_id(request, blog_id):
+def show_xml_by_id(request, id):
     try:
-        blog_item = Blog.objects.filter(pk=blog_id)
-        xml_data = serializers.serialize("xml", blog_item)
-        return HttpResponse(xml_data, content_type="blog/xml")
-    except Blog.DoesNotExist:
+        blog_item = Blog.objects.get(pk=id)
+        xml_data = serializers.serialize("xml", [blog_item])
+        return HttpResponse(xml_data, content_type=CONTENT_TYPES["xml"])
+    except (Blog.DoesNotExist, ValidationError):
         return HttpResponse(status=404)
     
-def show_json_by_id(request, blog_id):
+def show_json_by_id(request, id):
     try:
-        blog_item = Blog.objects.get(pk=blog_id)
+        blog_item = Blog.objects.get(pk=id)
         json_data = serializers.serialize("json", [blog_item])
-        return HttpResponse(json_data, content_type="application/json")
-    except Blog.DoesNotExist:
+        return HttpResponse(json_data, content_type=CONTENT_TYPES["json"])
+    except (Blog.DoesNotExist, ValidationError):
         return HttpResponse(status=404)
     
 @login_required
@@ -86,3 +148,15 @@ def delete_blog(request, id):
         return redirect('blog:main_blog')
     blog.delete()
     return redirect('blog:main_blog')
+
+@login_required
+@require_POST
+def export_feed(request, fmt):
+    """Queue a full export file of the feed; poll the returned status URL for its link."""
+    if fmt not in CONTENT_TYPES:
+        return HttpResponse(status=404)
+    job = export_blog.enqueue(fmt, owner=request.user)
+    return JsonResponse(
+        {"job": job.pk, "status": job.status, "status_url": reverse('jobs:status', args=[job.pk])},
+        status=202,
+    )
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Booking
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ("id", "gym_class", "user", "status", "created_at", "cancelled_at")
+    list_filter = ("status",)
+    search_fields = ("user__username", "gym_class__name", "idempotency_key")
+    raw_id_fields = ("gym_class", "user")
@@ -0,0 +1,10 @@
+from django.conf import settings
+
+
+def live_seats(request):
+    """
+    ``live_seats``: whether pages load static/js/live-seats.js.  Only under
+    ASGI (``settings.ASYNC_VIEWS``): on WSGI every open seat stream would hold
+    a sync worker for as long as the tab stays open.
+    """
+    return {"live_seats": settings.ASYNC_VIEWS}
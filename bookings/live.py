@@ -0,0 +1,242 @@
+"""
+Live seat counts for server-sent events (``bookings.views.seat_stream``).
+
+One ``SeatHub`` per process fans changes out to every open stream:
+
+* Booking code calls ``publish(class_id)`` after commit.  Locally that just
+  marks the class dirty; with ``SEATS_PUBSUB = "redis"`` it is published on
+  a Redis channel and every process's hub picks it up.
+* The hub's thread waits a few milliseconds so a burst of changes coalesces,
+  then reads the seat counters for all dirty classes in ONE query and wakes
+  each subscriber on its own event loop.  A thousand streams watching one
+  class cost one read per change, not one poll per client.
+* Without Redis, changes made in other processes (other workers, WSGI,
+  admin) are caught by the hub re-reading every watched class every
+  ``SEATS_POLL_INTERVAL`` seconds: still one query per process per tick.
+
+Subscribers only ever see the latest state: a slow client skips
+intermediate counts instead of queueing them.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from home_search.models import Class
+
+logger = logging.getLogger("reserve.live")
+
+CHANNEL = "reserve:seats"
+SEAT_FIELDS = ("pk", "capacity", "seats_left", "waitlist_count")
+
+
+def _payload(row) -> dict:
+    return {
+        "id": row["pk"],
+        "capacity": row["capacity"],
+        "seats_left": row["seats_left"],
+        "waitlist": row["waitlist_count"],
+    }
+
+
+class Subscription:
+    """One SSE client's interest in a set of classes. Create inside the client's event loop."""
+
+    def __init__(self, hub: "SeatHub", class_ids):
+        self.hub = hub
+        self.class_ids = frozenset(class_ids)
+        self.loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._pending = set()
+
+    def _wake(self, ids) -> None:  # runs on self.loop
+        self._pending.update(ids)
+        self._event.set()
+
+    async def changes(self, timeout: float) -> list[dict]:
+        """Latest payloads of classes that changed; [] if nothing did within ``timeout``."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._event.clear()
+        ids, self._pending = self._pending, set()
+        return [p for p in (self.hub.latest(pk) for pk in sorted(ids)) if p is not None]
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class SeatHub:
+    def __init__(self, poll_interval: float | None = 2.0, debounce: float = 0.05, redis_url: str | None = None):
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.redis_url = redis_url
+        self.reads = 0  # seat queries issued by the hub (stats / tests)
+        self._lock = threading.Lock()
+        self._subs = defaultdict(set)   # class id -> {Subscription}
+        self._latest = {}               # class id -> last payload, for watched classes
+        self._dirty = set()
+        self._wakeup = threading.Event()
+        self._threads = []
+
+    # ---- subscribers ----
+
+    def subscribe(self, class_ids) -> Subscription:
+        sub = Subscription(self, class_ids)
+        with self._lock:
+            for pk in sub.class_ids:
+                self._subs[pk].add(sub)
+        self._start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            for pk in sub.class_ids:
+                subs = self._subs.get(pk)
+                if subs is None:
+                    continue
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[pk]
+                    self._latest.pop(pk, None)
+
+    def latest(self, pk):
+        return self._latest.get(pk)
+
+    def snapshot(self, class_ids) -> list[dict]:
+        """Current payloads (sync). Classes other streams already watch cost no query."""
+        missing = [pk for pk in class_ids if pk not in self._latest]
+        if missing:
+            self._refresh(missing)
+        return [p for p in (self._latest.get(pk) for pk in class_ids) if p is not None]
+
+    @property
+    def watched(self) -> int:
+        return len(self._subs)
+
+    # ---- publishers ----
+
+    def notify(self, *class_ids) -> None:
+        """Mark classes as changed; safe from any thread."""
+        with self._lock:
+            self._dirty.update(pk for pk in class_ids if pk in self._subs)
+            if not self._dirty:
+                return
+        self._wakeup.set()
+
+    # ---- hub thread ----
+
+    def _start(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            targets = [self._run]
+            if self.redis_url:
+                targets.append(self._listen_redis)
+            for target in targets:
+                thread = threading.Thread(target=target, name=f"seat-hub-{target.__name__}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            woke = self._wakeup.wait(self.poll_interval)
+            if woke:
+                time.sleep(self.debounce)  # let a burst of changes share one read
+            self._wakeup.clear()
+            with self._lock:
+                ids = set(self._dirty) if woke else set(self._subs)
+                self._dirty.clear()
+            if not ids:
+                continue
+            try:
+                changed = self._refresh(ids)
+            except Exception:
+                logger.exception("seat refresh failed")
+                continue
+            finally:
+                close_old_connections()  # this thread never sees request_finished
+            self._dispatch(changed)
+
+    def _refresh(self, ids) -> set:
+        rows = list(Class.objects.filter(pk__in=list(ids)).values(*SEAT_FIELDS))
+        changed = set()
+        with self._lock:
+            self.reads += 1
+            for row in rows:
+                payload = _payload(row)
+                if self._latest.get(payload["id"]) != payload:
+                    changed.add(payload["id"])
+                if payload["id"] in self._subs:
+                    self._latest[payload["id"]] = payload
+        return changed
+
+    def _dispatch(self, changed) -> None:
+        per_sub = defaultdict(set)
+        with self._lock:
+            for pk in changed:
+                for sub in self._subs.get(pk, ()):
+                    per_sub[sub].add(pk)
+        for sub, ids in per_sub.items():
+            try:
+                sub.loop.call_soon_threadsafe(sub._wake, ids)
+            except RuntimeError:  # that client's loop is gone
+                self.unsubscribe(sub)
+
+    def _listen_redis(self) -> None:
+        import redis  # optional dependency, only with SEATS_PUBSUB = "redis"
+
+        while True:
+            try:
+                pubsub = redis.Redis.from_url(self.redis_url).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    self.notify(int(message["data"]))
+            except Exception:
+                logger.exception("seat channel listener failed; reconnecting")
+                time.sleep(1)
+
+
+_hub = None
+_redis = None
+
+
+def _use_redis() -> bool:
+    return getattr(settings, "SEATS_PUBSUB", "local") == "redis"
+
+
+def get_hub() -> SeatHub:
+    global _hub
+    if _hub is None:
+        redis_url = settings.SEATS_REDIS_URL if _use_redis() else None
+        _hub = SeatHub(
+            # with Redis every change is announced, no need to poll
+            poll_interval=None if redis_url else getattr(settings, "SEATS_POLL_INTERVAL", 2.0),
+            redis_url=redis_url,
+        )
+    return _hub
+
+
+def publish(class_id) -> None:
+    """Announce a seat change. Call after commit (``transaction.on_commit``)."""
+    global _redis
+    if _use_redis():
+        try:
+            if _redis is None:
+                import redis
+
+                _redis = redis.Redis.from_url(settings.SEATS_REDIS_URL)
+            _redis.publish(CHANNEL, class_id)
+            return
+        except Exception:
+            logger.exception("could not publish seat change for class %s", class_id)
+    get_hub().notify(class_id)
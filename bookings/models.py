@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+from home_search.models import Class
+
+
+class Booking(models.Model):
+    CONFIRMED = "confirmed"
+    WAITLISTED = "waitlisted"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (CONFIRMED, "Confirmed"),
+        (WAITLISTED, "Waitlisted"),
+        (CANCELLED, "Cancelled"),
+    ]
+    ACTIVE = (CONFIRMED, WAITLISTED)
+
+    gym_class = models.ForeignKey(Class, on_delete=models.CASCADE, related_name="bookings")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="bookings")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=CONFIRMED)
+    # client-supplied retry token: the same key always maps to the same booking
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+    # 1-based place in the class's FIFO waitlist (kept dense), None otherwise
+    waitlist_position = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at", "pk"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["gym_class", "user"], condition=Q(status__in=["confirmed", "waitlisted"]),
+                name="booking_one_active_per_user",
+            ),
+            models.UniqueConstraint(fields=["user", "idempotency_key"], name="booking_user_idempotency_key"),
+        ]
+        indexes = [
+            models.Index(fields=["gym_class", "status"], name="booking_class_status_idx"),
+            models.Index(fields=["gym_class", "waitlist_position"], name="booking_class_waitlist_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} → {self.gym_class} ({self.status})"
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in self.ACTIVE
+
+    @property
+    def is_waitlisted(self) -> bool:
+        return self.status == self.WAITLISTED
@@ -0,0 +1,176 @@
+"""
+Seat reservation and waitlist for classes.
+
+Capacity is enforced by a single conditional decrement::
+
+    UPDATE home_search_class SET seats_left = seats_left - 1
+     WHERE id = %s AND seats_left > 0
+
+The database applies it atomically per row, so any number of concurrent
+requests can never take more seats than exist: a request either gets a
+seat or sees 0 rows updated.  The decrement and the Booking insert share a
+transaction, so a failed insert hands the seat straight back.
+
+Retries are safe with an ``idempotency_key``: the same key for the same user
+always returns the booking it first created (enforced by a unique
+constraint, not a read-then-write check).
+
+Waitlist: a full class queues further bookings FIFO.  Every waitlisted
+Booking stores its own 1-based ``waitlist_position`` (kept dense), so "where
+am I?" is a single-row read.  Anything that changes the queue (join, leave,
+promotion) first locks the Class row, so per class those changes run one at
+a time; a freed seat goes to the head of the queue in the same transaction
+that freed it.
+"""
+from __future__ import annotations
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from bookings import live
+from bookings.models import Booking
+from home_search.caching import bump_classes_version
+from home_search.models import Class
+from ReServe import conditional
+
+
+class BookingError(Exception):
+    """Base class for reservation failures shown to the user."""
+
+
+class ClassFull(BookingError):
+    pass
+
+
+class AlreadyBooked(BookingError):
+    pass
+
+
+def _announce(class_id) -> None:
+    """
+    Once the transaction commits: drop the detail page's cached version
+    stamp, retire the cached anonymous grids (search shows seat counts and
+    nothing corrects them on WSGI) and push the new counts to live streams.
+    """
+    def changed():
+        conditional.forget(Class, class_id)
+        bump_classes_version()
+        live.publish(class_id)
+    transaction.on_commit(changed)
+
+
+def _take_seat(class_id) -> bool:
+    return bool(
+        Class.objects.filter(pk=class_id, seats_left__gt=0).update(seats_left=F("seats_left") - 1, updated_at=timezone.now())
+    )
+
+
+def _lock_class(class_id) -> Class:
+    """Serialize queue changes for one class (row lock; SQLite locks the database)."""
+    return Class.objects.select_for_update().only(*Class.COUNTER_FIELDS).get(pk=class_id)
+
+
+def _join_waitlist(class_id, user, key) -> Booking:
+    _lock_class(class_id)
+    # a seat may have been freed (with nobody waiting) since our decrement failed
+    if _take_seat(class_id):
+        return Booking.objects.create(gym_class_id=class_id, user=user, idempotency_key=key)
+    Class.objects.filter(pk=class_id).update(waitlist_count=F("waitlist_count") + 1, updated_at=timezone.now())
+    position = Class.objects.values_list("waitlist_count", flat=True).get(pk=class_id)
+    return Booking.objects.create(
+        gym_class_id=class_id, user=user, idempotency_key=key,
+        status=Booking.WAITLISTED, waitlist_position=position,
+    )
+
+
+def _promote(class_id) -> int:
+    """
+    Hand free seats to the head of the waitlist. Caller holds the class lock.
+    Returns the number of bookings promoted.
+    """
+    locked = _lock_class(class_id)
+    n = min(locked.seats_left, locked.waitlist_count)
+    if n <= 0:
+        return 0
+    waiting = Booking.objects.filter(gym_class_id=class_id, status=Booking.WAITLISTED)
+    waiting.filter(waitlist_position__lte=n).update(status=Booking.CONFIRMED, waitlist_position=None)
+    waiting.update(waitlist_position=F("waitlist_position") - n)
+    Class.objects.filter(pk=class_id).update(
+        seats_left=F("seats_left") - n, waitlist_count=F("waitlist_count") - n, updated_at=timezone.now(),
+    )
+    return n
+
+
+def _replay(user, key):
+    return Booking.objects.filter(user=user, idempotency_key=key).first() if key else None
+
+
+def reserve(gym_class, user, idempotency_key: str | None = None, waitlist: bool = False) -> Booking:
+    """
+    Book one seat for ``user``. When the class is full, raise ClassFull or,
+    with ``waitlist=True``, queue a WAITLISTED booking. Raises AlreadyBooked
+    if the user already holds a seat or a waitlist place.
+    """
+    class_id = getattr(gym_class, "pk", gym_class)
+    key = (idempotency_key or "").strip()[:64] or None
+
+    replay = _replay(user, key)
+    if replay is not None:
+        return replay
+    if Booking.objects.filter(gym_class_id=class_id, user=user, status__in=Booking.ACTIVE).exists():
+        raise AlreadyBooked("You already have a seat in this class.")
+    try:
+        with transaction.atomic():
+            _announce(class_id)
+            if _take_seat(class_id):
+                return Booking.objects.create(gym_class_id=class_id, user=user, idempotency_key=key)
+            if not waitlist:
+                raise ClassFull("This class is full.")
+            return _join_waitlist(class_id, user, key)
+    except IntegrityError:
+        # lost a race with a retry of the same request, or already booked;
+        # either way the counters changed above were rolled back
+        replay = _replay(user, key)
+        if replay is not None:
+            return replay
+        raise AlreadyBooked("You already have a seat in this class.")
+
+
+def cancel(booking: Booking) -> bool:
+    """
+    Give up a seat or a waitlist place. A freed seat goes to the head of the
+    waitlist in the same transaction. Returns False if the booking was not active.
+    """
+    class_id = booking.gym_class_id
+    with transaction.atomic():
+        _lock_class(class_id)
+        current = (
+            Booking.objects.filter(pk=booking.pk, status__in=Booking.ACTIVE)
+            .values_list("status", "waitlist_position").first()
+        )
+        if current is None:
+            return False
+        status, position = current
+        _announce(class_id)
+        Booking.objects.filter(pk=booking.pk).update(
+            status=Booking.CANCELLED, cancelled_at=timezone.now(), waitlist_position=None,
+        )
+        if status == Booking.CONFIRMED:
+            Class.objects.filter(pk=class_id).update(seats_left=F("seats_left") + 1, updated_at=timezone.now())
+            _promote(class_id)
+        else:
+            Booking.objects.filter(
+                gym_class_id=class_id, status=Booking.WAITLISTED, waitlist_position__gt=position,
+            ).update(waitlist_position=F("waitlist_position") - 1)
+            Class.objects.filter(pk=class_id).update(waitlist_count=F("waitlist_count") - 1, updated_at=timezone.now())
+    booking.refresh_from_db(fields=["status", "cancelled_at", "waitlist_position"])
+    return True
+
+
+def fill_from_waitlist(gym_class) -> int:
+    """Promote waitlisted bookings into free seats (e.g. after a capacity increase)."""
+    class_id = getattr(gym_class, "pk", gym_class)
+    with transaction.atomic():
+        _announce(class_id)
+        return _promote(class_id)
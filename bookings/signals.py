@@ -0,0 +1,15 @@
+# bookings/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from home_search.models import Class
+
+from . import services
+
+
+@receiver(post_save, sender=Class)
+def class_saved(sender, instance, created, **kwargs):
+    # a capacity increase frees seats: hand them to the waitlist right away
+    # (reads the live counters, the instance's may be stale)
+    if not created:
+        services.fill_from_waitlist(instance)
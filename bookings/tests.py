@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from bookings import live, services
+from bookings.models import Booking
+from home_search.models import Class
+from main.testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+def make_users(n, prefix="u"):
+    User.objects.bulk_create([
+        User(username=f"{prefix}{i}", handle=f"{prefix}_{i}", password="!") for i in range(n)
+    ])
+    return list(User.objects.filter(username__startswith=prefix).order_by("pk"))
+
+
+class ReservationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gym_class = Class.objects.create(name="Spin", category="dance", capacity=2)
+        cls.users = make_users(3)
+
+    def seats_left(self):
+        return Class.objects.get(pk=self.gym_class.pk).seats_left
+
+    def test_new_class_starts_with_full_capacity(self):
+        self.assertEqual(self.gym_class.seats_left, 2)
+
+    def test_reserve_until_full(self):
+        services.reserve(self.gym_class, self.users[0])
+        services.reserve(self.gym_class, self.users[1])
+        self.assertEqual(self.seats_left(), 0)
+        with self.assertRaises(services.ClassFull):
+            services.reserve(self.gym_class, self.users[2])
+        self.assertEqual(Booking.objects.filter(status=Booking.CONFIRMED).count(), 2)
+
+    def test_double_booking_rejected_and_seat_kept(self):
+        services.reserve(self.gym_class, self.users[0])
+        with self.assertRaises(services.AlreadyBooked):
+            services.reserve(self.gym_class, self.users[0])
+        self.assertEqual(self.seats_left(), 1)
+
+    def test_idempotency_key_replays_same_booking(self):
+        first = services.reserve(self.gym_class, self.users[0], idempotency_key="abc")
+        again = services.reserve(self.gym_class, self.users[0], idempotency_key="abc")
+        self.assertEqual(first.pk, again.pk)
+        self.assertEqual(self.seats_left(), 1)
+
+    def test_cancel_returns_seat_once(self):
+        booking = services.reserve(self.gym_class, self.users[0])
+        self.assertTrue(services.cancel(booking))
+        self.assertFalse(services.cancel(booking))
+        self.assertEqual(self.seats_left(), 2)
+
+    def test_editing_class_does_not_overwrite_live_counter(self):
+        stale = Class.objects.get(pk=self.gym_class.pk)
+        services.reserve(self.gym_class, self.users[0])
+        stale.name = "Spin 2"
+        stale.capacity = 5
+        stale.save()
+        self.assertEqual(stale.seats_left, 4)  # 5 seats, 1 taken meanwhile
+        self.assertEqual(self.seats_left(), 4)
+
+    def test_book_view_is_idempotent(self):
+        self.client.force_login(self.users[0])
+        url = reverse("bookings:book", args=[self.gym_class.pk])
+        for _ in range(2):
+            resp = self.client.post(url, HTTP_IDEMPOTENCY_KEY="k1", HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+            self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["seats_left"], 1)
+        resp = self.client.post(url, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        self.assertEqual(resp.status_code, 409)
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    """Hundreds of simultaneous requests against one class must never overbook."""
+    CAPACITY = 25
+    REQUESTS = 300
+
+    def test_no_overbooking_under_load(self):
+        gym_class = Class.objects.create(name="Hot seat", category="yoga", capacity=self.CAPACITY)
+        users = make_users(self.REQUESTS // 2, prefix="load")
+        start = threading.Barrier(32)
+        outcomes = []
+
+        def attempt(i):
+            user = users[i % len(users)]  # every user tries twice: a retry with the same key
+            try:
+                start.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                booking = services.reserve(gym_class.pk, user, idempotency_key=f"req-{user.pk}")
+                return ("ok", booking.pk)
+            except services.BookingError as exc:
+                return (type(exc).__name__, None)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            outcomes = list(pool.map(attempt, range(self.REQUESTS)))
+
+        gym_class.refresh_from_db()
+        confirmed = Booking.objects.filter(gym_class=gym_class, status=Booking.CONFIRMED)
+        self.assertEqual(confirmed.count(), self.CAPACITY)
+        self.assertEqual(gym_class.seats_left, 0)
+        self.assertEqual(confirmed.values("user").distinct().count(), self.CAPACITY)
+        booked_ids = {pk for status, pk in outcomes if status == "ok"}
+        self.assertEqual(booked_ids, set(confirmed.values_list("pk", flat=True)))
+        self.assertTrue(all(status in ("ok", "ClassFull", "AlreadyBooked") for status, _ in outcomes))
+
+
+class WaitlistTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gym_class = Class.objects.create(name="Reformer", category="pilates", capacity=1)
+        cls.users = make_users(4, prefix="w")
+
+    def fill(self):
+        return [services.reserve(self.gym_class, u, waitlist=True) for u in self.users]
+
+    def positions(self):
+        return list(
+            Booking.objects.filter(gym_class=self.gym_class, status=Booking.WAITLISTED)
+            .order_by("waitlist_position").values_list("user__username", "waitlist_position")
+        )
+
+    def test_full_class_queues_in_order(self):
+        bookings = self.fill()
+        self.assertEqual(bookings[0].status, Booking.CONFIRMED)
+        self.assertEqual([b.waitlist_position for b in bookings[1:]], [1, 2, 3])
+        self.assertEqual(Class.objects.get(pk=self.gym_class.pk).waitlist_count, 3)
+
+    def test_cancel_promotes_head_in_same_transaction(self):
+        holder, first, second, third = self.fill()
+        services.cancel(holder)
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.waitlist_position), (Booking.CONFIRMED, None))
+        self.assertEqual(self.positions(), [("w2", 1), ("w3", 2)])
+        live = Class.objects.get(pk=self.gym_class.pk)
+        self.assertEqual((live.seats_left, live.waitlist_count), (0, 2))
+
+    def test_leaving_waitlist_closes_the_gap(self):
+        _, first, second, third = self.fill()
+        services.cancel(second)
+        self.assertEqual(self.positions(), [("w1", 1), ("w3", 2)])
+
+    def test_capacity_increase_promotes(self):
+        self.fill()
+        gym_class = Class.objects.get(pk=self.gym_class.pk)
+        gym_class.capacity = 3
+        gym_class.save()
+        self.assertEqual(self.positions(), [("w3", 1)])
+        self.assertEqual(Class.objects.get(pk=self.gym_class.pk).seats_left, 0)
+
+    def test_detail_page_shows_position(self):
+        self.fill()
+        self.client.force_login(self.users[2])
+        with self.assertQueryBudget(4):  # session, user, class + instructor, own booking
+            resp = self.client.get(reverse("home_search:class_detail", args=[self.gym_class.pk]))
+        self.assertContains(resp, "#2 on the waitlist")
+
+
+class ConcurrentWaitlistTests(TransactionTestCase):
+    """Many cancellations at once must promote strictly in FIFO order, seat for seat."""
+
+    def test_parallel_cancellations_promote_fifo(self):
+        gym_class = Class.objects.create(name="Sold out", category="boxing", capacity=10)
+        users = make_users(40, prefix="q")
+        bookings = [services.reserve(gym_class, u, waitlist=True) for u in users]
+        holders, waiting = bookings[:10], bookings[10:]
+        # every seat holder plus five people in the middle of the queue leave at once
+        leaving = holders + waiting[5:10]
+        start = threading.Barrier(len(leaving))
+
+        def leave(booking):
+            try:
+                start.wait(timeout=5)
+                return services.cancel(booking)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=len(leaving)) as pool:
+            self.assertTrue(all(pool.map(leave, leaving)))
+
+        gym_class.refresh_from_db()
+        expected_confirmed = waiting[:5] + waiting[10:15]  # FIFO, skipping those who left
+        confirmed = set(Booking.objects.filter(gym_class=gym_class, status=Booking.CONFIRMED).values_list("pk", flat=True))
+        self.assertEqual(confirmed, {b.pk for b in expected_confirmed})
+        self.assertEqual(gym_class.seats_left, 0)
+
+        remaining = list(
+            Booking.objects.filter(gym_class=gym_class, status=Booking.WAITLISTED)
+            .order_by("waitlist_position").values_list("pk", "waitlist_position")
+        )
+        self.assertEqual([pk for pk, _ in remaining], [b.pk for b in waiting[15:]])
+        self.assertEqual([pos for _, pos in remaining], list(range(1, len(remaining) + 1)))
+        self.assertEqual(gym_class.waitlist_count, len(remaining))
+
+
+@override_settings(ASYNC_VIEWS=True)
+class LiveSeatTests(TransactionTestCase):
+    def setUp(self):
+        self.gym_class = Class.objects.create(name="Live", category="yoga", capacity=5)
+        self.user = make_users(1, prefix="live")[0]
+        self.hub = live.SeatHub(poll_interval=None, debounce=0.01)
+        patcher = mock.patch.object(live, "_hub", self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_one_read_per_change_for_many_subscribers(self):
+        subs = [self.hub.subscribe([self.gym_class.pk]) for _ in range(200)]
+        await sync_to_async(self.hub.snapshot)([self.gym_class.pk])
+        reads = self.hub.reads
+
+        await sync_to_async(services.reserve)(self.gym_class, self.user)
+        got = await asyncio.gather(*(sub.changes(timeout=5) for sub in subs))
+
+        self.assertTrue(all(changes and changes[0]["seats_left"] == 4 for changes in got))
+        self.assertEqual(self.hub.reads, reads + 1)
+        for sub in subs:
+            sub.close()
+        self.assertEqual(self.hub.watched, 0)
+
+    async def test_stream_sends_snapshot_then_changes(self):
+        resp = await self.async_client.get(reverse("bookings:seat_stream"), {"ids": str(self.gym_class.pk)})
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        stream = aiter(resp.streaming_content)
+
+        async def next_event():
+            while True:
+                chunk = (await asyncio.wait_for(anext(stream), 5)).decode()
+                if chunk.startswith("event: seats"):
+                    return json.loads(chunk.split("data: ", 1)[1])
+
+        self.assertEqual((await next_event())["seats_left"], 5)
+        await sync_to_async(services.reserve)(self.gym_class, self.user)
+        self.assertEqual((await next_event())["seats_left"], 4)
+        await stream.aclose()
+
+    def test_rejects_bad_ids(self):
+        url = reverse("bookings:seat_stream")
+        self.assertEqual(self.client.get(url, {"ids": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+
+class WsgiSeatStreamTests(TestCase):
+    """Under WSGI (the default) nothing opens a stream that would pin a worker."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gym_class = Class.objects.create(name="Static", category="yoga", capacity=5)
+
+    def setUp(self):
+        cache.clear()  # search is page-cached for anonymous visitors
+
+    def test_stream_answers_204(self):
+        resp = self.client.get(reverse("bookings:seat_stream"), {"ids": str(self.gym_class.pk)})
+        self.assertEqual(resp.status_code, 204)
+        self.assertFalse(resp.streaming)
+
+    def test_booking_refreshes_cached_search_page(self):
+        url = reverse("home_search:search")
+        self.assertContains(self.client.get(url), "5 seats left")
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "hit")
+
+        member = User.objects.create_user(username="booker", password="pass12345", handle="booker_1")
+        with self.captureOnCommitCallbacks(execute=True):
+            services.reserve(self.gym_class, member)
+        resp = self.client.get(url)
+        self.assertEqual(resp["X-Page-Cache"], "miss")
+        self.assertContains(resp, "4 seats left")
+
+    def test_pages_skip_the_live_script(self):
+        for url in (reverse("home_search:search"), reverse("home_search:class_detail", args=[self.gym_class.pk])):
+            with self.subTest(url=url):
+                resp = self.client.get(url)
+                self.assertContains(resp, f'data-seats-for="{self.gym_class.pk}"')
+                self.assertNotContains(resp, "live-seats.js")
+        with override_settings(ASYNC_VIEWS=True):
+            cache.clear()
+            self.assertContains(self.client.get(reverse("home_search:search")), "live-seats.js")
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from bookings.views import book_class, cancel_booking, seat_stream
+
+app_name = 'bookings'
+
+urlpatterns = [
+    path('classes/<int:pk>/book/', book_class, name='book'),
+    path('bookings/<int:pk>/cancel/', cancel_booking, name='cancel'),
+    path('classes/seats/stream/', seat_stream, name='seat_stream'),
+]
@@ -0,0 +1,120 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_GET, require_POST
+
+from bookings import live, services
+from bookings.models import Booking
+from home_search.models import Class
+
+
+def _is_ajax(request) -> bool:
+    return request.headers.get("x-requested-with") == "XMLHttpRequest"
+
+
+@login_required
+@require_POST
+def book_class(request, pk):
+    """
+    Reserve a seat, or a waitlist place when the class is full. Clients should send an ``Idempotency-Key`` header (or an
+    ``idempotency_key`` form field) so a retried request returns the same booking.
+    """
+    gym_class = get_object_or_404(Class, pk=pk)
+    key = request.headers.get("Idempotency-Key") or request.POST.get("idempotency_key")
+    try:
+        booking = services.reserve(gym_class, request.user, idempotency_key=key, waitlist=True)
+    except services.BookingError as exc:
+        if _is_ajax(request):
+            return JsonResponse({"success": False, "error": str(exc)}, status=409)
+        messages.error(request, str(exc))
+        return redirect("home_search:class_detail", pk=pk)
+
+    if _is_ajax(request):
+        gym_class.refresh_from_db(fields=["seats_left"])
+        return JsonResponse({
+            "success": True,
+            "booking": booking.pk,
+            "status": booking.status,
+            "waitlist_position": booking.waitlist_position,
+            "seats_left": gym_class.seats_left,
+        })
+    if booking.is_waitlisted:
+        messages.success(request, f"Class is full — you're #{booking.waitlist_position} on the waitlist.")
+    else:
+        messages.success(request, "You're booked!")
+    return redirect("home_search:class_detail", pk=pk)
+
+
+@login_required
+@require_POST
+def cancel_booking(request, pk):
+    booking = get_object_or_404(Booking, pk=pk, user=request.user)
+    cancelled = services.cancel(booking)
+    if _is_ajax(request):
+        return JsonResponse({"success": cancelled, "status": booking.status})
+    if cancelled:
+        messages.success(request, "Your booking was cancelled.")
+    return redirect("home_search:class_detail", pk=booking.gym_class_id)
+
+
+MAX_STREAM_CLASSES = 100
+KEEPALIVE_SECONDS = 15
+
+
+def _sse(payload: dict) -> str:
+    return f"event: seats\ndata: {json.dumps(payload)}\n\n"
+
+
+@require_GET
+async def seat_stream(request):
+    """
+    Server-sent events with live seat counts: ``?ids=1,2,3``. Sends the
+    current counts first, then one ``seats`` event per change. Every stream
+    shares the process's ``live.SeatHub``.
+
+    ASGI only (``settings.ASYNC_VIEWS``): WSGI would read the endless stream
+    into a list and hold a sync worker per open tab.  There the pages don't
+    load live-seats.js, and a client that still connects (an old tab) gets
+    204 No Content, which tells EventSource to stop reconnecting; its seat
+    counts then come from reloading the page.
+    """
+    if not settings.ASYNC_VIEWS:
+        return HttpResponse(status=204)
+    try:
+        ids = sorted({int(v) for v in request.GET.get("ids", "").split(",") if v.strip()})
+    except ValueError:
+        return HttpResponseBadRequest("ids must be integers")
+    if not ids or len(ids) > MAX_STREAM_CLASSES:
+        return HttpResponseBadRequest(f"pass 1-{MAX_STREAM_CLASSES} class ids")
+
+    hub = live.get_hub()
+    sub = hub.subscribe(ids)  # before the snapshot, so no change falls in between
+    try:
+        snapshot = await sync_to_async(hub.snapshot)(ids)
+    except Exception:
+        sub.close()
+        raise
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            for payload in snapshot:
+                yield _sse(payload)
+            while True:
+                changes = await sub.changes(timeout=KEEPALIVE_SECONDS)
+                if not changes:
+                    yield ": keep-alive\n\n"
+                for payload in changes:
+                    yield _sse(payload)
+        finally:
+            sub.close()
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # don't let a proxy buffer the stream
+    return response
@@ -0,0 +1,68 @@
+# home_search/async_views.py
+"""
+Async variants of the read-only class pages.  ``urls.py`` routes to them
+instead of the sync views when ``settings.ASYNC_VIEWS`` is on (ASGI, see
+ReServe/asgi.py).
+
+Single-object reads use the async ORM directly.  The search pipeline
+(full-text, facet aggregate, keyset page) is the same chain of sync helpers
+the WSGI view uses, so it runs in one ``sync_to_async`` hop rather than
+being written twice.
+"""
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import render
+
+from bookings.models import Booking
+from ReServe.async_utils import resolve_user
+from ReServe.conditional import conditional_page
+
+from . import upcoming
+from .caching import cache_anonymous_page
+from .models import Class, CATEGORY_CHOICES
+from .utils import is_instructor
+from .views import detail_stamps, remember_class, search_context
+
+
+async def _is_instructor(user) -> bool:
+    # anonymous visitors never need the role lookup (or a thread hop)
+    return user.is_authenticated and await sync_to_async(is_instructor)(user)
+
+
+@cache_anonymous_page("home")
+async def home(request):
+    ctx = {
+        "categories": CATEGORY_CHOICES,
+        "upcoming": [item async for item in upcoming.listing()],
+        "show_create_button": await _is_instructor(request.user),
+    }
+    return render(request, "home_search/home.html", ctx)
+
+
+@cache_anonymous_page("search")
+async def search(request):
+    ctx = await sync_to_async(search_context)(request)
+    return render(request, "home_search/search.html", ctx)
+
+
+@conditional_page(detail_stamps)
+async def class_detail(request, pk):
+    user = await resolve_user(request)
+    try:
+        c = await Class.objects.select_related("owner").aget(pk=pk)
+    except Class.DoesNotExist:
+        raise Http404("No class found matching the query")
+    remember_class(c)
+    my_booking = None
+    if user.is_authenticated:
+        my_booking = await Booking.objects.filter(
+            gym_class=c, user=user, status__in=Booking.ACTIVE,
+        ).afirst()
+    return render(request, "home_search/class_detail.html", {
+        "object": c,
+        "c": c,
+        "my_booking": my_booking,
+        "idempotency_key": uuid.uuid4().hex,
+    })
@@ -0,0 +1,88 @@
+# home_search/caching.py
+"""
+Anonymous page cache for the browse pages (home + search grid).
+
+Entries live in the "pages" cache namespace.  Class post_save /
+post_delete bump its version (see ``home_search.signals``), so a cached
+page can never outlive the data it was rendered from: old keys are simply
+never read again and age out of the cache.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+
+from ReServe.async_utils import resolve_user
+from ReServe.reserve_cache import Namespace
+
+PAGE_CACHE_TIMEOUT = 15 * 60
+pages = Namespace("pages", timeout=PAGE_CACHE_TIMEOUT)
+
+
+def bump_classes_version() -> None:
+    pages.bump()
+
+
+def page_parts(name: str, request) -> tuple:
+    """One entry per page + normalized query string (so one per category / filter set)."""
+    items = sorted((k, v) for k in request.GET for v in request.GET.getlist(k))
+    digest = hashlib.md5(repr(items).encode(), usedforsecurity=False).hexdigest()
+    return (name, digest)
+
+
+def cacheable(request) -> bool:
+    return request.method == "GET" and not getattr(request.user, "is_authenticated", False)
+
+
+def _cached_response(parts):
+    hit = pages.get(*parts)
+    if hit is None:
+        return None
+    content, content_type = hit
+    response = HttpResponse(content, content_type=content_type)
+    response["X-Page-Cache"] = "hit"
+    return response
+
+
+def _store(parts, response):
+    if response.status_code == 200 and not response.cookies:
+        pages.set((response.content, response["Content-Type"]), *parts)
+    response["X-Page-Cache"] = "miss"
+    return response
+
+
+def cache_anonymous_page(name: str):
+    """
+    View decorator: serve anonymous GETs from the page cache.
+    Only the body and content type are stored, never headers or cookies.
+    Works on async views too; they must have resolved ``request.user``
+    (see ``ReServe.async_utils``) before the cache checks it, which the
+    async wrapper does itself.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                await resolve_user(request)
+                if not cacheable(request):
+                    return await view(request, *args, **kwargs)
+                parts = page_parts(name, request)
+                # in-memory / Redis cache: no database access on the event loop
+                hit = _cached_response(parts)
+                if hit is not None:
+                    return hit
+                return _store(parts, await view(request, *args, **kwargs))
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not cacheable(request):
+                return view(request, *args, **kwargs)
+            parts = page_parts(name, request)
+            hit = _cached_response(parts)
+            if hit is not None:
+                return hit
+            return _store(parts, view(request, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,128 @@
+# home_search/facets.py
+"""
+Combined search filters + facet counts for the chip bar.
+
+Filters come from the query string (``category``, ``price_min``,
+``price_max``, ``from``, ``to``, ``location``).  Facet counts follow the
+usual faceting rule: a facet's own filter is left out when counting it, so
+the category chips show what you'd get by switching category, and the
+price bands what you'd get by switching band.  All of them are computed
+with conditional aggregation in a single query.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import CATEGORY_CHOICES
+
+# key, label, min (inclusive), max (exclusive; None = open)
+PRICE_BANDS = [
+    ("under-100k", "Under Rp 100k", 0, 100_000),
+    ("100k-250k", "Rp 100k – 250k", 100_000, 250_000),
+    ("250k-500k", "Rp 250k – 500k", 250_000, 500_000),
+    ("500k-plus", "Rp 500k+", 500_000, None),
+]
+
+
+def _int_or_none(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _moment(value, end=False):
+    """Accept ``YYYY-MM-DD`` or an ISO datetime; dates cover the whole day."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        # a bare date first: parse_datetime() reads it as midnight too
+        d = parse_date(value) if len(value) == 10 else None
+        if d is not None:
+            dt = datetime.combine(d + timedelta(days=1) if end else d, time.min)
+        else:
+            dt = parse_datetime(value)
+            if dt is None:
+                return None
+        if timezone.is_naive(dt):
+            dt = timezone.make_aware(dt)
+    except (ValueError, OverflowError):
+        # well-formed but impossible (2020-02-30, hour 25, past year 9999): ignore like junk
+        return None
+    return dt
+
+
+def parse_filters(params, category="") -> dict:
+    """Read filters from a QueryDict; ``category`` is passed in already normalized."""
+    price_min = _int_or_none(params.get("price_min"))
+    price_max = _int_or_none(params.get("price_max"))
+    if price_min is not None and price_max is not None and price_min > price_max:
+        price_min, price_max = price_max, price_min
+    return {
+        "category": category,
+        "price_min": price_min,
+        "price_max": price_max,
+        "start": _moment(params.get("from")),
+        "end": _moment(params.get("to"), end=True),
+        "location": (params.get("location") or "").strip(),
+    }
+
+
+def _category_q(f) -> Q:
+    return Q(category=f["category"]) if f["category"] else Q()
+
+
+def _price_q(f) -> Q:
+    q = Q()
+    if f["price_min"] is not None:
+        q &= Q(price__gte=f["price_min"])
+    if f["price_max"] is not None:
+        q &= Q(price__lte=f["price_max"])
+    return q
+
+
+def _other_q(f) -> Q:
+    q = Q()
+    if f["start"]:
+        q &= Q(datetime__gte=f["start"])
+    if f["end"]:
+        q &= Q(datetime__lt=f["end"])
+    if f["location"]:
+        q &= Q(location__icontains=f["location"])
+    return q
+
+
+def apply_filters(qs, f):
+    return qs.filter(_category_q(f) & _price_q(f) & _other_q(f))
+
+
+def _band_q(lo, hi) -> Q:
+    q = Q(price__gte=lo)
+    if hi is not None:
+        q &= Q(price__lt=hi)
+    return q
+
+
+def facet_counts(qs, f) -> dict:
+    """
+    One aggregate query over ``qs`` (before category/price filtering) returning
+    ``{"total", "categories": {key: n}, "price_bands": {key: n}}``.
+    """
+    base = qs.filter(_other_q(f))
+    cat_q, price_q = _category_q(f), _price_q(f)
+
+    aggregates = {"all": Count("pk", filter=price_q) if price_q else Count("pk")}
+    for key, _ in CATEGORY_CHOICES:
+        aggregates[f"c_{key}"] = Count("pk", filter=Q(category=key) & price_q)
+    for key, _, lo, hi in PRICE_BANDS:
+        aggregates[f"p_{key}"] = Count("pk", filter=_band_q(lo, hi) & cat_q)
+
+    row = base.aggregate(**aggregates)
+    return {
+        "total": row["all"],
+        "categories": {key: row[f"c_{key}"] for key, _ in CATEGORY_CHOICES},
+        "price_bands": {key: row[f"p_{key}"] for key, *_ in PRICE_BANDS},
+    }
@@ -7,7 +7,7 @@ DT_FORMAT = "%Y-%m-%dT%H:%M"
 class ClassForm(forms.ModelForm):
     class Meta:
         model = Class
-        fields = ["category", "name", "price", "description", "image_url", "datetime", "location"]
+        fields = ["category", "name", "price", "capacity", "description", "image_url", "datetime", "location"]
         widgets = {
             "datetime": forms.DateTimeInput(attrs={"type": "datetime-local"}, format=DT_FORMAT),
         }
@@ -18,3 +18,10 @@ class ClassForm(forms.ModelForm):
         if self.instance and self.instance.pk and self.instance.datetime:
             self.initial["datetime"] = self.instance.datetime.strftime(DT_FORMAT)
 
+    def clean_capacity(self):
+        capacity = self.cleaned_data.get("capacity")
+        if capacity is not None and self.instance.pk and capacity < self.instance.booked_count:
+            raise forms.ValidationError(
+                f"{self.instance.booked_count} seats are already booked; capacity can't go below that."
+            )
+        return capacity
@@ -0,0 +1,175 @@
+# home_search/fulltext.py
+"""
+Ranked full-text search over Class.name / location / description.
+
+Two index backends, picked from the DB vendor:
+
+* PostgreSQL: a stored generated ``search_vector`` tsvector column on
+  ``home_search_class`` with a GIN index (created in migration 0005).
+  Postgres keeps it current on every INSERT/UPDATE by itself.
+* SQLite (dev): an FTS5 shadow table ``home_search_class_fts`` whose rowid
+  is the Class id.  It is kept in sync by the post_save / post_delete
+  signals in ``home_search.signals``.  Matching and bm25() ranking run as
+  subqueries of the Class query itself, so there is no cap on hits.
+
+``search(qs, q)`` filters a Class queryset to matches and annotates a
+``rank`` (higher = more relevant) on both backends.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Expression, F, FloatField, Func, Q, TextField, Value
+from django.db.models.expressions import Col, RawSQL
+
+CLASS_TABLE = "home_search_class"
+FTS_TABLE = "home_search_class_fts"
+PG_CONFIG = "english"
+
+# FTS5 has no stopword list; drop the few that would otherwise be required terms
+_STOPWORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "or", "the", "to", "with"}
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _vendor() -> str:
+    return connection.vendor
+
+
+def sqlite_fts_available() -> bool:
+    """
+    Whether the FTS5 table exists.  Remembered on the connection once it
+    does; ``forget_fts_table()`` clears that when a connection is opened.
+    """
+    if _vendor() != "sqlite":
+        return False
+    if getattr(connection, "fts_table_ready", False):
+        return True
+    with connection.cursor() as cur:
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        found = cur.fetchone() is not None
+    # only a hit is kept: the table may still be migrated in on this connection
+    connection.fts_table_ready = found
+    return found
+
+
+def forget_fts_table(connection) -> None:
+    # a new connection may be to another database (the test one)
+    connection.fts_table_ready = False
+
+
+def _fts5_query(q: str) -> str:
+    """User text -> safe FTS5 MATCH expression: every word required, prefix-matched."""
+    words = [w.lower() for w in _WORD_RE.findall(q)]
+    words = [w for w in words if w not in _STOPWORDS] or words
+    return " ".join(f'"{w}"*' for w in words)
+
+
+# --------------------------- Query ---------------------------
+
+_VECTOR_FIELD = TextField()
+_VECTOR_FIELD.set_attributes_from_name("search_vector")  # the generated column (not a model field)
+
+
+class _SearchVector(Expression):
+    """
+    ``<alias>.search_vector`` of the queryset's own Class table.  Resolved
+    to a real column reference, so Django relabels it with the table (as
+    ``U0`` once the queryset becomes a subquery); a table name written into
+    raw SQL would point outside the subquery.
+    """
+    output_field = TextField()
+
+    def resolve_expression(self, query=None, *args, **kwargs):
+        return Col(query.get_initial_alias(), _VECTOR_FIELD, output_field=self.output_field)
+
+
+class _TsQuery(Func):
+    function = "websearch_to_tsquery"
+    template = f"%(function)s('{PG_CONFIG}', %(expressions)s)"
+    output_field = TextField()
+
+
+class _Matches(Func):
+    template = "%(expressions)s"
+    arg_joiner = " @@ "
+    output_field = BooleanField()
+
+
+class _Bm25(Func):
+    """
+    ``_Bm25(Value(match), F("pk"))``: the row's FTS5 score (higher = better;
+    weights name, description, location), as a subquery on its rowid.
+    """
+    template = (
+        f"(SELECT -bm25({FTS_TABLE}, 10.0, 1.0, 4.0) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %(expressions)s)"
+    )
+    arg_joiner = " AND rowid = "
+    output_field = FloatField()
+
+
+def _no_hits(qs):
+    # keep the ``rank`` annotation so callers can always order/paginate by it
+    return qs.annotate(rank=Value(0.0, output_field=FloatField())).none()
+
+
+def search(qs, q: str):
+    q = (q or "").strip()
+    if not q:
+        return qs
+
+    vendor = _vendor()
+    if vendor == "postgresql":
+        tsquery = _TsQuery(Value(q))
+        return qs.filter(_Matches(_SearchVector(), tsquery)).annotate(
+            rank=Func(_SearchVector(), tsquery, function="ts_rank_cd", output_field=FloatField())
+        )
+
+    if vendor == "sqlite" and sqlite_fts_available():
+        match = _fts5_query(q)
+        if not match:
+            return _no_hits(qs)
+        return qs.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(rank=_Bm25(Value(match), F("pk")))
+
+    # No index available on this backend: plain substring match, unranked
+    return qs.filter(
+        Q(name__icontains=q) | Q(location__icontains=q) | Q(description__icontains=q)
+    ).annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+# --------------------------- Index maintenance (SQLite) ---------------------------
+
+def index_class(obj) -> None:
+    if not sqlite_fts_available():
+        return
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [obj.pk])
+        cur.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, location) VALUES (%s, %s, %s, %s)",
+            [obj.pk, obj.name or "", obj.description or "", obj.location or ""],
+        )
+
+
+def unindex_class(pk) -> None:
+    if not sqlite_fts_available():
+        return
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+
+
+def rebuild() -> int:
+    """Re-populate the index from scratch (after bulk_create / raw SQL imports)."""
+    vendor = _vendor()
+    with connection.cursor() as cur:
+        if vendor == "postgresql":
+            # generated column: nothing to rebuild, just refresh planner stats
+            cur.execute(f"ANALYZE {CLASS_TABLE}")
+        elif sqlite_fts_available():
+            cur.execute(f"DELETE FROM {FTS_TABLE}")
+            cur.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description, location) "
+                f"SELECT id, name, description, location FROM {CLASS_TABLE}"
+            )
+        cur.execute(f"SELECT COUNT(*) FROM {CLASS_TABLE}")
+        return cur.fetchone()[0]
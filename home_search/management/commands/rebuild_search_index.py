@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from home_search import fulltext
+
+
+class Command(BaseCommand):
+    help = "Rebuild the class full-text index (run after bulk imports that bypass signals)."
+
+    def handle(self, *args, **options):
+        total = fulltext.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} classes."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from home_search import upcoming
+
+
+class Command(BaseCommand):
+    help = "Drop started classes from the upcoming list (run every few minutes, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true",
+                            help="Re-create the whole list from Class (after bulk imports that bypass signals).")
+
+    def handle(self, *args, rebuild, **options):
+        if rebuild:
+            total = upcoming.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Listed {total} upcoming classes."))
+        else:
+            removed = upcoming.sweep()
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} started classes."))
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+PG_FORWARD = [
+    """
+    ALTER TABLE home_search_class ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX home_search_class_search_gin ON home_search_class USING GIN (search_vector)",
+]
+PG_BACKWARD = [
+    "DROP INDEX IF EXISTS home_search_class_search_gin",
+    "ALTER TABLE home_search_class DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS home_search_class_fts USING fts5(
+        name, description, location,
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO home_search_class_fts (rowid, name, description, location)
+    SELECT id, name, description, location FROM home_search_class
+    """,
+]
+SQLITE_BACKWARD = ["DROP TABLE IF EXISTS home_search_class_fts"]
+
+
+def _run(statements, schema_editor):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _run(PG_FORWARD, schema_editor)
+    elif vendor == "sqlite":
+        _run(SQLITE_FORWARD, schema_editor)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _run(PG_BACKWARD, schema_editor)
+    elif vendor == "sqlite":
+        _run(SQLITE_BACKWARD, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_search', '0004_remove_class_instructor_remove_class_picture_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
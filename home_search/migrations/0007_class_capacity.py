@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_search', '0006_class_facet_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='capacity',
+            field=models.PositiveIntegerField(default=20),
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='seats_left',
+            field=models.PositiveIntegerField(default=20),
+        ),
+        migrations.AddConstraint(
+            model_name='class',
+            constraint=models.CheckConstraint(condition=models.Q(('seats_left__lte', models.F('capacity'))), name='class_seats_left_lte_capacity'),
+        ),
+    ]
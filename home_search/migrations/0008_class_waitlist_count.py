@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_search', '0007_class_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='waitlist_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
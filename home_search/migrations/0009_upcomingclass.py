@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:41
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill(apps, schema_editor):
+    """Classes that haven't started yet get their row (as home_search.upcoming.rebuild)."""
+    Class = apps.get_model("home_search", "Class")
+    UpcomingClass = apps.get_model("home_search", "UpcomingClass")
+    rows = []
+    for c in Class.objects.filter(datetime__gt=timezone.now()).select_related("owner").iterator():
+        owner = c.owner
+        rows.append(UpcomingClass(
+            id=c.pk, owner_id=c.owner_id,
+            instructor=(f"{owner.first_name} {owner.last_name}".strip() or owner.username) if owner else "",
+            name=c.name, category=c.category, price=c.price, image_url=c.image_url,
+            location=c.location, datetime=c.datetime, capacity=c.capacity,
+        ))
+    UpcomingClass.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_search', '0008_class_waitlist_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpcomingClass',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('owner_id', models.BigIntegerField(blank=True, null=True)),
+                ('instructor', models.CharField(blank=True, max_length=150)),
+                ('name', models.CharField(max_length=200)),
+                ('category', models.CharField(choices=[('yoga', 'Yoga'), ('pilates', 'Pilates'), ('dance', 'Dance'), ('boxing', 'Boxing'), ('muaythai', 'Muaythai'), ('ice-skating', 'Ice Skating')], max_length=50)),
+                ('price', models.IntegerField(default=0)),
+                ('image_url', models.URLField(blank=True)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('datetime', models.DateTimeField()),
+                ('capacity', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['datetime', 'id'], name='upcoming_datetime_idx'), models.Index(fields=['category', 'datetime', 'id'], name='upcoming_category_datetime_idx')],
+            },
+        ),
+        migrations.RunPython(fill, migrations.RunPython.noop),
+    ]
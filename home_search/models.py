@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.query import BaseIterable
 from accounts.models import User
 
 CATEGORY_CHOICES = [
@@ -6,6 +8,73 @@ CATEGORY_CHOICES = [
     ("boxing","Boxing"), ("muaythai","Muaythai"), ("ice-skating","Ice Skating"),
 ]
 
+class Card:
+    """
+    A class as the grids show it: the card fields as plain attributes, no
+    model instance behind it (no field descriptors, ``_state`` or
+    ``description``).  Rows come from ``CardQuerySet.cards()``.
+    """
+    __slots__ = (
+        "id", "owner_id", "instructor", "name", "category", "price", "image_url", "location",
+        "datetime", "capacity", "seats_left", "rank",
+    )
+    _labels = dict(CATEGORY_CHOICES)
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"<Card {self.id}: {self.name}>"
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def booked_count(self) -> int:
+        return self.capacity - self.seats_left
+
+    @property
+    def is_full(self) -> bool:
+        return self.seats_left <= 0
+
+    def get_category_display(self) -> str:
+        return self._labels.get(self.category, self.category)
+
+
+class CardIterable(BaseIterable):
+    """Like ValuesIterable, but fills a Card's slots straight from each row tuple."""
+
+    def __iter__(self):
+        query = self.queryset.query
+        compiler = query.get_compiler(self.queryset.db)
+        names = list(query.selected) if query.selected else [
+            *query.extra_select, *query.values_select, *query.annotation_select,
+        ]
+        setters = [getattr(Card, name).__set__ for name in names]
+        new = Card.__new__
+        for row in compiler.results_iter(chunked_fetch=self.chunked_fetch, chunk_size=self.chunk_size):
+            card = new(Card)
+            for put, value in zip(setters, row):
+                put(card, value)
+            yield card
+
+
+class CardQuerySet(models.QuerySet):
+    def cards(self):
+        """
+        Card fields only, as ``Card`` rows; annotations made so far (full-text
+        ``rank``, ``seats_left``) come along.  Filtering, ordering and slicing
+        still work afterwards.
+        """
+        names = {f.attname for f in self.model._meta.concrete_fields}
+        fields = [name for name in Card.__slots__ if name in names or name in self.query.annotations]
+        clone = self.values(*fields)
+        clone._iterable_class = CardIterable
+        return clone
+
+
 class Class(models.Model):
     owner       = models.ForeignKey(User, null=True, blank=True,
                                     on_delete=models.SET_NULL, related_name="my_classes")
@@ -19,15 +88,97 @@ class Class(models.Model):
     datetime   = models.DateTimeField(null=True, blank=True)
     location    = models.CharField(max_length=200, blank=True)
 
+    # seats_left / waitlist_count are counters kept in step with bookings;
+    # only bookings.services changes them, always with F() updates
+    capacity    = models.PositiveIntegerField(default=20)
+    seats_left  = models.PositiveIntegerField(default=20)
+    waitlist_count = models.PositiveIntegerField(default=0)
+    # any change the detail page shows, booking counters included (bookings.services)
+    updated_at  = models.DateTimeField(auto_now=True)
+
+    COUNTER_FIELDS = ("seats_left", "waitlist_count")
+    STAMP_FIELDS = ("updated_at", "owner_id")  # what the detail page's ETag depends on (ReServe.conditional)
+
+    objects = CardQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=Q(seats_left__lte=F("capacity")), name="class_seats_left_lte_capacity"),
+        ]
+        indexes = [
+            # faceted search: category chip + date window / price band
+            models.Index(fields=["category", "datetime"], name="class_category_datetime_idx"),
+            models.Index(fields=["category", "price"], name="class_category_price_idx"),
+        ]
+
     def __str__(self): return self.name
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.seats_left = self.capacity
+            return super().save(*args, **kwargs)
+        if kwargs.get("update_fields") is not None:
+            return super().save(*args, **kwargs)
+        # Never write back our (possibly stale) counters; a capacity change
+        # shifts the live seats_left by the difference instead.
+        with transaction.atomic():
+            old_capacity = type(self).objects.select_for_update().values_list("capacity", flat=True).get(pk=self.pk)
+            fields = [f.name for f in self._meta.concrete_fields
+                      if not f.primary_key and f.name not in self.COUNTER_FIELDS]
+            if self.capacity != old_capacity:  # before post_save, which may promote the waitlist
+                type(self).objects.filter(pk=self.pk).update(
+                    capacity=self.capacity, seats_left=F("seats_left") + (self.capacity - old_capacity),
+                )
+            super().save(*args, update_fields=fields, **kwargs)
+        self.refresh_from_db(fields=list(self.COUNTER_FIELDS))
+
+    @property
+    def booked_count(self) -> int:
+        return self.capacity - self.seats_left
+
+    @property
+    def is_full(self) -> bool:
+        return self.seats_left <= 0
+
     @property
     def hero_image(self) -> str:
         return self.image_url or ""
 
 
+class UpcomingClass(models.Model):
+    """
+    Read model for the browse pages: one narrow row per class that has not
+    started yet, holding just what a card shows, pre-sorted by the indexes
+    below.  ``id`` is the Class id.  Maintained by ``home_search.upcoming``
+    (Class save/delete signals, plus ``manage.py sweep_upcoming`` for rows
+    whose start time has passed); the seat counters stay on Class.
+    """
+    id          = models.BigIntegerField(primary_key=True)
+    owner_id    = models.BigIntegerField(null=True, blank=True)
+    instructor  = models.CharField(max_length=150, blank=True)
+    name        = models.CharField(max_length=200)
+    category    = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
+    price       = models.IntegerField(default=0)
+    image_url   = models.URLField(blank=True)
+    location    = models.CharField(max_length=200, blank=True)
+    datetime    = models.DateTimeField()
+    capacity    = models.PositiveIntegerField(default=0)
 
+    objects = CardQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["datetime", "id"], name="upcoming_datetime_idx"),
+            models.Index(fields=["category", "datetime", "id"], name="upcoming_category_datetime_idx"),
+        ]
 
+    def __str__(self): return self.name
+
+    # seats_left is annotated by upcoming.with_seats()
+    @property
+    def booked_count(self) -> int:
+        return self.capacity - self.seats_left
 
-    
\ No newline at end of file
+    @property
+    def is_full(self) -> bool:
+        return self.seats_left <= 0
@@ -0,0 +1,180 @@
+# home_search/pagination.py
+"""
+Keyset (cursor) pagination for the class grid.
+
+Instead of OFFSET/LIMIT (which gets slower the deeper you page and shifts
+when rows are inserted), each page is fetched with a WHERE clause that
+continues right after the last row that was shown.  Every supported sort
+is made total by using ``id`` as a tie-breaker, so cursors are stable.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 60
+
+# sort key -> (field, descending, nullable)
+SORTS = {
+    "newest": ("id", True, False),
+    "date": ("datetime", False, True),
+    "price": ("price", False, False),
+    "-price": ("price", True, False),
+    # classes that haven't started, read from UpcomingClass (see upcoming.py)
+    "upcoming": ("datetime", False, False),
+    # only for full-text results, which carry a ``rank`` annotation
+    "relevance": ("rank", True, False),
+}
+DEFAULT_SORT = "newest"
+
+SORT_CHOICES = [
+    ("newest", "Newest"), ("upcoming", "Upcoming"), ("date", "Date"),
+    ("price", "Price: low to high"), ("-price", "Price: high to low"),
+]
+
+
+def normalize_sort(value, default=DEFAULT_SORT) -> str:
+    value = (value or "").strip().lower()
+    return value if value in SORTS else default
+
+
+def clamp_page_size(value) -> int:
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+# --------------------------- Cursor encoding ---------------------------
+
+def encode_cursor(value, pk) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, field: str):
+    """Return ``(value, pk)`` or ``None`` when the token is malformed."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        pk = int(pk)
+        if field == "datetime" and value is not None:
+            # well-formed but impossible values (month 13) raise ValueError
+            value = parse_datetime(str(value))
+            if value is None:
+                return None
+        elif field in ("id", "price", "rank") and value is not None:
+            value = float(value) if field == "rank" else int(value)
+    except (ValueError, TypeError):
+        return None
+    return value, pk
+
+
+# --------------------------- Query building ---------------------------
+
+def _ordering(field, desc, nullable, reverse=False):
+    if reverse:
+        desc = not desc
+    kw = {}
+    if nullable:
+        # NULLs sort last going forward, so they come first when walking back
+        kw = {"nulls_first": True} if reverse else {"nulls_last": True}
+    expr = F(field).desc(**kw) if desc else F(field).asc(**kw)
+    if field == "id":
+        return [expr]
+    return [expr, F("id").desc() if desc else F("id").asc()]
+
+
+def _after(field, desc, nullable, value, pk):
+    """Rows strictly after ``(value, pk)`` in forward order."""
+    op = "lt" if desc else "gt"
+    if field == "id":
+        return Q(**{f"id__{op}": pk})
+    if value is None:
+        return Q(**{f"{field}__isnull": True, f"id__{op}": pk})
+    cond = Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": pk})
+    if nullable:
+        cond |= Q(**{f"{field}__isnull": True})
+    return cond
+
+
+def _before(field, desc, nullable, value, pk):
+    """Rows strictly before ``(value, pk)`` in forward order."""
+    op = "gt" if desc else "lt"
+    if field == "id":
+        return Q(**{f"id__{op}": pk})
+    if value is None:
+        return Q(**{f"{field}__isnull": False}) | Q(**{f"{field}__isnull": True, f"id__{op}": pk})
+    return Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": pk})
+
+
+class KeysetPage:
+    """One page of results plus the cursors needed to move around."""
+
+    def __init__(self, items, sort, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.sort = sort
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def paginate(qs, sort=DEFAULT_SORT, after=None, before=None, page_size=DEFAULT_PAGE_SIZE) -> KeysetPage:
+    """
+    Return a KeysetPage of ``qs`` for the given sort.
+    ``after``/``before`` are opaque cursor tokens from a previous page;
+    ``after`` wins if both are given.
+    """
+    sort = normalize_sort(sort)
+    field, desc, nullable = SORTS[sort]
+    page_size = clamp_page_size(page_size)
+
+    after_key = decode_cursor(after, field)
+    before_key = None if after_key else decode_cursor(before, field)
+
+    if before_key:
+        rows = list(
+            qs.filter(_before(field, desc, nullable, *before_key))
+              .order_by(*_ordering(field, desc, nullable, reverse=True))[: page_size + 1]
+        )
+        has_prev = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_next = True
+    else:
+        if after_key:
+            qs = qs.filter(_after(field, desc, nullable, *after_key))
+        rows = list(qs.order_by(*_ordering(field, desc, nullable))[: page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_prev = after_key is not None
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_next:
+            last = rows[-1]
+            next_cursor = encode_cursor(getattr(last, field), last.pk)
+        if has_prev:
+            first = rows[0]
+            prev_cursor = encode_cursor(getattr(first, field), first.pk)
+    return KeysetPage(rows, sort, next_cursor, prev_cursor)
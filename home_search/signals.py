@@ -0,0 +1,80 @@
+# home_search/signals.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from ReServe import conditional
+
+from . import fulltext, upcoming
+from .caching import bump_classes_version
+from .models import Class
+from .utils import INSTRUCTOR, invalidate_all_roles, invalidate_user_role
+
+User = get_user_model()
+
+NAME_FIELDS = {"first_name", "last_name", "username"}
+
+
+# --------------------------- Full-text index, upcoming list + page caches ---------------------------
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    fulltext.forget_fts_table(connection)
+
+
+@receiver(post_save, sender=Class)
+def class_saved(sender, instance, **kwargs):
+    fulltext.index_class(instance)
+    upcoming.refresh(instance)
+    bump_classes_version()
+    conditional.forget(Class, instance.pk)
+
+
+@receiver(post_delete, sender=Class)
+def class_deleted(sender, instance, **kwargs):
+    fulltext.unindex_class(instance.pk)
+    upcoming.remove(instance.pk)
+    bump_classes_version()
+    conditional.forget(Class, instance.pk)
+
+
+# --------------------------- Role cache + profile stamps ---------------------------
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, created=False, **kwargs):
+    conditional.forget(User, instance.pk)
+    if update_fields is None or "role" in update_fields:
+        invalidate_user_role(instance)
+    # upcoming cards carry the instructor's name (group-made instructors
+    # catch up on their next class save or a rebuild)
+    if not created and instance.role == INSTRUCTOR and (
+        update_fields is None or NAME_FIELDS.intersection(update_fields)
+    ):
+        upcoming.rename_instructor(instance)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    conditional.forget(User, instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_user_role(instance)
+    elif pk_set:
+        for pk in pk_set:
+            invalidate_user_role(pk)
+    else:
+        # group.user_set.clear(): members aren't listed
+        invalidate_all_roles()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, **kwargs):
+    invalidate_all_roles()
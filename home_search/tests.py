@@ -1,3 +1,553 @@
-from django.test import TestCase
+from __future__ import annotations
 
-# Create your tests here.
+import base64
+import json
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser, Group
+from django.core.cache import cache
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings import services
+
+from . import async_views, facets, fulltext, upcoming
+from .models import Card, Class, UpcomingClass
+from .pagination import MAX_PAGE_SIZE, decode_cursor, paginate
+from .utils import is_instructor, resolve_role
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(25):
+            Class.objects.create(
+                name=f"Class {i}",
+                category="yoga" if i % 2 else "pilates",
+                price=(i % 5) * 10000,  # lots of ties -> exercises the id tie-breaker
+                # every 4th class has no date (NULLs must still be reachable)
+                datetime=None if i % 4 == 0 else now + timedelta(days=i % 3),
+            )
+
+    def setUp(self):
+        cache.clear()  # search pages are page-cached for anonymous users
+
+    def walk(self, sort, page_size=7):
+        seen, after = [], None
+        while True:
+            page = paginate(Class.objects.all(), sort=sort, after=after, page_size=page_size)
+            seen.extend(c.pk for c in page)
+            if not page.has_next:
+                return seen
+            after = page.next_cursor
+
+    def test_forward_walk_covers_every_row_once(self):
+        total = Class.objects.count()
+        for sort in ("newest", "date", "price", "-price"):
+            with self.subTest(sort=sort):
+                seen = self.walk(sort)
+                self.assertEqual(len(seen), total)
+                self.assertEqual(len(set(seen)), total)
+
+    def test_newest_matches_id_desc(self):
+        expected = list(Class.objects.order_by("-id").values_list("pk", flat=True))
+        self.assertEqual(self.walk("newest"), expected)
+
+    def test_previous_cursor_returns_same_page(self):
+        for sort in ("newest", "date", "price"):
+            with self.subTest(sort=sort):
+                first = paginate(Class.objects.all(), sort=sort, page_size=5)
+                second = paginate(Class.objects.all(), sort=sort, after=first.next_cursor, page_size=5)
+                third = paginate(Class.objects.all(), sort=sort, after=second.next_cursor, page_size=5)
+                back = paginate(Class.objects.all(), sort=sort, before=third.prev_cursor, page_size=5)
+                self.assertEqual([c.pk for c in back], [c.pk for c in second])
+                self.assertTrue(back.has_next and back.has_previous)
+
+    def test_page_size_is_capped_and_bad_cursor_ignored(self):
+        page = paginate(Class.objects.all(), page_size=10_000, after="not-a-cursor")
+        self.assertLessEqual(len(page), MAX_PAGE_SIZE)
+        self.assertFalse(page.has_previous)
+
+    def test_impossible_datetime_cursor_is_invalid(self):
+        token = base64.urlsafe_b64encode(json.dumps(["2020-13-01T10:00:00", 1]).encode()).decode()
+        self.assertIsNone(decode_cursor(token, "datetime"))
+        resp = self.client.get(reverse("home_search:search"), {"sort": "date", "after": token})
+        self.assertEqual(resp.status_code, 200)
+
+    def test_search_view_paginates_with_category(self):
+        url = reverse("home_search:search")
+        resp = self.client.get(url, {"category": "yoga", "per_page": 5})
+        self.assertEqual(resp.status_code, 200)
+        page = resp.context["page"]
+        self.assertEqual(len(page), 5)
+        self.assertTrue(all(c.category == "yoga" for c in page))
+        self.assertIn("category=yoga", resp.context["next_url"])
+        self.assertIsNone(resp.context["prev_url"])
+
+        resp = self.client.get(url + resp.context["next_url"])
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNotNone(resp.context["prev_url"])
+
+
+class CardProjectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.full = Class.objects.create(name="Full House", category="ice-skating", price=150000,
+                                        capacity=1, description="long " * 500)
+        Class.objects.filter(pk=cls.full.pk).update(seats_left=0)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cards_hold_card_fields_only(self):
+        with self.assertNumQueries(1) as ctx:
+            card = Class.objects.cards().get(pk=self.full.pk)
+        self.assertNotIn("description", ctx.captured_queries[0]["sql"])
+        self.assertIsInstance(card, Card)
+        self.assertEqual((card.pk, card.name, card.price, card.seats_left), (self.full.pk, "Full House", 150000, 0))
+        self.assertTrue(card.is_full)
+        self.assertEqual(card.get_category_display(), "Ice Skating")
+        with self.assertRaises(AttributeError):
+            card.description
+
+    def test_search_grid_renders_cards(self):
+        resp = self.client.get(reverse("home_search:search"))
+        self.assertIsInstance(resp.context["classes"].items[0], Card)
+        self.assertContains(resp, f'data-seats-for="{self.full.pk}"')
+        self.assertNotContains(resp, "seats left")  # is_full works on the card
+
+
+class FullTextSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reformer = Class.objects.create(
+            name="Evening Reformer Pilates", category="pilates",
+            location="Kemang, Jakarta", description="Small-group reformer session after work.",
+        )
+        cls.mat = Class.objects.create(
+            name="Morning Mat Pilates", category="pilates",
+            location="Senayan", description="Gentle mat flow; good after a reformer week.",
+        )
+        cls.boxing = Class.objects.create(
+            name="Boxing Basics", category="boxing", location="Kemang",
+        )
+
+    def setUp(self):
+        cache.clear()  # search pages are page-cached for anonymous users
+
+    def ids(self, q):
+        return [c.pk for c in fulltext.search(Class.objects.all(), q).order_by("-rank", "id")]
+
+    def test_ranked_match_over_all_fields(self):
+        self.assertEqual(self.ids("evening reformer pilates in Kemang"), [self.reformer.pk])
+        # name hits outrank description hits
+        self.assertEqual(self.ids("reformer"), [self.reformer.pk, self.mat.pk])
+        self.assertCountEqual(self.ids("kemang"), [self.reformer.pk, self.boxing.pk])
+
+    def test_index_follows_save_and_delete(self):
+        self.boxing.name = "Boxing Bootcamp"
+        self.boxing.save()
+        self.assertEqual(self.ids("bootcamp"), [self.boxing.pk])
+        self.assertEqual(self.ids("basics"), [])
+
+        pk = self.boxing.pk
+        self.boxing.delete()
+        self.assertNotIn(pk, self.ids("kemang"))
+
+    def test_one_query_without_a_hit_cap(self):
+        Class.objects.bulk_create(Class(name=f"Reformer Flow {i}") for i in range(1100))
+        fulltext.rebuild()
+        fulltext.sqlite_fts_available()  # the table check is remembered per connection
+        with self.assertNumQueries(1):
+            top = list(fulltext.search(Class.objects.all(), "reformer").order_by("-rank", "id")[:2000])
+        self.assertEqual(len(top), 1102)
+        self.assertEqual(top[-1].pk, self.mat.pk)  # description-only hit ranks last
+
+    def test_search_view_q_param_orders_by_relevance(self):
+        resp = self.client.get(reverse("home_search:search"), {"q": "reformer"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["sort"], "relevance")
+        self.assertEqual([c.pk for c in resp.context["page"]], [self.reformer.pk, self.mat.pk])
+
+    def test_cards_carry_rank_and_page_by_it(self):
+        qs = fulltext.search(Class.objects.all(), "reformer").cards()
+        page = paginate(qs, sort="relevance", page_size=1)
+        self.assertIsInstance(page.items[0], Card)
+        self.assertEqual(page.items[0].pk, self.reformer.pk)
+        self.assertGreater(page.items[0].rank, 0)
+        self.assertEqual([c.pk for c in paginate(qs, sort="relevance", after=page.next_cursor)], [self.mat.pk])
+
+    def test_relevance_pages_with_cursor(self):
+        qs = fulltext.search(Class.objects.all(), "pilates")
+        first = paginate(qs, sort="relevance", page_size=1)
+        second = paginate(qs, sort="relevance", after=first.next_cursor, page_size=1)
+        self.assertEqual(len(first) + len(second), 2)
+        self.assertNotEqual(first.items[0].pk, second.items[0].pk)
+        self.assertFalse(second.has_next)
+
+
+class FacetedSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        rows = [
+            ("yoga", 80_000, "Kemang", 1),
+            ("yoga", 150_000, "Senayan", 2),
+            ("pilates", 300_000, "Kemang", 3),
+            ("pilates", 90_000, "Kemang", 40),
+            ("boxing", 600_000, "Kemang", 5),
+        ]
+        for i, (cat, price, loc, days) in enumerate(rows):
+            Class.objects.create(
+                name=f"C{i}", category=cat, price=price, location=loc,
+                datetime=now + timedelta(days=days),
+            )
+
+    def setUp(self):
+        cache.clear()  # search pages are page-cached for anonymous users
+
+    def test_counts_come_from_one_query(self):
+        f = facets.parse_filters({"location": "kemang"}, category="pilates")
+        with self.assertNumQueries(1):
+            counts = facets.facet_counts(Class.objects.all(), f)
+        # category counts ignore the category filter but honour location
+        self.assertEqual(counts["categories"]["yoga"], 1)
+        self.assertEqual(counts["categories"]["pilates"], 2)
+        self.assertEqual(counts["categories"]["boxing"], 1)
+        self.assertEqual(counts["total"], 4)
+        # price bands honour the category filter
+        self.assertEqual(counts["price_bands"]["under-100k"], 1)
+        self.assertEqual(counts["price_bands"]["250k-500k"], 1)
+        self.assertEqual(counts["price_bands"]["500k-plus"], 0)
+
+    def test_combined_filters(self):
+        today = timezone.localdate()
+        params = {
+            "price_min": "50000", "price_max": "400000",
+            "from": today.isoformat(), "to": (today + timedelta(days=10)).isoformat(),
+            "location": "kemang",
+        }
+        f = facets.parse_filters(params, category="")
+        names = set(facets.apply_filters(Class.objects.all(), f).values_list("name", flat=True))
+        self.assertEqual(names, {"C0", "C2"})
+
+    def test_impossible_dates_are_ignored(self):
+        f = facets.parse_filters({"from": "2020-02-30", "to": "2020-13-01"})
+        self.assertEqual((f["start"], f["end"]), (None, None))
+        self.assertIsNone(facets.parse_filters({"from": "2020-01-01T25:00"})["start"])
+        self.assertIsNone(facets.parse_filters({"to": "9999-12-31"})["end"])
+        # a bare "to" date covers that whole day
+        self.assertEqual(facets.parse_filters({"to": "2020-01-01"})["end"].date().isoformat(), "2020-01-02")
+
+        resp = self.client.get(reverse("home_search:search"), {"from": "2020-02-30", "to": "2020-13-01"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.context["page"]), 5)
+
+    def test_search_view_renders_counts_and_keeps_filters_in_chip_links(self):
+        resp = self.client.get(reverse("home_search:search"), {"category": "yoga", "price_max": "100000"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([c.name for c in resp.context["page"]], ["C0"])
+        chips = {key: (count, url) for key, _, count, url in resp.context["category_chips"]}
+        self.assertEqual(chips["pilates"][0], 1)
+        self.assertIn("price_max=100000", chips["pilates"][1])
+
+
+class RoleResolutionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(username="member", password="pass12345", handle="member_1")
+        cls.teacher = User.objects.create_user(
+            username="teacher", password="pass12345", handle="teacher_1", role="instructor",
+        )
+        cls.group = Group.objects.create(name="Instructor")
+
+    def setUp(self):
+        cache.clear()
+
+    def fresh(self, user):
+        return User.objects.get(pk=user.pk)
+
+    def test_anonymous_and_role_field_need_no_queries(self):
+        teacher = self.fresh(self.teacher)
+        with self.assertNumQueries(0):
+            self.assertFalse(is_instructor(AnonymousUser()))
+            self.assertTrue(is_instructor(teacher))
+
+    def test_member_group_lookup_is_cached_across_requests(self):
+        user = self.fresh(self.member)
+        with self.assertNumQueries(1):
+            self.assertFalse(is_instructor(user))
+            self.assertFalse(is_instructor(user))  # memoized for this request
+        other_request_user = self.fresh(self.member)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_role(other_request_user), "member")
+
+    def test_group_membership_change_invalidates(self):
+        self.assertFalse(is_instructor(self.fresh(self.member)))
+        self.member.groups.add(self.group)
+        self.assertTrue(is_instructor(self.fresh(self.member)))
+        self.group.accounts_user_set.remove(self.member)
+        self.assertFalse(is_instructor(self.fresh(self.member)))
+
+    def test_role_change_invalidates(self):
+        user = self.fresh(self.member)
+        self.assertFalse(is_instructor(user))
+        user.role = "instructor"
+        user.save(update_fields=["role"])
+        self.assertTrue(is_instructor(user))
+        self.assertTrue(is_instructor(self.fresh(self.member)))
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yoga = Class.objects.create(name="Sunrise Yoga", category="yoga")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_search_served_from_cache_until_class_changes(self):
+        url = reverse("home_search:search")
+        first = self.client.get(url, {"category": "yoga"})
+        self.assertEqual(first["X-Page-Cache"], "miss")
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {"category": "yoga"})
+        self.assertEqual(second["X-Page-Cache"], "hit")
+        self.assertEqual(first.content, second.content)
+
+        # other categories are cached separately
+        self.assertEqual(self.client.get(url, {"category": "dance"})["X-Page-Cache"], "miss")
+
+        self.yoga.name = "Sunset Yoga"
+        self.yoga.save()
+        third = self.client.get(url, {"category": "yoga"})
+        self.assertEqual(third["X-Page-Cache"], "miss")
+        self.assertContains(third, "Sunset Yoga")
+
+        self.yoga.delete()
+        self.assertNotContains(self.client.get(url, {"category": "yoga"}), "Sunset Yoga")
+
+    def test_home_cached_for_anonymous_only(self):
+        url = reverse("home_search:home")
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "hit")
+
+        User.objects.create_user(username="visitor", password="pass12345", handle="visitor_1")
+        self.client.login(username="visitor", password="pass12345")
+        self.assertNotIn("X-Page-Cache", self.client.get(url))
+
+
+class UpcomingClassTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.coach = User.objects.create_user(
+            username="coach", password="pass12345", handle="coach_1", first_name="Dewi", last_name="Lestari",
+        )
+        cls.soon = Class.objects.create(name="Soon Yoga", category="yoga", owner=cls.coach,
+                                        datetime=now + timedelta(hours=2), capacity=10)
+        cls.later = Class.objects.create(name="Later Boxing", category="boxing", owner=cls.coach,
+                                         datetime=now + timedelta(days=3))
+        cls.past = Class.objects.create(name="Past Dance", category="dance", datetime=now - timedelta(days=1))
+        cls.undated = Class.objects.create(name="Someday Pilates", category="pilates")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_signals_keep_rows_in_step(self):
+        self.assertEqual(set(UpcomingClass.objects.values_list("pk", flat=True)), {self.soon.pk, self.later.pk})
+        row = UpcomingClass.objects.get(pk=self.soon.pk)
+        self.assertEqual((row.name, row.instructor, row.capacity), ("Soon Yoga", "Dewi Lestari", 10))
+
+        self.soon.name = "Soon Hatha"
+        self.soon.save()
+        self.assertEqual(UpcomingClass.objects.get(pk=self.soon.pk).name, "Soon Hatha")
+
+        self.later.datetime = timezone.now() - timedelta(minutes=1)
+        self.later.save()
+        self.assertFalse(UpcomingClass.objects.filter(pk=self.later.pk).exists())
+
+        self.soon.delete()
+        self.assertFalse(UpcomingClass.objects.exists())
+
+    def test_instructor_rename_follows(self):
+        self.coach.role = "instructor"
+        self.coach.first_name = "Sari"
+        self.coach.save()
+        self.assertEqual(UpcomingClass.objects.get(pk=self.soon.pk).instructor, "Sari Lestari")
+
+    def test_seats_read_from_class(self):
+        member = User.objects.create_user(username="booker", password="pass12345", handle="booker_1")
+        services.reserve(self.soon, member)
+        item = upcoming.with_seats(upcoming.queryset()).cards().order_by("datetime")[0]
+        self.assertEqual((item.pk, item.seats_left, item.booked_count), (self.soon.pk, 9, 1))
+
+    def test_sweep_drops_started_classes(self):
+        self.assertEqual(upcoming.sweep(now=timezone.now() + timedelta(days=1)), 1)
+        self.assertEqual(list(UpcomingClass.objects.values_list("pk", flat=True)), [self.later.pk])
+
+    def test_rebuild_matches_signals(self):
+        UpcomingClass.objects.all().delete()
+        self.assertEqual(upcoming.rebuild(), 2)
+        self.assertEqual(UpcomingClass.objects.get(pk=self.later.pk).instructor, "Dewi Lestari")
+
+    def test_upcoming_sort_pages_by_start_time(self):
+        url = reverse("home_search:search")
+        resp = self.client.get(url, {"sort": "upcoming", "per_page": 1})
+        self.assertEqual([c.pk for c in resp.context["classes"]], [self.soon.pk])
+        self.assertEqual(resp.context["facet_total"], 2)
+        resp = self.client.get(url + resp.context["next_url"])
+        self.assertEqual([c.pk for c in resp.context["classes"]], [self.later.pk])
+        self.assertIsNone(resp.context["next_url"])
+
+        resp = self.client.get(url, {"sort": "upcoming", "category": "boxing"})
+        self.assertEqual([c.pk for c in resp.context["classes"]], [self.later.pk])
+
+    def test_text_match_within_upcoming(self):
+        self.assertEqual([c.pk for c in upcoming.matching(upcoming.queryset(), "yoga")], [self.soon.pk])
+
+        # PostgreSQL: the match runs in a subquery, where Class is aliased
+        with mock.patch.object(fulltext, "_vendor", return_value="postgresql"):
+            sql = str(upcoming.matching(upcoming.queryset(), "yoga").query)
+        self.assertIn('U0."search_vector" @@', sql)
+        self.assertNotIn("home_search_class.search_vector", sql)
+
+    def test_home_lists_upcoming_classes(self):
+        resp = self.client.get(reverse("home_search:home"))
+        self.assertEqual([c.pk for c in resp.context["upcoming"]], [self.soon.pk, self.later.pk])
+        self.assertContains(resp, "Soon Yoga")
+        self.assertNotContains(resp, "Past Dance")
+        self.assertContains(resp, "10 spots left")
+
+        # the page is cached for anonymous visitors; a booking retires it
+        member = User.objects.create_user(username="booker", password="pass12345", handle="booker_1")
+        with self.captureOnCommitCallbacks(execute=True):
+            services.reserve(self.soon, member)
+        self.assertContains(self.client.get(reverse("home_search:home")), "9 spots left")
+
+
+class ConditionalDetailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.coach = User.objects.create_user(username="etagcoach", password="pass12345", handle="etag_coach")
+        cls.member = User.objects.create_user(username="etagmember", password="pass12345", handle="etag_member")
+        cls.c = Class.objects.create(name="Stamp Yoga", category="yoga", owner=cls.coach, capacity=5)
+        cls.url = reverse("home_search:class_detail", args=[cls.c.pk])
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, etag):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_anonymous_revalidation_needs_no_query(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first["Cache-Control"], "public, max-age=60")
+        self.assertIn("Last-Modified", first)
+        self.assertNotIn("csrfmiddlewaretoken", first.content.decode())
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(first["ETag"]), 304)
+
+    def test_changes_shown_on_the_page_refresh_it(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            services.reserve(self.c, self.member)  # seats left changed
+        self.assertEqual(self.revalidate(etag), 200)
+
+        etag = self.client.get(self.url)["ETag"]
+        self.coach.first_name = "Renamed"  # instructor name on the page
+        self.coach.save()
+        self.assertEqual(self.revalidate(etag), 200)
+
+        etag = self.client.get(self.url)["ETag"]
+        self.c.name = "Stamp Pilates"
+        self.c.save()
+        self.assertEqual(self.revalidate(etag), 200)
+        self.assertEqual(self.revalidate(self.client.get(self.url)["ETag"]), 304)
+
+    def test_signed_in_pages_are_private_per_viewer(self):
+        anonymous = self.client.get(self.url)["ETag"]
+        self.client.login(username="etagmember", password="pass12345")
+        resp = self.client.get(self.url)
+        self.assertEqual(resp["Cache-Control"], "private, no-cache")
+        self.assertNotEqual(resp["ETag"], anonymous)
+        self.assertEqual(self.revalidate(resp["ETag"]), 304)
+
+    def test_pending_messages_skip_validators(self):
+        self.client.login(username="etagmember", password="pass12345")
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            services.reserve(self.c, self.member)
+        etag = self.client.get(self.url)["ETag"]
+        # a second booking from another tab redirects back with an error message
+        resp = self.client.post(reverse("bookings:book", args=[self.c.pk]), HTTP_IF_NONE_MATCH=etag, follow=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("ETag", resp)
+        self.assertContains(resp, "already have a seat")
+        # shown once, then the page revalidates again
+        self.assertEqual(self.revalidate(self.client.get(self.url)["ETag"]), 304)
+
+    async def test_async_view_answers_304(self):
+        first = await async_views.class_detail(async_get(self.url), pk=self.c.pk)
+        request = async_get(self.url)
+        request.META["HTTP_IF_NONE_MATCH"] = first["ETag"]
+        self.assertEqual((await async_views.class_detail(request, pk=self.c.pk)).status_code, 304)
+
+
+def async_get(path, user=None, **params):
+    """An AsyncRequestFactory GET with the auth middleware's ``auser`` in place."""
+    request = AsyncRequestFactory().get(path, params)
+    user = user or AnonymousUser()
+
+    async def auser():
+        return user
+
+    request.auser = auser
+    return request
+
+
+class AsyncViewTests(TestCase):
+    """The ASGI variants render what the sync views render."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(username="asyncmember", password="pass12345", handle="async_member")
+        cls.classes = [
+            Class.objects.create(name=f"Async {i}", category="yoga" if i % 2 else "boxing", price=i * 10000)
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_search_matches_sync_view(self):
+        params = {"category": "yoga", "sort": "price"}
+        resp = await async_views.search(async_get(reverse("home_search:search"), **params))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["X-Page-Cache"], "miss")
+        sync = await self.async_client.get(reverse("home_search:search"), params)
+        self.assertEqual(resp.content, sync.content)
+
+    async def test_home_served_from_page_cache(self):
+        await async_views.home(async_get("/"))
+        resp = await async_views.home(async_get("/"))
+        self.assertEqual(resp["X-Page-Cache"], "hit")
+        resp = await async_views.home(async_get("/", user=self.member))
+        self.assertNotIn("X-Page-Cache", resp)
+
+    async def test_class_detail_shows_own_booking(self):
+        c = self.classes[0]
+        await sync_to_async(services.reserve)(c, self.member)
+        url = reverse("home_search:class_detail", args=[c.pk])
+        resp = await async_views.class_detail(async_get(url, user=self.member), pk=c.pk)
+        self.assertContains(resp, "You're booked")
+        with self.assertRaises(Http404):
+            await async_views.class_detail(async_get(url), pk=0)
@@ -0,0 +1,117 @@
+# home_search/upcoming.py
+"""
+Upkeep of the ``UpcomingClass`` read model.
+
+The browse pages list classes that have not started yet, by start time,
+usually within one category.  Against ``Class`` that is a filter on a
+nullable column over every class ever made, dragging the description
+along; ``UpcomingClass`` holds only future classes and only card fields,
+with (category, datetime, id) / (datetime, id) indexes in list order.
+
+* ``refresh(obj)`` / ``remove(pk)`` follow each Class save / delete (see
+  ``home_search.signals``), one upsert or delete each.
+* ``sweep()`` drops rows whose class has started; run it periodically
+  (``manage.py sweep_upcoming``, e.g. every few minutes from cron).
+  Pages filter on ``datetime > now`` too, so a late sweep never shows a
+  started class, it only leaves a few dead rows in the index.
+* ``rebuild()`` re-creates the table after writes that skip signals
+  (bulk imports, ``seed_scale``).
+
+Seats left are not copied: bookings change them with F() updates on Class
+many times a minute, so ``with_seats()`` reads them from Class for just the
+rows on the page.
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from . import fulltext
+from .caching import bump_classes_version
+from .models import Class, UpcomingClass
+
+CARD_FIELDS = ("owner_id", "instructor", "name", "category", "price", "image_url", "location", "datetime", "capacity")
+REBUILD_BATCH = 2000
+
+
+def instructor_name(user) -> str:
+    return (user.get_full_name() or user.username) if user else ""
+
+
+def _row(obj, instructor) -> UpcomingClass:
+    return UpcomingClass(
+        id=obj.pk, owner_id=obj.owner_id, instructor=instructor,
+        name=obj.name, category=obj.category, price=obj.price, image_url=obj.image_url,
+        location=obj.location, datetime=obj.datetime, capacity=obj.capacity,
+    )
+
+
+def queryset(now=None):
+    """Classes that haven't started, as UpcomingClass rows."""
+    return UpcomingClass.objects.filter(datetime__gt=now or timezone.now())
+
+
+def matching(qs, q):
+    """Rows of ``qs`` whose class matches the full-text query ``q`` (unranked)."""
+    return qs.filter(pk__in=fulltext.search(Class.objects.all(), q).values("pk"))
+
+
+def with_seats(qs):
+    """Annotate ``seats_left`` from Class (run on a page, not before aggregates)."""
+    return qs.annotate(seats_left=Subquery(Class.objects.filter(pk=OuterRef("pk")).values("seats_left")[:1]))
+
+
+def listing(category=None, limit=8):
+    qs = queryset()
+    if category:
+        qs = qs.filter(category=category)
+    return with_seats(qs).cards().order_by("datetime", "id")[:limit]
+
+
+def refresh(obj) -> None:
+    """Bring ``obj``'s row in line with the Class: upsert it, or drop it once started / undated."""
+    if obj.datetime is None or obj.datetime <= timezone.now():
+        remove(obj.pk)
+        return
+    # obj.owner is usually cached already (forms set it); otherwise one lookup
+    row = _row(obj, instructor_name(obj.owner) if obj.owner_id else "")
+    UpcomingClass.objects.bulk_create(
+        [row], update_conflicts=True, unique_fields=["id"], update_fields=list(CARD_FIELDS),
+    )
+
+
+def remove(pk) -> None:
+    UpcomingClass.objects.filter(pk=pk).delete()
+
+
+def rename_instructor(user) -> int:
+    return UpcomingClass.objects.filter(owner_id=user.pk).update(instructor=instructor_name(user))
+
+
+def sweep(now=None) -> int:
+    """Delete the rows of classes that have started.  Returns how many."""
+    deleted, _ = UpcomingClass.objects.filter(datetime__lte=now or timezone.now()).delete()
+    if deleted:
+        bump_classes_version()
+    return deleted
+
+
+def rebuild(now=None) -> int:
+    """Re-create every row from Class.  Returns the number of upcoming classes."""
+    classes = (
+        Class.objects.filter(datetime__gt=now or timezone.now())
+        .select_related("owner")
+        .only("owner", "name", "category", "price", "image_url", "location", "datetime", "capacity",
+              "owner__username", "owner__first_name", "owner__last_name")
+    )
+    total, batch = 0, []
+    with transaction.atomic():
+        UpcomingClass.objects.all().delete()
+        for obj in classes.iterator(chunk_size=REBUILD_BATCH):
+            batch.append(_row(obj, instructor_name(obj.owner)))
+            if len(batch) >= REBUILD_BATCH:
+                UpcomingClass.objects.bulk_create(batch)
+                total, batch = total + len(batch), []
+        UpcomingClass.objects.bulk_create(batch)
+        total += len(batch)
+    bump_classes_version()
+    return total
@@ -1,13 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = "home_search"
 
+# Under ASGI the read-only pages are served by their async variants
+if settings.ASYNC_VIEWS:
+    home, search, class_detail = async_views.home, async_views.search, async_views.class_detail
+else:
+    home, search, class_detail = views.home, views.search, views.ClassDetailView.as_view()
+
 urlpatterns = [
-    path("", views.home, name="home"),
-    path("search/", views.search, name="search"),
+    path("", home, name="home"),
+    path("search/", search, name="search"),
     path("classes/create/", views.ClassCreateView.as_view(), name="class_create"),
-    path("classes/<int:pk>/", views.ClassDetailView.as_view(), name="class_detail"),
+    path("classes/<int:pk>/", class_detail, name="class_detail"),
     path("classes/<int:pk>/edit/", views.ClassUpdateView.as_view(), name="class_edit"),
     path("classes/<int:pk>/delete/", views.ClassDeleteView.as_view(), name="class_delete"),
 ]
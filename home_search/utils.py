@@ -1,36 +1,86 @@
 # home_search/utils.py
+from ReServe.reserve_cache import Namespace
+
+INSTRUCTOR = "instructor"
+MEMBER = "member"
+ANONYMOUS = "anonymous"
+
+# Cross-request role cache: the "roles" namespace version is bumped when a
+# Group changes (or is cleared from the Group side); each user also gets a
+# scope of their own, bumped when that user's role or groups change.
+ROLE_CACHE_TIMEOUT = 60 * 60
+roles = Namespace("roles", timeout=ROLE_CACHE_TIMEOUT)
+# attribute used to memoize the answer on request.user for the rest of the request
+_MEMO_ATTR = "_reserve_role"
+
+
 def _is_role_string(x) -> bool:
     return isinstance(x, str) and x.strip().lower() in {"instructor", "instr", "teacher"}
 
-# home_search/utils.py
-def is_instructor(user):
-    if not getattr(user, "is_authenticated", False):
-        return False
 
+def _compute_role(user) -> str:
     # 1) user.role (string field on your accounts.User)
     role = getattr(user, "role", None)
-    if role and str(role).lower() == "instructor":
-        return True
+    if role and str(role).lower() == INSTRUCTOR:
+        return INSTRUCTOR
 
     # 2) related profile-like objects (if any exist in your project)
     for attr in ("profile", "userprofile", "account", "accounts_profile"):
         prof = getattr(user, attr, None)
         if prof:
             r = getattr(prof, "role", None)
-            if r and str(r).lower() == "instructor":
-                return True
+            if r and str(r).lower() == INSTRUCTOR:
+                return INSTRUCTOR
 
     # 3) Django group fallback
     try:
-        if user.groups.filter(name__iexact="instructor").exists():
-            return True
+        if user.groups.filter(name__iexact=INSTRUCTOR).exists():
+            return INSTRUCTOR
     except Exception:
         pass
 
-    return False
+    return MEMBER
+
+
+def resolve_role(user) -> str:
+    """
+    Role of ``user`` ("instructor" / "member" / "anonymous").
+    Resolved at most once per request (memoized on the user object) and
+    cached across requests; anonymous users and users whose ``role`` field
+    already says instructor never touch the cache or the DB.
+    """
+    if not getattr(user, "is_authenticated", False):
+        return ANONYMOUS
+
+    memo = getattr(user, _MEMO_ATTR, None)
+    if memo is not None:
+        return memo
+
+    role = getattr(user, "role", None)
+    if role and str(role).lower() == INSTRUCTOR:
+        resolved = INSTRUCTOR
+    else:
+        resolved = roles.scope(user.pk).get_or_set((role,), lambda: _compute_role(user))
+
+    try:
+        setattr(user, _MEMO_ATTR, resolved)
+    except AttributeError:
+        pass
+    return resolved
+
 
+def is_instructor(user):
+    return resolve_role(user) == INSTRUCTOR
 
 
+# --------------------------- Invalidation ---------------------------
 
+def invalidate_user_role(user_or_pk) -> None:
+    pk = getattr(user_or_pk, "pk", user_or_pk)
+    roles.scope(pk).bump()
+    if hasattr(user_or_pk, _MEMO_ATTR):
+        delattr(user_or_pk, _MEMO_ATTR)
 
 
+def invalidate_all_roles() -> None:
+    roles.bump()
@@ -1,29 +1,43 @@
 # home_search/views.py
 
+import logging
+import uuid
+
 from django.db.models import Q
 from django.shortcuts import render
-from django.core.paginator import Paginator
 
+from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.utils.decorators import method_decorator
 from django.views.generic import DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 
+from bookings.models import Booking
+from ReServe.conditional import conditional_page, remember, stamp
+
 from .models import Class, CATEGORY_CHOICES
 from .forms import ClassForm
 from .utils import is_instructor   # ← use the ONE canonical checker
+from . import facets, fulltext, upcoming
+from .caching import cache_anonymous_page
+from .pagination import paginate, normalize_sort, DEFAULT_SORT, SORT_CHOICES
+
+# per-request debug lines; shown with LOG_LEVEL=DEBUG
+logger = logging.getLogger("reserve.views")
 
 
 # --------------------------- Pages ---------------------------
 
+@cache_anonymous_page("home")
 def home(request):
     """
-    Home page: show some classes (or all).
-    Pass categories for the horizontal scroller chips on the home page.
+    Home page: static hero, category scroller and the next few classes
+    (one indexed read of UpcomingClass).
+    Anonymous visitors get the cached render.
     """
-    classes = Class.objects.all().order_by("-id")
     ctx = {
-        "classes": classes,
         "categories": CATEGORY_CHOICES,
+        "upcoming": list(upcoming.listing()),
         "show_create_button": is_instructor(request.user),
     }
     return render(request, "home_search/home.html", ctx)
@@ -37,25 +51,100 @@ ALIASES = {
     "muay thai": "muaythai",
 }
 
-def search(request):
-    qs = Class.objects.all().order_by("-id")
-
-    # Normalize category param and filter if valid
+def _page_url(request, **params):
+    """
+    Current query string with the cursor dropped and ``params`` applied
+    (a value of None removes that key).
+    """
+    q = request.GET.copy()
+    for key in ("after", "before"):
+        q.pop(key, None)
+    for key, value in params.items():
+        if value is None:
+            q.pop(key, None)
+        else:
+            q[key] = value
+    return f"?{q.urlencode()}"
+
+
+def search_context(request) -> dict:
+    """
+    Everything search.html needs: full-text, facet counts, keyset page.
+    Shared by the sync view and its async twin (which runs it in a thread).
+    """
+    # Normalize category param (filtered below together with the other facets)
     category = (request.GET.get("category") or "").strip().lower().replace(" ", "-")
     category = ALIASES.get(category, category)
     valid = {k for k, _ in CATEGORY_CHOICES}
-    if category in valid:
-        qs = qs.filter(category=category)
 
-    flag = is_instructor(request.user)
-    print(f"[/search] user={getattr(request.user,'username',request.user)} | is_instructor={flag}")
+    # Free-text ?q= goes through the ranked index; results default to relevance order
+    q = (request.GET.get("q") or "").strip()
+    sort = normalize_sort(request.GET.get("sort"), default="relevance" if q else DEFAULT_SORT)
+    if sort == "upcoming":
+        # the narrow read model; matches of ?q= come from the index by id
+        qs = upcoming.queryset()
+        if q:
+            qs = upcoming.matching(qs, q)
+    elif q:
+        qs = fulltext.search(Class.objects.all(), q)
+    else:
+        qs = Class.objects.all()
+        if sort == "relevance":
+            sort = DEFAULT_SORT
+
+    # Facets: counts come from one aggregate over the unfiltered-by-facet queryset
+    filters = facets.parse_filters(request.GET, category=category if category in valid else "")
+    counts = facets.facet_counts(qs, filters)
+    qs = facets.apply_filters(qs, filters)
+
+    category_chips = [
+        (key, label, counts["categories"][key], _page_url(request, category=key))
+        for key, label in CATEGORY_CHOICES
+    ]
+    price_chips = []
+    for key, label, lo, hi in facets.PRICE_BANDS:
+        hi_incl = hi - 1 if hi is not None else None
+        active = filters["price_min"] == lo and filters["price_max"] == hi_incl
+        url = _page_url(request, price_min=None, price_max=None) if active else \
+            _page_url(request, price_min=lo, price_max=hi_incl)
+        price_chips.append((key, label, counts["price_bands"][key], url, active))
+
+    # Keyset pagination: ?sort=<key>&after=<cursor> / ?before=<cursor>, ?per_page capped;
+    # rows are Card projections (no description, no model instances)
+    page = paginate(
+        (upcoming.with_seats(qs) if sort == "upcoming" else qs).cards(),
+        sort=sort,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        page_size=request.GET.get("per_page"),
+    )
 
-    return render(request, "home_search/search.html", {
-        "classes": qs,
+    flag = is_instructor(request.user)
+    logger.debug("search user=%s is_instructor=%s q=%r sort=%s results=%d",
+                 getattr(request.user, "username", "") or "-", flag, q, page.sort, len(page))
+
+    return {
+        "classes": page,
+        "page": page,
+        "sort": page.sort,
+        "sort_choices": ([("relevance", "Relevance")] if q else []) + SORT_CHOICES,
+        "q": q,
+        "next_url": _page_url(request, after=page.next_cursor) if page.has_next else None,
+        "prev_url": _page_url(request, before=page.prev_cursor) if page.has_previous else None,
         "categories": CATEGORY_CHOICES,
+        "category_chips": category_chips,
+        "price_chips": price_chips,
+        "facet_total": counts["total"],
+        "all_url": _page_url(request, category=None),
+        "filters": filters,
         "active_category": category,
         "show_create_button": flag,
-    })
+    }
+
+
+@cache_anonymous_page("search")
+def search(request):
+    return render(request, "home_search/search.html", search_context(request))
 
 
 # --------------------------- CRUD views ---------------------------
@@ -66,11 +155,44 @@ class OwnerRequiredMixin(UserPassesTestMixin):
         return self.request.user.is_authenticated and obj.owner_id == self.request.user.id
 
 
+def detail_stamps(request, pk):
+    """The class and its owner (the page shows the instructor's name); None until both are cached."""
+    row = stamp(Class, pk)
+    if row is None or row[1] is None:
+        return row and [row]
+    owner = stamp(get_user_model(), row[1])
+    return [row, owner] if owner is not None else None
+
+
+def remember_class(c) -> None:
+    remember(c)
+    if c.owner_id:
+        remember(c.owner)
+
+
+@method_decorator(conditional_page(detail_stamps), name="dispatch")
 class ClassDetailView(DetailView):
     model = Class
+    queryset = Class.objects.select_related("owner")
     template_name = "home_search/class_detail.html"
     context_object_name = "c"
 
+    def get_object(self, queryset=None):
+        obj = super().get_object(queryset)
+        remember_class(obj)
+        return obj
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        user = self.request.user
+        ctx["my_booking"] = (
+            Booking.objects.filter(gym_class=self.object, user=user, status__in=Booking.ACTIVE).first()
+            if user.is_authenticated else None
+        )
+        # one key per rendered form: a double submit replays instead of double-booking
+        ctx["idempotency_key"] = uuid.uuid4().hex
+        return ctx
+
 
 class ClassCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     model = Class
@@ -81,7 +203,8 @@ class ClassCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     def test_func(self):
         # Only instructors may access
         allowed = is_instructor(self.request.user)
-        print(f"[create] user={getattr(self.request.user,'username',self.request.user)} is_instructor={allowed}")
+        logger.debug("class_create user=%s is_instructor=%s",
+                     getattr(self.request.user, "username", "") or "-", allowed)
         return allowed
 
     def form_valid(self, form):
@@ -0,0 +1,53 @@
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs import queue
+
+
+def _worker_main(index: int, once: bool, poll: float) -> int:
+    # spawn start method: the child is a fresh interpreter
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl-C
+    return queue.work(f"{queue.worker_name()}#{index}", once=once, poll=poll)
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (jobs.queue) in a pool of processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=min(os.cpu_count() or 1, 4),
+            help="Worker processes (1 = run in this process). Default: CPUs, at most 4.",
+        )
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds between polls when idle.")
+        parser.add_argument("--once", action="store_true", help="Exit when no job is due.")
+
+    def handle(self, *args, processes, poll, once, **options):
+        if processes <= 1:
+            ran = queue.work(once=once, poll=poll)
+            self.stdout.write(f"{ran} job(s) run")
+            return
+
+        # children must not inherit this process's open DB connections
+        connections.close_all()
+        method = "fork" if hasattr(os, "fork") else "spawn"
+        self.stdout.write(f"Starting {processes} workers ({method})")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=get_context(method)) as pool:
+            futures = [pool.submit(_worker_main, i, once, poll) for i in range(processes)]
+            try:
+                ran = sum(f.result() for f in futures)
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping workers")
+                for proc in pool._processes.values():
+                    proc.terminate()
+                raise SystemExit(0)
+        self.stdout.write(f"{ran} job(s) run")
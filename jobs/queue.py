@@ -0,0 +1,204 @@
+"""
+A small database-backed job queue.
+
+Register a function with ``@task`` and call ``func.enqueue(*args, **kwargs)``
+from a view: a ``Job`` row is written and the view returns right away.
+``manage.py run_workers`` picks queued jobs up in separate processes.
+
+Life cycle::
+
+    queued --claim--> running --ok--> done
+                         |
+                         +--error--> queued again (run_at pushed back with
+                         |           exponential backoff) ... failed once
+                         |           max_attempts is reached
+                         +--worker died--> queued again after JOBS_LOCK_TIMEOUT
+
+Claiming is a conditional ``UPDATE ... WHERE status = 'queued'``, so two
+workers can never run the same job, on SQLite as well as Postgres.
+Arguments and return values must be JSON-serializable.
+
+With ``JOBS_EAGER = True`` (handy in development and tests) ``enqueue``
+runs the job inline instead.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from jobs.models import Job
+
+logger = logging.getLogger("reserve.jobs")
+
+_tasks = {}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def task(func=None, *, name=None, max_attempts=3):
+    """
+    Register ``func`` as a background task::
+
+        @task(max_attempts=5)
+        def send_digest(user_id): ...
+
+        send_digest.enqueue(user.pk)
+    """
+    def register(f):
+        task_name = name or f"{f.__module__}.{f.__qualname__}"
+        _tasks[task_name] = f
+        f.task_name = task_name
+        f.max_attempts = max_attempts
+
+        def enqueue_task(*args, **kwargs):
+            return enqueue(task_name, *args, **kwargs)
+
+        f.enqueue = enqueue_task
+        return f
+
+    return register(func) if func is not None else register
+
+
+def get_task(name: str):
+    if name not in _tasks:
+        # not imported in this process yet: the dotted name is the import path
+        import_string(name)
+    return _tasks[name]
+
+
+def discover() -> None:
+    """Import ``<app>.tasks`` for every installed app (worker start-up)."""
+    autodiscover_modules("tasks")
+
+
+def enqueue(task_name: str, *args, owner=None, run_at=None, max_attempts=None, **kwargs) -> Job:
+    """
+    Queue ``task_name(*args, **kwargs)``. ``owner``, ``run_at`` and
+    ``max_attempts`` are reserved for the queue itself.
+    """
+    if max_attempts is None:
+        max_attempts = getattr(_tasks.get(task_name), "max_attempts", 3)
+    job = Job.objects.create(
+        task=task_name,
+        args=list(args),
+        kwargs=kwargs,
+        owner=owner,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+    if _setting("JOBS_EAGER", False):
+        claimed = claim(job.pk, worker_id="eager")
+        if claimed is not None:
+            run_job(claimed)
+        job.refresh_from_db()
+    return job
+
+
+def backoff(attempts: int) -> timedelta:
+    """Delay before retry number ``attempts``: base * 2^(n-1), capped at an hour."""
+    base = _setting("JOBS_BACKOFF_BASE", 10)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), 3600))
+
+
+# ---- worker side ----
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(pk: int, worker_id: str):
+    """Take job ``pk`` if it is still queued; None if another worker won."""
+    won = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+        status=Job.RUNNING,
+        locked_by=worker_id,
+        locked_at=timezone.now(),
+        attempts=F("attempts") + 1,
+    )
+    return Job.objects.get(pk=pk) if won else None
+
+
+def claim_next(worker_id: str, candidates: int = 10):
+    """The oldest due job this worker managed to claim, or None."""
+    due = (
+        Job.objects.filter(status=Job.QUEUED, run_at__lte=timezone.now())
+        .order_by("run_at", "pk")
+        .values_list("pk", flat=True)[:candidates]
+    )
+    for pk in due:
+        job = claim(pk, worker_id)
+        if job is not None:
+            return job
+    return None
+
+
+def requeue_stale() -> int:
+    """Put back jobs whose worker died mid-run (locked longer than JOBS_LOCK_TIMEOUT)."""
+    cutoff = timezone.now() - timedelta(seconds=_setting("JOBS_LOCK_TIMEOUT", 600))
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.QUEUED, locked_by="", locked_at=None,
+    )
+
+
+def run_job(job: Job) -> Job:
+    """Execute a claimed job and record the outcome."""
+    started = time.monotonic()
+    try:
+        func = get_task(job.task)
+        result = func(*job.args, **job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + backoff(job.attempts)
+            logger.warning("job %s failed (attempt %s/%s), retrying at %s",
+                           job, job.attempts, job.max_attempts, job.run_at)
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+            logger.error("job %s failed permanently:\n%s", job, job.last_error)
+    else:
+        job.status = Job.DONE
+        job.result = result
+        job.last_error = ""
+        job.finished_at = timezone.now()
+        logger.info("job %s done in %.2fs", job, time.monotonic() - started)
+    job.locked_by, job.locked_at = "", None
+    job.save(update_fields=["status", "result", "last_error", "run_at", "finished_at", "locked_by", "locked_at"])
+    return job
+
+
+def work(worker_id: str | None = None, once: bool = False, poll: float = 1.0) -> int:
+    """
+    Worker loop: claim and run due jobs until interrupted.  With ``once``
+    it returns as soon as nothing is due.  Returns the number of jobs run.
+    """
+    worker_id = worker_id or worker_name()
+    discover()
+    ran = 0
+    last_sweep = 0.0
+    while True:
+        if not connection.in_atomic_block:  # e.g. called from a test transaction
+            close_old_connections()
+        if time.monotonic() - last_sweep > 60:
+            requeue_stale()
+            last_sweep = time.monotonic()
+        job = claim_next(worker_id)
+        if job is None:
+            if once:
+                return ran
+            time.sleep(poll)
+            continue
+        run_job(job)
+        ran += 1
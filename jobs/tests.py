@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import io
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+
+User = get_user_model()
+
+CALLS = []
+
+
+@queue.task(name="tests.record")
+def record(value):
+    CALLS.append(value)
+    return {"value": value}
+
+
+@queue.task(name="tests.flaky", max_attempts=2)
+def flaky():
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_then_worker_runs_job(self):
+        job = record.enqueue(7)
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(CALLS, [])
+
+        self.assertEqual(queue.work("w1", once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.attempts), (Job.DONE, {"value": 7}, 1))
+        self.assertEqual(CALLS, [7])
+
+    def test_job_is_claimed_once(self):
+        job = record.enqueue(1)
+        self.assertIsNotNone(queue.claim(job.pk, "w1"))
+        self.assertIsNone(queue.claim(job.pk, "w2"))
+        self.assertIsNone(queue.claim_next("w2"))
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = flaky.enqueue()
+        before = timezone.now()
+        queue.work("w1", once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreaterEqual(job.run_at, before + queue.backoff(1))
+        self.assertIn("RuntimeError: boom", job.last_error)
+
+        # not due yet
+        self.assertEqual(queue.work("w1", once=True), 0)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        queue.work("w1", once=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = record.enqueue(1)
+        queue.claim(job.pk, "dead-worker")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(queue.requeue_stale(), 1)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.QUEUED)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode_runs_inline(self):
+        job = record.enqueue(3)
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(CALLS, [3])
+
+    def test_run_workers_command_drains_queue(self):
+        for i in range(3):
+            record.enqueue(i)
+        out = io.StringIO()
+        call_command("run_workers", "--processes", "1", "--once", stdout=out)
+        self.assertIn("3 job(s) run", out.getvalue())
+        self.assertEqual(sorted(CALLS), [0, 1, 2])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BlogExportJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="exporter", password="pass12345", handle="exporter")
+        cls.other = User.objects.create_user(username="other", password="pass12345", handle="other_1")
+
+    def test_export_is_queued_and_pollable_by_owner_only(self):
+        self.client.login(username="exporter", password="pass12345")
+        resp = self.client.post(reverse("blog:export_feed", args=["json"]))
+        self.assertEqual(resp.status_code, 202)
+        status_url = resp.json()["status_url"]
+        self.assertEqual(self.client.get(status_url).json()["status"], Job.QUEUED)
+
+        queue.work("w1", once=True)
+        data = self.client.get(status_url).json()
+        self.assertEqual(data["status"], Job.DONE)
+        self.assertTrue(data["result"]["name"].startswith("exports/blog-"))
+
+        self.client.login(username="other", password="pass12345")
+        self.assertEqual(self.client.get(status_url).status_code, 404)
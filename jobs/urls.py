@@ -0,0 +1,9 @@
+from django.urls import path
+
+from jobs.views import job_status
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('<int:pk>/', job_status, name='status'),
+]
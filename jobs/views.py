@@ -0,0 +1,24 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from jobs.models import Job
+
+
+def job_payload(job: Job) -> dict:
+    return {
+        "id": job.pk,
+        "task": job.task,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result if job.status == Job.DONE else None,
+    }
+
+
+@login_required
+@require_GET
+def job_status(request, pk):
+    """Poll a job started by the current user (staff can see any job)."""
+    jobs = Job.objects.all() if request.user.is_staff else Job.objects.filter(owner=request.user)
+    return JsonResponse(job_payload(get_object_or_404(jobs, pk=pk)))
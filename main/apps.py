@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import checks  # registers the database checks
+        from . import metrics, querywatch
+
+        checks.log_connection_setup()
+        connection_created.connect(metrics.install_query_wrapper, dispatch_uid="reserve-metrics-queries")
+        connection_created.connect(querywatch.install_query_wrapper, dispatch_uid="reserve-querywatch")
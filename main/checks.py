@@ -0,0 +1,77 @@
+"""
+Startup checks for the database connection setup (see DATABASES in settings).
+
+``describe_connections()`` is logged once per process from MainConfig.ready()
+so every gunicorn worker reports the pool / persistence it actually runs with.
+"""
+import importlib.util
+import logging
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+logger = logging.getLogger("reserve.db")
+
+
+def _pool_options(db: dict):
+    pool = db.get("OPTIONS", {}).get("pool")
+    if pool is True:
+        return {}
+    return pool or None
+
+
+def describe(alias: str, db: dict) -> str:
+    engine = db["ENGINE"].rsplit(".", 1)[-1]
+    health = db.get("CONN_HEALTH_CHECKS", False)
+    pool = _pool_options(db)
+    if pool is not None:
+        opts = ", ".join(f"{k}={v}" for k, v in sorted(pool.items())) or "psycopg defaults"
+        return f"{alias}: {engine}, connection pool ({opts}), health_checks={health}"
+    max_age = db.get("CONN_MAX_AGE", 0)
+    if max_age is None:
+        mode = "persistent connections (unlimited age)"
+    elif max_age:
+        mode = f"persistent connections (CONN_MAX_AGE={max_age}s)"
+    else:
+        mode = "new connection per request"
+    return f"{alias}: {engine}, {mode}, health_checks={health}"
+
+
+def describe_connections() -> list:
+    return [describe(alias, db) for alias, db in settings.DATABASES.items()]
+
+
+def log_connection_setup() -> None:
+    for line in describe_connections():
+        logger.info("database %s", line)
+
+
+@register(Tags.database)
+def check_connection_pool(app_configs=None, **kwargs):
+    return pool_errors(settings.DATABASES)
+
+
+def pool_errors(databases: dict) -> list:
+    errors = []
+    for alias, db in databases.items():
+        if _pool_options(db) is None:
+            continue
+        if "postgresql" not in db["ENGINE"]:
+            errors.append(Error(
+                f"DATABASES[{alias!r}] sets OPTIONS['pool'] but only PostgreSQL supports pooling.",
+                id="reserve.E001",
+            ))
+            continue
+        if db.get("CONN_MAX_AGE", 0) != 0:
+            errors.append(Error(
+                f"DATABASES[{alias!r}] uses a connection pool together with CONN_MAX_AGE.",
+                hint="Set CONN_MAX_AGE to 0 when DB_POOL is enabled.",
+                id="reserve.E002",
+            ))
+        if importlib.util.find_spec("psycopg") is None or importlib.util.find_spec("psycopg_pool") is None:
+            errors.append(Error(
+                "Connection pooling needs psycopg 3 with the pool extra.",
+                hint="pip install 'psycopg[binary,pool]'",
+                id="reserve.E003",
+            ))
+    return errors
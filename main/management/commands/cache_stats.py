@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ReServe import reserve_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Print hit/miss/eviction stats per ReServe cache namespace. Needs a cache shared "
+        "with the server (file, Redis, memcached): locmem counters stay in the server process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing.")
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1]
+        if backend == "LocMemCache":
+            # this command is a process of its own: it would only ever see its own zeros
+            raise CommandError(
+                "The cache is locmem, private to each server process, so its counters cannot be "
+                "read from here. Run the server with CACHE_BACKEND=file, redis or memcached."
+            )
+        self.stdout.write(f"Cache backend: {backend}")
+        if not getattr(settings, "RESERVE_CACHE_STATS", settings.DEBUG):
+            self.stdout.write(self.style.WARNING("RESERVE_CACHE_STATS is off; counters are not updated."))
+
+        columns = ("hits", "misses", "hit %", "evictions", "sets", "early_recomputes", "lock_waits")
+        self.stdout.write(f"{'namespace':<12}" + "".join(f"{c:>18}" for c in columns))
+        for name, ns in sorted(reserve_cache.namespaces().items()):
+            s = ns.stats()
+            lookups = s["hits"] + s["misses"]
+            ratio = f"{100 * s['hits'] / lookups:.1f}" if lookups else "-"
+            row = (s["hits"], s["misses"], ratio, s["evictions"], s["sets"], s["early_recomputes"], s["lock_waits"])
+            self.stdout.write(f"{name:<12}" + "".join(f"{v:>18}" for v in row))
+            if options["reset"]:
+                ns.reset_stats()
+
+        backend_stats = reserve_cache.backend_stats()
+        if backend_stats:
+            self.stdout.write("Backend totals: " + ", ".join(f"{k}={v}" for k, v in backend_stats.items()))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from main import seeding
+
+
+class Command(BaseCommand):
+    help = "Fill the database with synthetic users, classes and blog posts (bulk, deterministic per --seed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--classes", type=int, default=1000)
+        parser.add_argument("--blogs", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=1, help="Same seed, same data.")
+        parser.add_argument("--batch-size", type=int, default=seeding.DEFAULT_BATCH_SIZE)
+        parser.add_argument("--password", default=seeding.DEFAULT_PASSWORD,
+                            help="Password shared by every seeded user.")
+        parser.add_argument("--reset", action="store_true",
+                            help=f"Delete earlier seeded users ({seeding.USER_PREFIX}<n>) and their data first.")
+
+    def handle(self, *args, users, classes, blogs, seed, batch_size, password, reset, **options):
+        if min(users, classes, blogs) < 0 or batch_size < 1:
+            raise CommandError("counts must be >= 0 and --batch-size >= 1")
+        if reset:
+            seeding.reset()
+
+        started = time.monotonic()
+
+        def progress(label, count):
+            self.stdout.write(f"{count} {label} ({time.monotonic() - started:.1f}s)")
+
+        try:
+            seeding.seed(users=users, classes=classes, blogs=blogs, seed=seed, password=password,
+                         batch_size=batch_size, progress=progress)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        except IntegrityError:
+            raise CommandError("seeded rows from an earlier run are in the way: pass --reset")
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.monotonic() - started:.1f}s."))
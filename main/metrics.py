@@ -0,0 +1,285 @@
+"""
+Request metrics, exposed in Prometheus text format at ``/metrics``.
+
+``main.middleware.MetricsMiddleware`` times every request and records per
+view (the resolved URL name, e.g. ``home_search:search``):
+
+* ``reserve_requests_total``     requests by method and status code
+* ``reserve_request_seconds``    latency histogram
+* ``reserve_db_queries``         SQL queries per request
+* ``reserve_db_seconds``         total SQL time per request
+* ``reserve_template_seconds``   template render time per request
+* ``reserve_response_bytes``     body size (streaming responses are skipped)
+
+SQL is measured by ``record_query``, which every database connection gets
+in its ``execute_wrappers`` when it connects (``connection_created``), so
+queries an async view runs in ``sync_to_async`` threads are counted too:
+the per-request tally lives in a context variable, and asgiref copies the
+context into those threads.  Template time comes from the ``TimedTemplates``
+backend (see TEMPLATES in settings).
+
+Every process keeps its own numbers and copies them into the cache at most
+every ``METRICS_FLUSH_INTERVAL`` seconds; ``/metrics`` adds up the copies of
+all processes, so whichever gunicorn worker answers a scrape reports the
+whole server.  That needs a shared cache (Redis, memcached, file): with
+locmem each worker only reports itself.
+"""
+import bisect
+import contextvars
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.backends.django import DjangoTemplates, Template
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+PROCS_KEY = "metrics:procs"
+PROC_TIMEOUT = 24 * 60 * 60  # snapshots of workers that went away age out
+
+
+class RequestStats:
+    """What one request spent in SQL and templates so far."""
+    __slots__ = ("queries", "db_seconds", "template_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+_current = contextvars.ContextVar("reserve_request_stats", default=None)
+
+
+def begin_request() -> contextvars.Token:
+    return _current.set(RequestStats())
+
+
+def end_request(token: contextvars.Token) -> RequestStats:
+    stats = _current.get()
+    _current.reset(token)
+    return stats
+
+
+def record_query(execute, sql, params, many, context):
+    """``execute_wrapper`` hook: count and time queries of the current request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def install_query_wrapper(sender, connection, **kwargs) -> None:
+    """``connection_created`` receiver."""
+    if record_query not in connection.execute_wrappers:
+        # first in line: ``with connection.execute_wrapper()`` blocks pop from the end
+        connection.execute_wrappers.insert(0, record_query)
+
+
+# --------------------------- Templates ---------------------------
+
+class TimedTemplate(Template):
+    """The backend's Template (``.template`` stays the engine template), timing ``render()``."""
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats = _current.get()
+            if stats is not None:
+                stats.template_seconds += time.perf_counter() - started
+
+
+class TimedTemplates(DjangoTemplates):
+    """The Django template backend, timing each top-level render."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        # the parent turns engine TemplateDoesNotExist into the backend's own
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+# --------------------------- Registry ---------------------------
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+
+    def empty(self):
+        return [0]
+
+    def add(self, values, amount=1):
+        values[0] += amount
+
+    def samples(self, labels, values):
+        yield self.name, labels, values[0]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames, buckets):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+
+    def empty(self):
+        # one count per bucket, then +Inf, then the sum
+        return [0] * (len(self.buckets) + 1) + [0]
+
+    def add(self, values, amount):
+        values[bisect.bisect_left(self.buckets, amount)] += 1
+        values[-1] += amount
+
+    def samples(self, labels, values):
+        running = 0
+        for bound, n in zip((*self.buckets, "+Inf"), values[:-1]):
+            running += n
+            yield f"{self.name}_bucket", (*labels, ("le", _format(bound))), running
+        yield f"{self.name}_sum", labels, values[-1]
+        yield f"{self.name}_count", labels, running
+
+
+REQUESTS = Counter("reserve_requests_total", "HTTP requests handled.", ("view", "method", "status"))
+LATENCY = Histogram("reserve_request_seconds", "Request latency in seconds.", ("view",), LATENCY_BUCKETS)
+QUERIES = Histogram("reserve_db_queries", "SQL queries per request.", ("view",), QUERY_BUCKETS)
+DB_TIME = Histogram("reserve_db_seconds", "Time spent in SQL per request.", ("view",), LATENCY_BUCKETS)
+TEMPLATE_TIME = Histogram(
+    "reserve_template_seconds", "Template render time per request.", ("view",), LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram("reserve_response_bytes", "Response body size.", ("view",), SIZE_BUCKETS)
+METRICS = (REQUESTS, LATENCY, QUERIES, DB_TIME, TEMPLATE_TIME, RESPONSE_SIZE)
+
+_lock = threading.Lock()
+_values = {m.name: {} for m in METRICS}   # metric name -> {label values: [numbers]}
+_last_flush = 0.0
+
+
+def _observe(metric, labels: tuple, amount) -> None:
+    series = _values[metric.name]
+    values = series.get(labels)
+    if values is None:
+        values = series[labels] = metric.empty()
+    metric.add(values, amount)
+
+
+def view_label(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.view_name or match._func_path
+
+
+def observe_request(request, response, seconds: float, stats: RequestStats) -> None:
+    view = view_label(request)
+    with _lock:
+        _observe(REQUESTS, (view, request.method, str(response.status_code)), 1)
+        _observe(LATENCY, (view,), seconds)
+        _observe(QUERIES, (view,), stats.queries)
+        _observe(DB_TIME, (view,), stats.db_seconds)
+        _observe(TEMPLATE_TIME, (view,), stats.template_seconds)
+        if not response.streaming:
+            _observe(RESPONSE_SIZE, (view,), len(response.content))
+    flush()
+
+
+def reset() -> None:
+    """Forget this process's numbers (tests)."""
+    with _lock:
+        for series in _values.values():
+            series.clear()
+
+
+# --------------------------- Sharing between processes ---------------------------
+
+def _proc_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"  # pid looked up late: gunicorn forks
+
+
+def _proc_key(proc: str) -> str:
+    return f"metrics:proc:{proc}"
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {name: {labels: list(values) for labels, values in series.items()}
+                for name, series in _values.items()}
+
+
+def flush(force: bool = False) -> None:
+    """Copy this process's numbers into the cache (rate limited unless ``force``)."""
+    global _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < getattr(settings, "METRICS_FLUSH_INTERVAL", 5):
+        return
+    _last_flush = now
+    proc = _proc_id()
+    cache.set(_proc_key(proc), snapshot(), PROC_TIMEOUT)
+    procs = cache.get(PROCS_KEY) or []
+    if proc not in procs:
+        # a concurrent update may drop someone; they re-add themselves next flush
+        cache.set(PROCS_KEY, [*procs, proc], None)
+
+
+def collect() -> dict:
+    """Sum of the latest snapshots of every process, this one up to date."""
+    flush(force=True)
+    procs = cache.get(PROCS_KEY) or []
+    found = cache.get_many([_proc_key(p) for p in procs])
+    alive = [p for p in procs if _proc_key(p) in found]
+    if len(alive) != len(procs):
+        cache.set(PROCS_KEY, alive, None)
+
+    total = {m.name: {} for m in METRICS}
+    for snap in found.values():
+        for name, series in snap.items():
+            merged = total.setdefault(name, {})
+            for labels, values in series.items():
+                into = merged.setdefault(labels, [0] * len(values))
+                for i, v in enumerate(values):
+                    into[i] += v
+    return total
+
+
+# --------------------------- Exposition ---------------------------
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else f"{value:.1f}"
+    return str(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(values: dict | None = None) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    values = collect() if values is None else values
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, numbers in sorted(values.get(metric.name, {}).items()):
+            for name, sample_labels, value in metric.samples(tuple(zip(metric.labelnames, labels)), numbers):
+                rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in sample_labels)
+                lines.append(f"{name}{{{rendered}}} {_format(value)}")
+    return "\n".join(lines) + "\n"
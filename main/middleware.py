@@ -0,0 +1,94 @@
+"""
+Request instrumentation: metrics (``main.metrics``) and the development
+query inspector (``main.querywatch``).
+
+Both are sync and async capable, so under ASGI the async views are not
+pushed into a thread just to pass through them.
+"""
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from main import metrics, querywatch
+
+logger = logging.getLogger("reserve.queries")
+
+
+class MetricsMiddleware:
+    """Per-view request metrics; turned off with ``METRICS_ENABLED = False``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token, started = metrics.begin_request(), time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stats = metrics.end_request(token)
+        metrics.observe_request(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        token, started = metrics.begin_request(), time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stats = metrics.end_request(token)
+        # the cache calls in observe_request are in-memory / Redis, never the database
+        metrics.observe_request(request, response, time.perf_counter() - started, stats)
+        return response
+
+
+class QueryInspectorMiddleware:
+    """
+    Development aid: warn about requests that run one query shape more than
+    QUERY_REPEAT_LIMIT times (an N+1) or more than QUERY_BUDGET queries in
+    total, with the stack frames that issued them (see ``main.querywatch``).
+    Off unless QUERY_INSPECTOR is set (it defaults to DEBUG).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_INSPECTOR", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with querywatch.watch() as log:
+            response = self.get_response(request)
+        return self.report(request, response, log)
+
+    async def __acall__(self, request):
+        with querywatch.watch() as log:
+            response = await self.get_response(request)
+        return self.report(request, response, log)
+
+    def report(self, request, response, log):
+        problems = log.problems(
+            max_queries=getattr(settings, "QUERY_BUDGET", None),
+            max_repeats=getattr(settings, "QUERY_REPEAT_LIMIT", None),
+        )
+        if problems:
+            logger.warning("%s %s: %s", request.method, request.path, "\n".join(problems))
+            response["X-Query-Problems"] = str(len(problems))
+        return response
@@ -1,11 +1,10 @@
 from django.db import models
 from django.conf import settings
-from django.contrib.auth.models import User
 from django.utils import timezone
 import uuid
 
 class PersonalGoal(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="personal_goals")
     title = models.CharField(max_length=200)
     date = models.DateField()
     is_completed = models.BooleanField(default=False)
@@ -0,0 +1,106 @@
+"""
+Repeated-query (N+1) and query-budget detector.
+
+``watch()`` records every SQL statement run inside it, grouped by *shape*:
+the SQL with literals and ``IN (...)`` lists collapsed, so the same lookup
+for different rows counts as one shape.  For each shape that repeats, the
+stack of the second run is kept (trimmed to project code), which is
+usually exactly the loop doing the lookups.
+
+Used by ``main.middleware.QueryInspectorMiddleware`` in development (log
+line + ``X-Query-Problems`` header per offending request) and by
+``main.testing.QueryBudgetMixin`` to assert per-view budgets in tests.
+
+Like ``main.metrics`` the hook sits in every connection's
+``execute_wrappers`` and the active log in a context variable, so queries
+from ``sync_to_async`` threads are seen too.
+"""
+import contextvars
+import re
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+STACK_DEPTH = 8
+
+# every open watch() sees the queries: a test helper around a request the
+# development middleware also watches must not lose them to the inner block
+_active = contextvars.ContextVar("reserve_query_logs", default=())
+
+_IN_LIST = re.compile(r"\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)", re.I)
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_SPACE = re.compile(r"\s+")
+
+
+def shape(sql: str) -> str:
+    """``sql`` with the parts that vary between otherwise identical queries masked."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _project_frames():
+    base = str(Path(settings.BASE_DIR).resolve())
+    here = str(Path(__file__).resolve())
+    frames = [
+        f for f in traceback.extract_stack()[:-2]
+        if f.filename.startswith(base) and f.filename != here and "site-packages" not in f.filename
+    ]
+    return frames[-STACK_DEPTH:]
+
+
+class QueryLog:
+    def __init__(self):
+        self.total = 0
+        self.shapes = Counter()
+        self.stacks = {}  # shape -> frames of its second run
+
+    def record(self, sql: str) -> None:
+        key = shape(sql)
+        self.total += 1
+        self.shapes[key] += 1
+        if self.shapes[key] == 2:
+            self.stacks[key] = _project_frames()
+
+    def repeated(self, max_repeats: int) -> list:
+        """``(shape, count)`` for shapes that ran more than ``max_repeats`` times."""
+        return [(s, n) for s, n in self.shapes.most_common() if n > max_repeats]
+
+    def problems(self, max_queries=None, max_repeats=None) -> list[str]:
+        found = []
+        if max_queries is not None and self.total > max_queries:
+            found.append(f"{self.total} queries, budget is {max_queries}")
+        if max_repeats is not None:
+            for sql, n in self.repeated(max_repeats):
+                where = "".join(traceback.format_list(self.stacks.get(sql, []))) or "  (no project frames)\n"
+                found.append(f"same query {n} times (limit {max_repeats}): {sql}\n{where.rstrip()}")
+        return found
+
+
+def record_query(execute, sql, params, many, context):
+    """``execute_wrapper`` hook."""
+    for log in _active.get():
+        log.record(sql)
+    return execute(sql, params, many, context)
+
+
+def install_query_wrapper(sender, connection, **kwargs) -> None:
+    """``connection_created`` receiver."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def watch():
+    """Record the queries run inside the block into a new QueryLog."""
+    log = QueryLog()
+    token = _active.set((*_active.get(), log))
+    try:
+        yield log
+    finally:
+        _active.reset(token)
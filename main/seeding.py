@@ -0,0 +1,204 @@
+"""
+Synthetic data at production scale, for local load tests (``seed_scale``).
+
+Everything is inserted with ``bulk_create`` in batches, generated lazily so
+memory stays flat at any size.  Users share one password, hashed once
+(PBKDF2 per row would take minutes for 100k users).  Output depends only
+on the seed and the day it runs: the same command on the same day yields
+the same rows, and class times are spread around that day.
+
+Seeded users are ``seed<n>``; ``reset()`` deletes them together with their
+classes and posts, so the command can be re-run without touching real
+accounts.
+"""
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from blog.models import Blog
+from home_search import fulltext, upcoming
+from home_search.models import CATEGORY_CHOICES, Class
+
+USER_PREFIX = "seed"
+DEFAULT_PASSWORD = "seed-password"
+DEFAULT_BATCH_SIZE = 1000
+INSTRUCTOR_SHARE = 0.05
+PARAGRAPH_POOL = 500  # texts are drawn from a pool: writing each one is most of the time
+
+FIRST_NAMES = (
+    "Adi", "Ayu", "Bima", "Citra", "Dewi", "Eka", "Fajar", "Gita", "Hana", "Indra", "Joko", "Kartika",
+    "Lestari", "Made", "Nadia", "Putri", "Rama", "Sari", "Tono", "Wulan", "Yoga", "Zahra",
+)
+LAST_NAMES = (
+    "Pratama", "Saputra", "Wijaya", "Santoso", "Hidayat", "Lestari", "Nugroho", "Kusuma", "Siregar",
+    "Halim", "Gunawan", "Setiawan", "Rahman", "Putra", "Wibowo",
+)
+LOCATIONS = (
+    "Depok", "Jakarta Selatan", "Jakarta Pusat", "Jakarta Barat", "Bogor", "Tangerang", "Bekasi",
+    "Kemang", "Senayan", "BSD City",
+)
+
+# per category: class name parts and a price band in rupiah
+CLASS_STYLES = {
+    "yoga": (("Vinyasa", "Hatha", "Yin", "Power", "Sunrise", "Restorative"), ("Flow", "Basics", "Stretch"),
+             (75_000, 250_000)),
+    "pilates": (("Mat", "Reformer", "Core", "Tower", "Barre"), ("Pilates", "Sculpt", "Foundations"),
+                (120_000, 450_000)),
+    "dance": (("Hip Hop", "Zumba", "K-Pop", "Jazz", "Salsa", "Contemporary"), ("Class", "Choreo", "Party"),
+              (60_000, 200_000)),
+    "boxing": (("Boxing", "Kickboxing", "Bag", "Shadow"), ("Bootcamp", "Drills", "Conditioning"),
+               (90_000, 300_000)),
+    "muaythai": (("Muaythai", "Thai Boxing", "Clinch"), ("Fundamentals", "Sparring", "Pads"),
+                 (100_000, 350_000)),
+    "ice-skating": (("Ice Skating", "Figure Skating", "Skate"), ("Lesson", "Beginners", "Club"),
+                    (150_000, 500_000)),
+}
+# make sure a new category gets generated too, even before it has a style
+for _value, _label in CATEGORY_CHOICES:
+    CLASS_STYLES.setdefault(_value, ((_label,), ("Class",), (75_000, 250_000)))
+
+WORDS = (
+    "strength mobility breath focus balance rhythm endurance posture technique recovery energy "
+    "community coach beginner friendly intermediate advanced session warm-up cool-down music "
+    "studio mat partner drills form progress routine weekly open level"
+).split()
+
+
+def _rng(seed, table) -> random.Random:
+    # one stream per table: the classes of seed 1 don't change with --users
+    return random.Random(f"{seed}:{table}")
+
+
+def _sentences(rng, count, words=12) -> str:
+    return " ".join(" ".join(rng.choices(WORDS, k=words)).capitalize() + "." for _ in range(count))
+
+
+def _insert(model, rows, batch_size) -> int:
+    """``bulk_create`` an iterable in batches, one transaction each."""
+    rows, total = iter(rows), 0
+    while batch := list(islice(rows, batch_size)):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size)
+        total += len(batch)
+    return total
+
+
+def _users(rng, count, password):
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield User(
+            username=f"{USER_PREFIX}{i}", handle=f"{USER_PREFIX}_{i}",
+            first_name=first, last_name=last, display_name=f"{first} {last}",
+            email=f"{USER_PREFIX}{i}@example.com", password=password,
+            role="instructor" if rng.random() < INSTRUCTOR_SHARE else "member",
+            height_cm=rng.randint(150, 195), weight_kg=rng.randint(45, 100),
+        )
+
+
+def _classes(rng, count, instructors, anchor):
+    categories = list(CLASS_STYLES)
+    descriptions = [_sentences(rng, rng.randint(2, 6)) for _ in range(PARAGRAPH_POOL)]
+    for _ in range(count):
+        category = rng.choice(categories)
+        styles, kinds, (low, high) = CLASS_STYLES[category]
+        capacity = rng.choice((8, 10, 12, 15, 20, 25, 30))
+        # two weeks back to three months ahead, on the half hour, 06:00-21:00
+        day = anchor + timedelta(days=rng.randint(-14, 90))
+        start = day.replace(hour=rng.randint(6, 20), minute=rng.choice((0, 30)))
+        yield Class(
+            owner_id=rng.choice(instructors) if instructors else None,
+            name=f"{rng.choice(styles)} {rng.choice(kinds)}",
+            category=category,
+            price=rng.randrange(low, high + 1, 5_000),
+            description=rng.choice(descriptions),
+            datetime=start,
+            location=rng.choice(LOCATIONS),
+            capacity=capacity,
+            seats_left=capacity,  # bulk_create skips Class.save()
+        )
+
+
+def _blogs(rng, count, authors, anchor):
+    paragraphs = [_sentences(rng, rng.randint(3, 6)) for _ in range(PARAGRAPH_POOL)]
+    for _ in range(count):
+        created = anchor - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60))
+        yield Blog(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            user_id=rng.choice(authors),
+            title=" ".join(rng.choices(WORDS, k=rng.randint(3, 8))).capitalize(),
+            content="\n\n".join(rng.choices(paragraphs, k=rng.randint(2, 5))),
+            created_at=created,
+            updated_at=created,
+        )
+
+
+@contextmanager
+def _explicit_timestamps(model, *names):
+    """
+    Let bulk_create keep the values set on auto_now / auto_now_add fields
+    instead of stamping every row with "now" (this process only).
+    """
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, (auto_now, auto_now_add) in zip(fields, saved):
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def seeded_users():
+    """Users made by ``seed()``: exactly ``seed<n>``, so "seedorf" is left alone."""
+    return User.objects.filter(username__regex=rf"^{USER_PREFIX}[0-9]+$")
+
+
+def reset() -> None:
+    """Delete earlier seeded users with their classes and posts."""
+    users = seeded_users()
+    Blog.objects.filter(user__in=users).delete()
+    Class.objects.filter(owner__in=users).delete()
+    users.delete()
+
+
+def seed(users=0, classes=0, blogs=0, seed=1, password=DEFAULT_PASSWORD,
+         batch_size=DEFAULT_BATCH_SIZE, progress=None) -> dict:
+    """
+    Insert ``users`` users, ``classes`` classes owned by the seeded
+    instructors and ``blogs`` posts by seeded users.  ``progress(label, n)``
+    is called after each table.  Returns the counts inserted.
+    """
+    anchor = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    done = {"users": 0, "classes": 0, "blogs": 0}
+
+    if users:
+        done["users"] = _insert(User, _users(_rng(seed, "users"), users, make_password(password)), batch_size)
+        if progress:
+            progress("users", done["users"])
+
+    people = list(seeded_users().order_by("pk").values_list("pk", "role"))
+    if classes:
+        instructors = [pk for pk, role in people if role == "instructor"] or [pk for pk, _ in people]
+        done["classes"] = _insert(Class, _classes(_rng(seed, "classes"), classes, instructors, anchor), batch_size)
+        # bulk_create sends no signals: index and invalidate by hand
+        fulltext.rebuild()
+        upcoming.rebuild()  # bumps the page cache too
+        if progress:
+            progress("classes", done["classes"])
+
+    if blogs:
+        if not people:
+            raise ValueError("posts need authors: seed some users first")
+        with _explicit_timestamps(Blog, "created_at", "updated_at"):
+            done["blogs"] = _insert(Blog, _blogs(_rng(seed, "blogs"), blogs, [pk for pk, _ in people], anchor), batch_size)
+        if progress:
+            progress("blogs", done["blogs"])
+    return done
@@ -0,0 +1,27 @@
+"""
+Test-suite helpers shared by the apps.
+"""
+from contextlib import contextmanager
+
+from main import querywatch
+
+
+class QueryBudgetMixin:
+    """
+    Per-view query budgets for TestCase classes::
+
+        with self.assertQueryBudget(6):
+            self.client.get(url)
+
+    Fails, listing the offending queries and the stack frames that ran
+    them, when the block runs more than ``max_queries`` queries or any one
+    query shape more than ``max_repeats`` times (an N+1).
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries=None, max_repeats=1):
+        with querywatch.watch() as log:
+            yield log
+        problems = log.problems(max_queries=max_queries, max_repeats=max_repeats)
+        if problems:
+            self.fail("query budget exceeded:\n" + "\n\n".join(problems))
@@ -1,3 +1,287 @@
-from django.test import TestCase
+from __future__ import annotations
 
-# Create your tests here.
+import io
+import re
+import tempfile
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Blog
+from home_search import fulltext
+from home_search.models import Class
+from main import checks, metrics, querywatch, seeding
+from main.middleware import MetricsMiddleware, QueryInspectorMiddleware
+from main.testing import QueryBudgetMixin
+from ReServe import reserve_cache
+from ReServe.reserve_cache import Namespace
+
+
+@override_settings(RESERVE_CACHE_STATS=True)
+class ReserveCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.ns = Namespace("test-ns", timeout=100)
+
+    def test_bump_invalidates_namespace_and_scopes(self):
+        self.ns.set("a", "k")
+        self.ns.scope(1).set("b", "k")
+        self.assertEqual(self.ns.get("k"), "a")
+        self.assertEqual(self.ns.scope(1).get("k"), "b")
+
+        self.ns.scope(1).bump()
+        self.assertIsNone(self.ns.scope(1).get("k"))
+        self.assertEqual(self.ns.get("k"), "a")
+
+        self.ns.bump()
+        self.assertIsNone(self.ns.get("k"))
+
+    def test_evicted_version_does_not_revive_old_entries(self):
+        self.ns.set("before", "k")
+        self.ns.bump()
+        cache.delete(self.ns.version_key)  # the backend drops the bumped version
+        self.assertIsNone(self.ns.get("k"))
+        self.ns.set("after", "k")
+        self.assertEqual(self.ns.get("k"), "after")
+
+    def test_get_or_set_computes_once(self):
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(self.ns.get_or_set(("x",), compute), 1)
+        self.assertEqual(self.ns.get_or_set(("x",), compute), 1)
+        self.assertEqual(len(calls), 1)
+
+    def test_early_recompute_by_a_single_caller(self):
+        key = self.ns.key("x")
+        cache.set(key, ("old", 0), 100)  # soft expiry already passed
+        lock_key = f"lock:{key}"
+        # someone else already holds the refresh lock -> stale value served
+        cache.add(lock_key, 1)
+        self.assertEqual(self.ns.get_or_set(("x",), lambda: "new"), "old")
+        cache.delete(lock_key)
+        # lock free -> this caller refreshes
+        self.assertEqual(self.ns.get_or_set(("x",), lambda: "new"), "new")
+        self.assertEqual(self.ns.stats()["early_recomputes"], 1)
+
+    def test_stats_count_hits_misses_and_evictions(self):
+        self.ns.get("k")
+        self.ns.set("v", "k")
+        self.ns.get("k")
+        cache.delete(self.ns.key("k"))  # simulate the backend dropping the entry
+        self.ns.get("k")
+        stats = self.ns.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 2, 1))
+
+    def test_cache_stats_command_lists_namespaces(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+        }):
+            self.ns.get("k")
+            out = io.StringIO()
+            call_command("cache_stats", "--reset", stdout=out)
+            self.assertIn("test-ns", out.getvalue())
+            self.assertIn("test-ns", reserve_cache.namespaces())
+            self.assertEqual(self.ns.stats()["misses"], 0)
+
+    def test_cache_stats_command_refuses_locmem(self):
+        with self.assertRaisesMessage(CommandError, "locmem"):
+            call_command("cache_stats", stdout=io.StringIO())
+
+    @override_settings(DEBUG=False)
+    def test_stats_off_by_default_outside_debug(self):
+        with override_settings():
+            del settings.RESERVE_CACHE_STATS
+            self.ns.get("k")
+        self.assertEqual(self.ns.stats()["misses"], 0)
+
+
+class ConnectionSetupCheckTests(SimpleTestCase):
+    PG = "django.db.backends.postgresql"
+
+    def test_describe_pool_and_persistent_modes(self):
+        pooled = {"ENGINE": self.PG, "CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": True,
+                  "OPTIONS": {"pool": {"min_size": 2, "max_size": 10}}}
+        self.assertEqual(
+            checks.describe("default", pooled),
+            "default: postgresql, connection pool (max_size=10, min_size=2), health_checks=True",
+        )
+        persistent = {"ENGINE": self.PG, "CONN_MAX_AGE": 60, "OPTIONS": {}}
+        self.assertIn("CONN_MAX_AGE=60s", checks.describe("default", persistent))
+
+    def test_pool_with_conn_max_age_is_an_error(self):
+        db = {"ENGINE": self.PG, "CONN_MAX_AGE": 60, "OPTIONS": {"pool": True}}
+        ids = {e.id for e in checks.pool_errors({"default": db})}
+        self.assertIn("reserve.E002", ids)
+
+    def test_pool_on_sqlite_is_an_error(self):
+        db = {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {"pool": True}}
+        self.assertEqual([e.id for e in checks.pool_errors({"default": db})], ["reserve.E001"])
+
+    def test_no_pool_no_errors(self):
+        db = {"ENGINE": self.PG, "CONN_MAX_AGE": 60, "OPTIONS": {}}
+        self.assertEqual(checks.pool_errors({"default": db}), [])
+
+
+def sample(text, name, **labels):
+    """Value of one sample line in a Prometheus exposition."""
+    rendered = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    match = re.search(rf"^{re.escape(name)}{{{re.escape(rendered)}}} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else None
+
+
+@override_settings(METRICS_TOKEN="scrape-token")
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def scrape(self):
+        resp = self.client.get(reverse("main:metrics"), HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return resp.content.decode()
+
+    def test_records_latency_queries_and_size_per_view(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse("blog:main_blog"))
+        n_queries = len(queries)  # read before the next request resets the query log
+        text = self.scrape()
+        view = "blog:main_blog"
+        self.assertEqual(sample(text, "reserve_requests_total", view=view, method="GET", status="200"), 1)
+        self.assertEqual(sample(text, "reserve_request_seconds_count", view=view), 1)
+        self.assertEqual(sample(text, "reserve_db_queries_sum", view=view), n_queries)
+        self.assertGreater(sample(text, "reserve_db_seconds_sum", view=view), 0)
+        self.assertGreater(sample(text, "reserve_template_seconds_sum", view=view), 0)
+        self.assertEqual(sample(text, "reserve_response_bytes_sum", view=view), len(resp.content))
+        # buckets are cumulative and end in +Inf == count
+        self.assertEqual(sample(text, "reserve_request_seconds_bucket", view=view, le="+Inf"), 1)
+
+    def test_timed_templates_keep_the_backend_template_interface(self):
+        from django.template import engines
+        from django.template.base import Template as EngineTemplate
+
+        backend = engines.all()[0]
+        template = backend.get_template("base.html")
+        self.assertIsInstance(template, metrics.TimedTemplate)
+        self.assertIsInstance(template.template, EngineTemplate)
+        self.assertEqual(template.origin.template_name, "base.html")
+        self.assertIs(template.backend, backend)
+
+    def test_async_views_count_queries_run_in_threads(self):
+        User = get_user_model()
+
+        async def view(request):
+            await User.objects.acount()
+            await User.objects.filter(username="x").aexists()
+            return HttpResponse("ok")
+
+        middleware = MetricsMiddleware(view)
+        request = AsyncRequestFactory().get("/anything/")
+        async_to_sync(middleware)(request)
+        self.assertEqual(metrics.snapshot()["reserve_db_queries"][("<unresolved>",)][-1], 2)
+
+    def test_sums_snapshots_of_other_processes(self):
+        self.client.get(reverse("blog:main_blog"))
+        metrics.flush(force=True)
+        other = {"reserve_requests_total": {("blog:main_blog", "GET", "200"): [4]}}
+        cache.set("metrics:proc:elsewhere:1", other)
+        cache.set(metrics.PROCS_KEY, cache.get(metrics.PROCS_KEY) + ["elsewhere:1", "gone:2"])
+        text = self.scrape()
+        self.assertEqual(sample(text, "reserve_requests_total", view="blog:main_blog", method="GET", status="200"), 5)
+        self.assertNotIn("gone:2", cache.get(metrics.PROCS_KEY))
+
+    def test_endpoint_needs_token(self):
+        url = reverse("main:metrics")
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer nope").status_code, 401)
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.client.get(url).status_code, 404)  # DEBUG is off in tests
+
+
+def lookup_each(usernames):
+    User = get_user_model()
+    return [User.objects.filter(username=name).first() for name in usernames]  # deliberate N+1
+
+
+class QueryWatchTests(QueryBudgetMixin, TestCase):
+    def test_shape_ignores_values_and_in_list_length(self):
+        self.assertEqual(
+            querywatch.shape('SELECT "a" FROM "t" WHERE "id" IN (%s, %s, %s) LIMIT 21'),
+            querywatch.shape('SELECT  "a" FROM "t"\nWHERE "id" IN (%s) LIMIT 1'),
+        )
+
+    def test_repeated_shape_reported_with_stack(self):
+        with querywatch.watch() as log:
+            lookup_each(["a", "b", "c"])
+        [problem] = log.problems(max_repeats=2)
+        self.assertIn("same query 3 times", problem)
+        self.assertIn("lookup_each", problem)
+        self.assertEqual(log.problems(max_repeats=3), [])
+        self.assertEqual(log.problems(max_queries=2), ["3 queries, budget is 2"])
+
+    def test_assert_query_budget_fails_on_n_plus_one(self):
+        with self.assertRaisesMessage(AssertionError, "same query 2 times"):
+            with self.assertQueryBudget(max_repeats=1):
+                lookup_each(["a", "b"])
+
+    @override_settings(QUERY_INSPECTOR=True, QUERY_REPEAT_LIMIT=1, QUERY_BUDGET=None)
+    def test_middleware_flags_request(self):
+        def view(request):
+            lookup_each(["a", "b"])
+            return HttpResponse("ok")
+
+        with self.assertLogs("reserve.queries", "WARNING") as logs:
+            resp = QueryInspectorMiddleware(view)(AsyncRequestFactory().get("/x/"))
+        self.assertEqual(resp["X-Query-Problems"], "1")
+        self.assertIn("lookup_each", logs.output[0])
+
+
+class SeedScaleTests(TestCase):
+    def seed(self, **counts):
+        call_command("seed_scale", "--reset", *(f"--{k}={v}" for k, v in counts.items()), stdout=io.StringIO())
+
+    def snapshot(self):
+        return (
+            list(Class.objects.order_by("name", "price", "datetime").values_list("name", "category", "price", "datetime")),
+            list(Blog.objects.order_by("pk").values_list("pk", "title", "created_at")),
+        )
+
+    def test_same_seed_same_rows(self):
+        self.seed(users=30, classes=40, blogs=25)
+        first = self.snapshot()
+        self.assertEqual(seeding.seeded_users().count(), 30)
+        self.assertEqual((len(first[0]), len(first[1])), (40, 25))
+
+        self.seed(users=30, classes=40, blogs=25)  # --reset replaces the earlier rows
+        self.assertEqual(self.snapshot(), first)
+        self.seed(users=30, classes=40, blogs=25, seed=2)
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_reset_spares_real_accounts(self):
+        real = get_user_model().objects.create_user(username="seedorf", password="pass12345", handle="seedorf")
+        self.seed(users=5)
+        self.assertEqual(seeding.seeded_users().count(), 5)
+        self.seed(users=3)
+        self.assertTrue(get_user_model().objects.filter(pk=real.pk).exists())
+        self.assertEqual(seeding.seeded_users().count(), 3)
+
+    def test_rows_look_real(self):
+        self.seed(users=20, classes=30, blogs=10)
+        user = seeding.seeded_users().first()
+        self.assertTrue(user.check_password(seeding.DEFAULT_PASSWORD))
+        self.assertEqual(len(set(seeding.seeded_users().values_list("password", flat=True))), 1)
+        self.assertFalse(Class.objects.exclude(seats_left=F("capacity")).exists())
+        self.assertFalse(Class.objects.filter(owner__isnull=True).exists())
+        # post dates are spread out, not all "now"
+        self.assertGreater(Blog.objects.values("created_at").distinct().count(), 1)
+        # bulk_create sends no signals: the search index is rebuilt by hand
+        self.assertTrue(fulltext.search(Class.objects.all(), Class.objects.first().name.split()[0]).exists())
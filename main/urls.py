@@ -1,5 +1,5 @@
 from django.urls import path
-from main.views import register, login_user, logout_user, show_main
+from main.views import register, login_user, logout_user, show_main, show_metrics
 
 app_name = 'main'
 
@@ -8,4 +8,5 @@ urlpatterns = [
     path('register/', register, name='register'),
     path('login/', login_user, name='login'),
     path('logout/', logout_user, name='logout'),
+    path('metrics', show_metrics, name='metrics'),
 ]
@@ -3,8 +3,11 @@ from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth import authenticate,login,logout
 from django.contrib import messages
 import datetime
-from django.http import HttpResponseRedirect
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseRedirect
+from django.utils.crypto import constant_time_compare
 from django.urls import reverse
+from main import metrics
 
 # Create your views here.
 def show_main(request):
@@ -43,3 +46,14 @@ def logout_user(request):
     response.delete_cookie('last_login')
     return response
 
+
+def show_metrics(request):
+    """Prometheus scrape endpoint (see main.metrics)."""
+    token = settings.METRICS_TOKEN
+    if token:
+        sent = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not constant_time_compare(sent, token):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        return HttpResponse(status=404)
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
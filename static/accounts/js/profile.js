@@ -110,6 +110,14 @@
   // ---- AJAX: avatar upload (instant preview, then upload) ----
   const avatarFile = document.getElementById("avatar-file");
   const avatarImg  = document.getElementById("avatar-img");
+  const avatarWebp = document.getElementById("avatar-webp");
+
+  function setAvatar(webp1x, webp2x, jpg1x, jpg2x) {
+    if (avatarWebp) avatarWebp.srcset = webp1x ? `${webp1x} 1x, ${webp2x} 2x` : "";
+    if (!avatarImg) return;
+    avatarImg.srcset = jpg2x ? `${jpg1x} 1x, ${jpg2x} 2x` : "";
+    avatarImg.src = jpg1x;
+  }
 
   async function uploadAvatar(file) {
     const fd = new FormData();
@@ -122,7 +130,8 @@
       });
       const d = await r.json();
       if (!r.ok || !d.success) throw new Error("Upload failed");
-      if (avatarImg && d.avatar_url) avatarImg.src = d.avatar_url;
+      const u = d.avatar_urls;
+      if (u) setAvatar(u["128"], u["256"], u["128_jpg"], u["256_jpg"]);
       showToast("Avatar updated");
     } catch (e) {
       console.error(e);
@@ -133,7 +142,7 @@
   avatarFile?.addEventListener("change", () => {
     const f = avatarFile.files?.[0];
     if (!f) return;
-    if (avatarImg) avatarImg.src = URL.createObjectURL(f); // instant preview
+    setAvatar(null, null, URL.createObjectURL(f)); // instant preview
     uploadAvatar(f);
   });
 })();
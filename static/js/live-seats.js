@@ -0,0 +1,30 @@
+// Live seat counts: every element with data-seats-for="<class id>" is kept
+// up to date from the /classes/seats/stream/ server-sent events endpoint.
+// Pages only load this under ASGI; a WSGI server answers the stream with 204,
+// which makes EventSource give up instead of reconnecting.
+(function () {
+  const nodes = document.querySelectorAll("[data-seats-for]");
+  if (!nodes.length || !window.EventSource) return;
+
+  const byId = {};
+  nodes.forEach((el) => (byId[el.dataset.seatsFor] ||= []).push(el));
+
+  function render(el, s) {
+    if (s.seats_left > 0) {
+      el.textContent = el.dataset.seatsFormat === "long"
+        ? `${s.seats_left} of ${s.capacity} left`
+        : `${s.seats_left} seats left`;
+      el.classList.remove("text-red-600");
+    } else {
+      el.textContent = s.waitlist ? `Full · ${s.waitlist} waiting` : "Full";
+      el.classList.add("text-red-600");
+    }
+  }
+
+  const ids = Object.keys(byId).join(",");
+  const source = new EventSource(`/classes/seats/stream/?ids=${ids}`);
+  source.addEventListener("seats", (e) => {
+    const s = JSON.parse(e.data);
+    (byId[s.id] || []).forEach((el) => render(el, s));
+  });
+})();